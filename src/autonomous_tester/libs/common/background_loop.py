@@ -0,0 +1,132 @@
+"""Long-lived asyncio event loop running on a dedicated thread.
+
+Synchronous code (such as CrewAI tools called from worker threads) submits
+coroutines to the loop instead of creating a loop per call, so async resources
+bound to the loop, like browser connections, stay usable across calls and
+several submitted coroutines run concurrently.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional, TypeVar
+
+from autonomous_tester.libs.common.logger import logger
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """An event loop that runs forever on its own daemon thread."""
+
+    def __init__(self, name: str = "background-loop"):
+        """Initialize the loop. The thread is started on the first submit.
+
+        Args:
+            name (str): Name of the loop thread.
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the loop thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if it is not running yet."""
+        with self._lock:
+            if not self.running:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run() -> None:
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        """Schedule a coroutine on the loop from any thread.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            Future: A thread-safe future resolving to the coroutine result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._start())
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and block until it finishes.
+
+        Args:
+            coro: The coroutine to run.
+            timeout (float, optional): Seconds to wait before giving up.
+
+        Returns:
+            The coroutine result.
+        """
+        if self.running and threading.current_thread() is self._thread:
+            raise RuntimeError(f"{self.name}: run() called from the loop thread would deadlock, await instead")
+        return self.submit(coro).result(timeout)
+
+    async def arun(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Await a coroutine on the loop from another event loop.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            The coroutine result.
+        """
+        if self.running and asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def shutdown(self, cleanup: Optional[Coroutine[Any, Any, Any]] = None, timeout: float = 30) -> None:
+        """Run an optional cleanup coroutine, cancel remaining tasks and stop the loop.
+
+        Args:
+            cleanup: Coroutine releasing resources bound to the loop.
+            timeout (float): Seconds to wait for the cleanup and the thread.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+
+        if loop is None or thread is None or not thread.is_alive():
+            if cleanup is not None:
+                cleanup.close()
+            return
+
+        async def stop() -> None:
+            if cleanup is not None:
+                try:
+                    await cleanup
+                except Exception as e:
+                    logger.warning(f"{self.name}: cleanup failed: {e}")
+
+            current = asyncio.current_task()
+            pending = [task for task in asyncio.all_tasks() if task is not current]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(stop(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"{self.name}: shutdown did not finish cleanly: {e}")
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
@@ -0,0 +1,189 @@
+"""Checkpoints of crew runs, so a failed run can be resumed.
+
+Every run gets a directory `<Settings.STORAGE_DIR>/runs/<run-id>/` with its
+options (`run.json`), the output of each finished task (`tasks/`), the test
+cases chosen for execution and the result of each finished test case
+(`cases/`). Every file is written as soon as its work is done, atomically, so
+a run that crashes or hits a rate limit loses at most the work in flight.
+`--resume <run-id>` reopens the directory and skips what it already holds.
+Only the last `Settings.RUN_CHECKPOINTS_KEEP` runs are kept; older run
+directories are deleted when a new run starts.
+"""
+
+import json
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from crewai.tasks.task_output import TaskOutput
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.plan_cache import dump_task_output, restore_task_output
+from autonomous_tester.libs.common.test_plan import TestCase
+from autonomous_tester.libs.common.test_history import dump_cases, restore_cases
+from autonomous_tester.libs.common.test_report import CaseResult
+
+RUN_ID = re.compile(r"^[\w\-]+$")
+# `--resume latest` continues the most recently started run.
+LATEST = "latest"
+
+
+def runs_dir() -> Path:
+    """Get the directory of the run checkpoints."""
+    return Path(settings.STORAGE_DIR) / "runs"
+
+
+def prune_runs(keep: Optional[int] = None) -> None:
+    """Delete the checkpoints of all but the most recently started runs.
+
+    Args:
+        keep (int, optional): Number of runs to keep. Defaults to
+            `Settings.RUN_CHECKPOINTS_KEEP`; 0 or less keeps every run.
+    """
+    keep = settings.RUN_CHECKPOINTS_KEEP if keep is None else keep
+    if keep <= 0:
+        return
+    runs = sorted(runs_dir().glob("*/run.json"), key=lambda path: (path.stat().st_mtime, path.parent.name))
+    for path in runs[:-keep]:
+        shutil.rmtree(path.parent, ignore_errors=True)
+
+
+def _write_json(path: Path, value: Any) -> None:
+    """Write a JSON file atomically, so a crash never leaves it half written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(value, file)
+    os.replace(temp_path, path)
+
+
+def _read_json(path: Path) -> Optional[Any]:
+    """Read a JSON file, or None if it does not exist or is unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+class RunCheckpoint:
+    """The checkpoint directory of one run."""
+
+    def __init__(self, run_id: str, options: Dict[str, Any]):
+        """Initialize the checkpoint. Use `create` or `open` instead.
+
+        Args:
+            run_id (str): The run ID, the name of its directory.
+            options (dict): The options the run was started with, e.g. type and endpoint.
+        """
+        self.run_id = run_id
+        self.options = options
+        self.directory = runs_dir() / run_id
+
+    @classmethod
+    def create(cls, **options) -> "RunCheckpoint":
+        """Start the checkpoint of a new run, pruning the checkpoints of old runs.
+
+        Args:
+            **options: The options of the run, restored by `--resume`.
+
+        Returns:
+            RunCheckpoint: The checkpoint, with a new run ID.
+        """
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+        checkpoint = cls(run_id, options)
+        _write_json(checkpoint.directory / "run.json", {"run_id": run_id, "created": time.time(), "options": options})
+        prune_runs()
+        return checkpoint
+
+    @classmethod
+    def open(cls, run_id: str) -> "RunCheckpoint":
+        """Open the checkpoint of an earlier run.
+
+        Args:
+            run_id (str): The run ID, or "latest" for the most recently started run.
+
+        Returns:
+            RunCheckpoint: The checkpoint, with the options of the run.
+
+        Raises:
+            ValueError: If no run with the ID is stored.
+        """
+        if run_id == LATEST:
+            runs = sorted(runs_dir().glob("*/run.json"), key=lambda path: path.stat().st_mtime)
+            if not runs:
+                raise ValueError(f"No runs are stored in {runs_dir()}")
+            run_id = runs[-1].parent.name
+
+        entry = _read_json(runs_dir() / run_id / "run.json") if RUN_ID.match(run_id) else None
+        if entry is None:
+            raise ValueError(f"No run '{run_id}' is stored in {runs_dir()}")
+        return cls(run_id, entry.get("options", {}))
+
+    def _task_path(self, name: str) -> Path:
+        return self.directory / "tasks" / f"{name}.json"
+
+    def save_task(self, name: str, output: TaskOutput) -> None:
+        """Store the output of a finished task."""
+        _write_json(self._task_path(name), dump_task_output(output))
+
+    def load_task(self, name: str) -> Optional[TaskOutput]:
+        """Get the stored output of a task, or None if it did not finish."""
+        entry = _read_json(self._task_path(name))
+        return restore_task_output(entry) if entry is not None else None
+
+    def discard_task(self, name: str) -> None:
+        """Drop the stored output of a task that has to run again."""
+        self._task_path(name).unlink(missing_ok=True)
+
+    def save_cases(
+        self,
+        test_cases: List[Union[TestCase, str]],
+        planned: List[Union[TestCase, str]],
+        links: Dict[str, List[str]],
+        suite_size: int
+    ) -> None:
+        """Store the test cases chosen for execution.
+
+        Args:
+            test_cases (List): The test cases to execute, in order.
+            planned (List): The planned test cases of the suite.
+            links (dict): The requirement sections of every test case of the suite, by case key.
+            suite_size (int): Number of test cases in the suite.
+        """
+        _write_json(self.directory / "test_cases.json", {
+            "test_cases": dump_cases(test_cases),
+            "planned": dump_cases(planned),
+            "links": links,
+            "suite_size": suite_size,
+        })
+
+    def load_cases(self) -> Optional[Tuple[List[Union[TestCase, str]], List[Union[TestCase, str]], Dict[str, List[str]], int]]:
+        """Get the stored test cases, or None if none were chosen yet.
+
+        Returns:
+            Tuple: The test cases to execute, the planned test cases, the
+                requirement sections by case key and the suite size, as given to `save_cases`.
+        """
+        entry = _read_json(self.directory / "test_cases.json")
+        if entry is None:
+            return None
+        return restore_cases(entry["test_cases"]), restore_cases(entry["planned"]), entry["links"], entry["suite_size"]
+
+    def save_result(self, key: str, result: CaseResult) -> None:
+        """Store the result of a finished test case."""
+        _write_json(self.directory / "cases" / f"{key}.json", result.model_dump(mode="json"))
+
+    def load_results(self) -> Dict[str, CaseResult]:
+        """Get the stored results of the finished test cases, by case key."""
+        results = {}
+        for path in (self.directory / "cases").glob("*.json"):
+            entry = _read_json(path)
+            if entry is not None:
+                results[path.stem] = CaseResult.model_validate(entry)
+        return results
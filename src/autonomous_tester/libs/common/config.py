@@ -31,6 +31,54 @@ class Settings:
     TASK_COLLECTIONS = BASE.BASE_DIR + "tester_crew/config/" + "task_collections.yaml"
 
     STORAGE_DIR = ".memory/"
+    MAX_PARALLEL_CASES = int(os.getenv("AT_MAX_PARALLEL_CASES", "4"))
+    REPORT_SUMMARY_MAX_CHARS = int(os.getenv("AT_REPORT_SUMMARY_MAX_CHARS", "4000"))
+    OPENAPI_SPEC = os.getenv("AT_OPENAPI_SPEC", "auto")
+    OPENAPI_ONLY: bool = os.getenv("AT_OPENAPI_ONLY", "False").lower() in ("true", "1", "t")
+    CHANGED_ONLY_SAMPLE = float(os.getenv("AT_CHANGED_ONLY_SAMPLE", "0.1"))
+    RUN_CHECKPOINTS_KEEP = int(os.getenv("AT_RUN_CHECKPOINTS_KEEP", "10"))
+
+    API_POOL_SIZE = int(os.getenv("AT_API_POOL_SIZE", "10"))
+    API_KEEP_ALIVE: bool = os.getenv("AT_API_KEEP_ALIVE", "True").lower() in ("true", "1", "t")
+    API_MAX_WORKERS = int(os.getenv("AT_API_MAX_WORKERS", "8"))
+    API_HTTP2: bool = os.getenv("AT_API_HTTP2", "False").lower() in ("true", "1", "t")
+
+    API_CASSETTE_MODE = os.getenv("AT_API_CASSETTE", "off").lower()
+    API_CASSETTE_TTL = float(os.getenv("AT_API_CASSETTE_TTL", "0"))
+    API_CASSETTE_MAX_MB = int(os.getenv("AT_API_CASSETTE_MAX_MB", "200"))
+
+    API_OUTPUT_MODE = os.getenv("AT_API_OUTPUT", "full").lower()
+    API_OUTPUT_MAX_BYTES = int(os.getenv("AT_API_OUTPUT_MAX_BYTES", "4000"))
+    API_BODY_STORE_MAX_MB = int(os.getenv("AT_API_BODY_STORE_MAX_MB", "200"))
+    API_MAX_BODY_MB = int(os.getenv("AT_API_MAX_BODY_MB", "10"))
+
+    API_RATE_LIMIT = float(os.getenv("AT_API_RATE_LIMIT", "0"))
+    API_RATE_BURST = int(os.getenv("AT_API_RATE_BURST", "10"))
+    API_HOST_CONCURRENCY = int(os.getenv("AT_API_HOST_CONCURRENCY", "16"))
+    API_RETRIES = int(os.getenv("AT_API_RETRIES", "2"))
+    API_RETRY_BACKOFF = float(os.getenv("AT_API_RETRY_BACKOFF", "0.5"))
+    API_CIRCUIT_THRESHOLD = int(os.getenv("AT_API_CIRCUIT_THRESHOLD", "5"))
+    API_CIRCUIT_COOLDOWN = float(os.getenv("AT_API_CIRCUIT_COOLDOWN", "30"))
+    API_FUZZ_ITERATIONS = int(os.getenv("AT_API_FUZZ_ITERATIONS", "1000"))
+
+    API_AUTH_PROFILES = os.getenv("AT_API_AUTH_PROFILES", "")
+    API_AUTH_TOKEN_TTL = float(os.getenv("AT_API_AUTH_TOKEN_TTL", "3600"))
+
+    LLM_CACHE: bool = os.getenv("AT_LLM_CACHE", "False").lower() in ("true", "1", "t")
+    LLM_CACHE_TTL = float(os.getenv("AT_LLM_CACHE_TTL", "0"))
+    LLM_CACHE_MAX_MB = int(os.getenv("AT_LLM_CACHE_MAX_MB", "500"))
+
+    BROWSER_POOL_SIZE = int(os.getenv("AT_BROWSER_POOL_SIZE", "3"))
+    BROWSER_REPLAY: bool = os.getenv("AT_BROWSER_REPLAY", "True").lower() in ("true", "1", "t")
+    # Model that re-reads the page for the extract steps of a replay; empty uses MODEL.
+    BROWSER_REPLAY_EXTRACT_MODEL = os.getenv("AT_BROWSER_REPLAY_EXTRACT_MODEL", "")
+    BROWSER_LEAN: bool = os.getenv("AT_BROWSER_LEAN", "False").lower() in ("true", "1", "t")
+    BROWSER_BLOCK_RESOURCES = os.getenv("AT_BROWSER_BLOCK_RESOURCES", "Image,Media,Font")
+    BROWSER_BLOCK_URLS = os.getenv(
+        "AT_BROWSER_BLOCK_URLS",
+        "*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*connect.facebook.net*,*hotjar.com*,*segment.io*",
+    )
+    BROWSER_VIEWPORT = os.getenv("AT_BROWSER_VIEWPORT", "1280x800")
 
     def __init__(self):
         for key, value in os.environ.items():
@@ -0,0 +1,178 @@
+"""Disk-backed cache for the autonomous tester.
+
+Entries are JSON documents stored under a cache directory, one file per key.
+Keys are content hashes, so the same inputs always map to the same file.
+Entries can expire after a time-to-live, and the least recently used ones
+are evicted once the directory grows past its size limit. The size is
+counted as entries are written and deleted, so a write only scans the
+directory when the cache is over its limit; eviction then frees room down to
+`EVICT_TO` of the limit, so the scans are spread over many writes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from autonomous_tester.libs.common.logger import logger
+
+# Share of the size limit that eviction frees the cache down to.
+EVICT_TO = 0.9
+
+
+def make_key(*parts: Any) -> str:
+    """Build a content-addressed key from JSON-serializable parts.
+
+    Args:
+        *parts: Values identifying the entry (dicts are hashed with sorted keys).
+
+    Returns:
+        str: The hex SHA-256 digest of the canonical JSON encoding of the parts.
+    """
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _file_size(path: Path) -> int:
+    """Get the size of a file, 0 if it does not exist."""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+class DiskCache:
+    """JSON key/value store on disk with expiry and LRU size eviction."""
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            directory (str): Directory that holds the cache entries.
+            max_bytes (int, optional): Evict least recently used entries above this size.
+            ttl (float, optional): Seconds after which an entry expires.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes or None
+        self.ttl = ttl or None
+        self.hits = 0
+        self.misses = 0
+        # Total size of the entries, counted from the first write on.
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        """Get the file path of an entry, sharded by the key prefix."""
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value.
+
+        Args:
+            key (str): The entry key.
+
+        Returns:
+            Any: The cached value, or None on a miss or an expired entry.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if self.ttl is not None and time.time() - entry.get("created", 0) > self.ttl:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the entry so size eviction treats it as recently used.
+        try:
+            os.utime(path)
+        except OSError:
+            # Deleted or evicted since it was read.
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value and evict old entries if the cache is over its size limit.
+
+        Args:
+            key (str): The entry key.
+            value (Any): A JSON-serializable value.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"created": time.time(), "value": value}, file)
+        size = temp_path.stat().st_size
+        replaced = _file_size(path)
+        os.replace(temp_path, path)
+
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size - replaced
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if it exists."""
+        self._remove(self._path(key))
+
+    def _remove(self, path: Path) -> None:
+        """Delete an entry file and take it off the counted size."""
+        size = _file_size(path)
+        path.unlink(missing_ok=True)
+        with self._lock:
+            if self._size is not None:
+                self._size = max(0, self._size - size)
+
+    def _scan_size(self) -> int:
+        """Get the total size of the entries on disk."""
+        return sum(_file_size(path) for path in self.directory.glob("*/*.json"))
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is back to `EVICT_TO` of its size limit.
+
+        The directory is scanned again, which also corrects the counted size
+        for entries written or deleted by other processes.
+        """
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                    if total <= self.max_bytes * EVICT_TO:
+                        break
+                    path.unlink(missing_ok=True)
+                    total -= size
+                    logger.debug(f"Evicted cache entry {path.name} from {self.directory}")
+            self._size = total
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit and miss counts for this cache instance."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
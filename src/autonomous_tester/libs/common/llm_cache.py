@@ -0,0 +1,214 @@
+"""Disk-backed cache of LLM completions for the crew agents.
+
+Completions are stored under `Settings.STORAGE_DIR`, keyed by a hash of the
+model, prompt messages, tool schemas and stop words. A repeat run with the
+same prompts is answered from disk instead of calling the model again.
+
+Calls where the LLM itself executes tools (`available_functions`) are never
+cached, because replaying them would skip the tool side effects.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from crewai.llms.base_llm import BaseLLM, call_stop_override
+from crewai.utilities.agent_utils import extract_tool_call_info
+from crewai.utilities.llm_utils import create_llm
+from pydantic import BaseModel, Field
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.decorators import singleton
+from autonomous_tester.libs.common.disk_cache import DiskCache, make_key
+from autonomous_tester.libs.common.logger import logger
+
+
+@singleton
+def get_llm_cache() -> DiskCache:
+    """Get the completion cache shared by every agent."""
+    return DiskCache(
+        os.path.join(settings.STORAGE_DIR, "llm_cache"),
+        max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+        ttl=settings.LLM_CACHE_TTL,
+    )
+
+
+def _encode(result: Any) -> Optional[Dict[str, Any]]:
+    """Convert a completion into a cache entry, or None if it cannot be cached."""
+    if isinstance(result, str):
+        return {"kind": "text", "value": result}
+
+    if isinstance(result, BaseModel):
+        return {"kind": "model", "value": result.model_dump(mode="json")}
+
+    if isinstance(result, list) and result:
+        tool_calls = []
+        for tool_call in result:
+            info = extract_tool_call_info(tool_call)
+            if info is None:
+                return None
+            call_id, name, arguments = info
+            tool_calls.append({
+                "id": call_id,
+                "type": "function",
+                "function": {"name": name, "arguments": arguments},
+            })
+        return {"kind": "tool_calls", "value": tool_calls}
+
+    return None
+
+
+def _decode(entry: Dict[str, Any], response_model: Optional[type[BaseModel]]) -> Any:
+    """Rebuild a completion from a cache entry."""
+    if entry["kind"] == "model" and response_model is not None:
+        return response_model.model_validate(entry["value"])
+    return entry["value"]
+
+
+class CachedLLM(BaseLLM):
+    """LLM wrapper that answers repeated prompts from the disk cache."""
+
+    llm: BaseLLM = Field(description="The wrapped LLM that serves cache misses.")
+    cache: Any = Field(default=None, exclude=True, description="The DiskCache holding completions.")
+
+    @classmethod
+    def wrap(cls, llm: BaseLLM, cache: DiskCache) -> "CachedLLM":
+        """Wrap an LLM, mirroring the settings the agents read from it."""
+        return cls(
+            llm=llm,
+            cache=cache,
+            model=llm.model,
+            provider=llm.provider,
+            llm_type=llm.llm_type,
+            is_litellm=llm.is_litellm,
+            temperature=llm.temperature,
+            stop=list(llm.stop),
+        )
+
+    def _cache_key(
+        self,
+        messages: Any,
+        tools: Optional[List[Dict[str, Any]]],
+        response_model: Optional[type[BaseModel]]
+    ) -> str:
+        """Build the cache key of a completion request."""
+        return make_key(
+            self.llm.model,
+            self.llm.temperature,
+            messages,
+            tools,
+            sorted(self.stop_sequences),
+            response_model.model_json_schema() if response_model is not None else None,
+        )
+
+    def _lookup(self, key: str, response_model: Optional[type[BaseModel]]) -> Optional[Any]:
+        """Get a cached completion, if one exists."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        logger.debug(f"LLM cache hit for {self.llm.model}")
+        return _decode(entry, response_model)
+
+    def _store(self, key: str, result: Any) -> None:
+        """Store a completion if it can be cached."""
+        entry = _encode(result)
+        if entry is not None:
+            self.cache.set(key, entry)
+
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Any = None,
+        from_agent: Any = None,
+        response_model: Optional[type[BaseModel]] = None,
+    ) -> Any:
+        """Answer from the cache, or call the wrapped LLM and cache the completion."""
+        cacheable = not available_functions
+        key = self._cache_key(messages, tools, response_model) if cacheable else None
+        if cacheable:
+            cached = self._lookup(key, response_model)
+            if cached is not None:
+                return cached
+
+        with call_stop_override(self.llm, self.stop_sequences or None):
+            result = self.llm.call(
+                messages,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+                response_model=response_model,
+            )
+
+        if cacheable:
+            self._store(key, result)
+        return result
+
+    async def acall(
+        self,
+        messages: Any,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Any = None,
+        from_agent: Any = None,
+        response_model: Optional[type[BaseModel]] = None,
+    ) -> Any:
+        """Async variant of `call`."""
+        cacheable = not available_functions
+        key = self._cache_key(messages, tools, response_model) if cacheable else None
+        if cacheable:
+            cached = self._lookup(key, response_model)
+            if cached is not None:
+                return cached
+
+        with call_stop_override(self.llm, self.stop_sequences or None):
+            result = await self.llm.acall(
+                messages,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+                response_model=response_model,
+            )
+
+        if cacheable:
+            self._store(key, result)
+        return result
+
+    def supports_function_calling(self) -> bool:
+        """Whether the wrapped LLM supports native function calling."""
+        supports = getattr(self.llm, "supports_function_calling", None)
+        return bool(supports and supports())
+
+    def supports_stop_words(self) -> bool:
+        """Whether the wrapped LLM supports stop words."""
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        """Get the context window size of the wrapped LLM."""
+        return self.llm.get_context_window_size()
+
+    def supports_multimodal(self) -> bool:
+        """Whether the wrapped LLM accepts multimodal input."""
+        return self.llm.supports_multimodal()
+
+    def get_token_usage_summary(self) -> Any:
+        """Get the token usage of the wrapped LLM (cache hits use none)."""
+        return self.llm.get_token_usage_summary()
+
+
+def get_agent_llm() -> Optional[BaseLLM]:
+    """Get the LLM for a crew agent.
+
+    Returns:
+        BaseLLM: A cached LLM when `AT_LLM_CACHE` is enabled, otherwise None so
+            the agent falls back to CrewAI's default model from the environment.
+    """
+    if not settings.LLM_CACHE:
+        return None
+    return CachedLLM.wrap(create_llm(None), get_llm_cache())
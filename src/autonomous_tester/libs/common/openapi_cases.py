@@ -0,0 +1,375 @@
+"""Deterministic API test cases generated from an OpenAPI description.
+
+APIs such as FastAPI apps publish a machine-readable `/openapi.json`. For every
+operation in it, fully specified test cases are generated without the LLM:
+
+- positive: a request built from the documented examples must get the
+  documented success status (only when every required input has an example,
+  and the operation needs no credentials)
+- missing fields: the JSON body, or a required field or query parameter, is
+  left out and the request must be rejected as invalid
+- wrong types: a body field, query or path parameter gets a value of the wrong
+  type and the request must be rejected as invalid
+- auth failures: an operation that requires credentials is called without
+  them and must be refused
+
+The cases run through the API tool like any other fully specified case, so the
+planner only has to add cases for requirements the description cannot express.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import requests
+import yaml
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.logger import logger
+from autonomous_tester.libs.common.test_plan import APIRequestSpec, TestCase
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch")
+PATH_PARAM = re.compile(r"\{([^}/]+)\}")
+
+# Deepest `$ref` chain or nesting followed when building example values.
+MAX_DEPTH = 8
+
+# Example values of common string formats.
+FORMAT_EXAMPLES = {
+    "email": "user@example.com",
+    "uuid": "00000000-0000-4000-8000-000000000000",
+    "date": "2024-01-01",
+    "date-time": "2024-01-01T00:00:00Z",
+    "uri": "https://example.com",
+    "url": "https://example.com",
+}
+
+# A value of a different type for each schema type.
+WRONG_TYPE_VALUES = {
+    "string": 12345,
+    "integer": "not-a-number",
+    "number": "not-a-number",
+    "boolean": "not-a-boolean",
+    "array": "not-an-array",
+    "object": "not-an-object",
+}
+
+
+def load_openapi(source: str, timeout: float = 10) -> Optional[Dict[str, Any]]:
+    """Load an OpenAPI description.
+
+    Args:
+        source (str): URL or file path of the description (JSON or YAML).
+        timeout (float): Timeout of fetching a URL, in seconds.
+
+    Returns:
+        dict: The description, or None if it cannot be loaded.
+    """
+    try:
+        if urlsplit(source).scheme in ("http", "https"):
+            response = requests.get(source, timeout=timeout)
+            response.raise_for_status()
+            text = response.text
+        else:
+            text = Path(source).read_text(encoding="utf-8")
+        spec = yaml.safe_load(text)
+    except (requests.RequestException, OSError, yaml.YAMLError) as e:
+        logger.info(f"No OpenAPI description loaded from {source}: {e}")
+        return None
+
+    if not isinstance(spec, dict) or not isinstance(spec.get("paths"), dict):
+        logger.info(f"{source} is not an OpenAPI description")
+        return None
+    return spec
+
+
+class _Generator:
+    """Builds the test cases of one OpenAPI description."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.cases: List[TestCase] = []
+        self.base_path = self._base_path()
+
+    def _base_path(self) -> str:
+        """Get the path prefix of the first server, e.g. `/api/v1`."""
+        servers = self.spec.get("servers") or []
+        url = servers[0].get("url", "") if servers and isinstance(servers[0], dict) else ""
+        return urlsplit(urljoin("http://host/", url)).path.rstrip("/")
+
+    def _resolve(self, value: Any, depth: int = 0) -> Any:
+        """Follow a local `$ref` (e.g. `#/components/schemas/Item`)."""
+        while isinstance(value, dict) and "$ref" in value and depth < MAX_DEPTH:
+            target: Any = self.spec
+            for part in value["$ref"].lstrip("#/").split("/"):
+                target = target.get(part.replace("~1", "/").replace("~0", "~"), {}) if isinstance(target, dict) else {}
+            value, depth = target, depth + 1
+        return value if isinstance(value, dict) else {}
+
+    def _schema(self, schema: Any, depth: int = 0) -> Dict[str, Any]:
+        """Resolve a schema, merging `allOf` and picking the first non-null `anyOf`/`oneOf` option."""
+        schema = self._resolve(schema)
+        if depth >= MAX_DEPTH:
+            return schema
+        if "allOf" in schema:
+            merged: Dict[str, Any] = {"type": "object", "properties": {}, "required": []}
+            for part in schema["allOf"]:
+                part = self._schema(part, depth + 1)
+                merged["properties"].update(part.get("properties", {}))
+                merged["required"] += part.get("required", [])
+                merged.update({key: value for key, value in part.items() if key not in ("properties", "required")})
+            return merged
+        for key in ("anyOf", "oneOf"):
+            options = [self._schema(option, depth + 1) for option in schema.get(key, [])]
+            options = [option for option in options if _type(option) != "null"]
+            if options:
+                return {**{k: v for k, v in schema.items() if k != key}, **options[0]}
+        return schema
+
+    def _example(self, schema: Any, depth: int = 0) -> Tuple[Any, bool]:
+        """Build an example value of a schema.
+
+        Returns:
+            tuple: The value, and whether it comes from documented examples
+                rather than a placeholder.
+        """
+        schema = self._schema(schema)
+        for key in ("example", "default", "const"):
+            if key in schema:
+                return schema[key], True
+        if schema.get("examples"):
+            examples = schema["examples"]
+            return (examples[0] if isinstance(examples, list) else next(iter(examples.values()))), True
+        if schema.get("enum"):
+            return schema["enum"][0], True
+
+        kind = _type(schema)
+        if kind == "object" or "properties" in schema:
+            if depth >= MAX_DEPTH:
+                return {}, False
+            value, documented = {}, True
+            required = set(schema.get("required", []))
+            for name, prop in schema.get("properties", {}).items():
+                prop_value, prop_documented = self._example(prop, depth + 1)
+                if name in required or prop_documented:
+                    value[name] = prop_value
+                if name in required:
+                    documented = documented and prop_documented
+            return value, documented
+        if kind == "array":
+            if depth >= MAX_DEPTH:
+                return [], False
+            item, documented = self._example(schema.get("items", {}), depth + 1)
+            return [item], documented
+        if kind == "integer":
+            return int(schema.get("minimum", 1)), False
+        if kind == "number":
+            return float(schema.get("minimum", 1.0)), False
+        if kind == "boolean":
+            return True, False
+        text = FORMAT_EXAMPLES.get(schema.get("format"), "test")
+        return text.ljust(int(schema.get("minLength", 0)), "x"), False
+
+    def _parameters(self, path_item: Dict[str, Any], operation: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Get the resolved parameters of an operation, including path-level ones."""
+        parameters = {}
+        for parameter in (path_item.get("parameters") or []) + (operation.get("parameters") or []):
+            parameter = self._resolve(parameter)
+            if parameter.get("name"):
+                parameters[(parameter["name"], parameter.get("in"))] = parameter
+        return list(parameters.values())
+
+    def _parameter_example(self, parameter: Dict[str, Any]) -> Tuple[Any, bool]:
+        """Build an example value of a parameter."""
+        if "example" in parameter:
+            return parameter["example"], True
+        if parameter.get("examples"):
+            example = next(iter(parameter["examples"].values()))
+            return self._resolve(example).get("value", example), True
+        return self._example(parameter.get("schema", {}))
+
+    def _json_body_schema(self, operation: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Get the JSON request body schema of an operation and whether the body is required."""
+        body = self._resolve(operation.get("requestBody"))
+        content = body.get("content") or {}
+        media = next((content[name] for name in content if "json" in name), None)
+        if media is None:
+            return None, False
+        return self._schema(media.get("schema", {})), bool(body.get("required"))
+
+    def _add(self, method: str, path: str, kind: str, spec: APIRequestSpec) -> None:
+        """Add a generated test case."""
+        self.cases.append(TestCase(
+            id=f"OAS-{len(self.cases) + 1:03d}",
+            description=f"{method.upper()} {path}: {kind}",
+            steps=[f"Send {spec.method} {spec.url} and expect status {spec.expected_status}"],
+            tool="api",
+            request=spec,
+        ))
+
+    def _operation(self, path: str, path_item: Dict[str, Any], method: str, operation: Dict[str, Any]) -> None:
+        """Generate the test cases of one operation."""
+        responses = {str(code): value for code, value in (operation.get("responses") or {}).items()}
+        success = next((int(code) for code in sorted(responses) if code.isdigit() and code.startswith("2")), 200)
+        invalid = next((int(code) for code in ("422", "400") if code in responses), 400)
+        refused = 403 if "403" in responses and "401" not in responses else 401
+        secured = any(operation.get("security", self.spec.get("security")) or [])
+
+        parameters = self._parameters(path_item, operation)
+        path_values, query, documented = {}, {}, True
+        for parameter in parameters:
+            value, has_example = self._parameter_example(parameter)
+            if parameter.get("in") == "path":
+                path_values[parameter["name"]] = value
+                documented = documented and has_example
+            elif parameter.get("in") == "query" and parameter.get("required"):
+                query[parameter["name"]] = value
+                documented = documented and has_example
+
+        body_schema, body_required = self._json_body_schema(operation)
+        body, body_documented = self._example(body_schema) if body_schema is not None else (None, True)
+
+        def url(values: Dict[str, Any]) -> str:
+            filled = PATH_PARAM.sub(lambda match: str(values.get(match.group(1), "1")), path)
+            return self.base_path + filled
+
+        def request(**changes: Any) -> APIRequestSpec:
+            fields = {
+                "method": method.upper(),
+                "url": url(path_values),
+                "params": {name: _query_value(value) for name, value in query.items()},
+                "body": body,
+            }
+            fields.update(changes)
+            return APIRequestSpec(**fields)
+
+        if secured:
+            self._add(method, path, "rejects a request without credentials", request(expected_status=refused))
+            # Every further request would be refused before its input is checked.
+            return
+
+        if documented and body_documented:
+            self._add(method, path, "accepts a valid request", request(expected_status=success))
+
+        if body_schema is not None and body_required:
+            self._add(method, path, "rejects a missing request body", request(body=None, expected_status=invalid))
+
+        if isinstance(body, dict):
+            properties = body_schema.get("properties", {})
+            for name in body_schema.get("required", []):
+                if name in body:
+                    reduced = {key: value for key, value in body.items() if key != name}
+                    self._add(method, path, f"rejects a body without required field '{name}'",
+                              request(body=reduced, expected_status=invalid))
+            for name, prop in properties.items():
+                wrong = WRONG_TYPE_VALUES.get(_type(self._schema(prop)))
+                if name in body and wrong is not None:
+                    self._add(method, path, f"rejects a wrong type for body field '{name}'",
+                              request(body={**body, name: wrong}, expected_status=invalid))
+
+        for parameter in parameters:
+            name, location = parameter["name"], parameter.get("in")
+            if location == "query" and parameter.get("required"):
+                reduced = {key: _query_value(value) for key, value in query.items() if key != name}
+                self._add(method, path, f"rejects a missing query parameter '{name}'",
+                          request(params=reduced, expected_status=invalid))
+
+            wrong = WRONG_TYPE_VALUES.get(_type(self._schema(parameter.get("schema", {}))))
+            if wrong is None or isinstance(wrong, int) or location not in ("path", "query"):
+                # A number sent for a string parameter is still a valid string.
+                continue
+            if location == "path":
+                self._add(method, path, f"rejects a wrong type for path parameter '{name}'",
+                          request(url=url({**path_values, name: wrong}), expected_status=invalid))
+            else:
+                params = {key: _query_value(value) for key, value in query.items()}
+                self._add(method, path, f"rejects a wrong type for query parameter '{name}'",
+                          request(params={**params, name: wrong}, expected_status=invalid))
+
+    def generate(self) -> List[TestCase]:
+        """Generate the test cases of every operation, in document order."""
+        for path, path_item in self.spec["paths"].items():
+            path_item = self._resolve(path_item)
+            for method in HTTP_METHODS:
+                if isinstance(path_item.get(method), dict):
+                    self._operation(path, path_item, method, path_item[method])
+        return self.cases
+
+
+def _type(schema: Dict[str, Any]) -> Optional[str]:
+    """Get the type of a schema, ignoring `null` in OpenAPI 3.1 type lists."""
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((item for item in kind if item != "null"), None)
+    return kind
+
+
+def _query_value(value: Any) -> str:
+    """Encode a query parameter value."""
+    if isinstance(value, bool):
+        return str(value).lower()
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def generate_test_cases(spec: Dict[str, Any]) -> List[TestCase]:
+    """Generate fully specified API test cases from an OpenAPI description.
+
+    Args:
+        spec (dict): The OpenAPI description.
+
+    Returns:
+        List[TestCase]: Positive, missing field, wrong type and auth failure
+            test cases of every operation.
+    """
+    return _Generator(spec).generate()
+
+
+def openapi_test_cases(endpoint: Optional[str]) -> List[TestCase]:
+    """Get the generated test cases of the API under test.
+
+    The description is read from `Settings.OPENAPI_SPEC`: a URL or file path,
+    `auto` for `<endpoint>/openapi.json`, or `off`.
+
+    Args:
+        endpoint (str, optional): The endpoint of the API under test.
+
+    Returns:
+        List[TestCase]: The generated test cases, empty without a description.
+    """
+    source = settings.OPENAPI_SPEC
+    if source.lower() == "off" or (source.lower() == "auto" and not endpoint):
+        return []
+    if source.lower() == "auto":
+        source = urljoin(endpoint.rstrip("/") + "/", "openapi.json")
+
+    spec = load_openapi(source)
+    if spec is None:
+        return []
+    cases = generate_test_cases(spec)
+    logger.info(f"Generated {len(cases)} test cases from the OpenAPI description at {source}")
+    return cases
+
+
+def covered_tests(cases: List[TestCase]) -> str:
+    """Describe the generated test cases for the planner, one line per operation.
+
+    Args:
+        cases (List[TestCase]): The generated test cases.
+
+    Returns:
+        str: The note for the planning task, or an empty string without cases.
+    """
+    operations: Dict[str, List[str]] = {}
+    for case in cases:
+        operation, kind = case.description.split(": ", 1)
+        operations.setdefault(operation, []).append(kind)
+    if not operations:
+        return ""
+    lines = [
+        "The following API tests are already generated from the OpenAPI description and run separately.",
+        "Do not plan them again; only add test cases for requirements they do not cover:",
+    ]
+    lines += [f"- {operation}: {'; '.join(kinds)}" for operation, kinds in operations.items()]
+    return "\n".join(lines)
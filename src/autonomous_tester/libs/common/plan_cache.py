@@ -0,0 +1,119 @@
+"""Disk-backed memoization of the test planning stage.
+
+The planner's output only depends on the requirements file, the crew agent and
+task configuration, the test plan schema, the model and the tests that are
+already generated for it (see `openapi_cases`). It is stored under
+`Settings.STORAGE_DIR`, keyed by a hash of exactly those inputs, so an
+unchanged setup reuses the last plan instead of running the planner again.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.config import BASE
+from autonomous_tester.libs.common.decorators import singleton
+from autonomous_tester.libs.common.disk_cache import DiskCache, make_key
+from autonomous_tester.libs.common.logger import logger
+from autonomous_tester.libs.common.test_plan import TestPlan
+
+
+@singleton
+def get_plan_cache() -> DiskCache:
+    """Get the test plan cache."""
+    return DiskCache(os.path.join(settings.STORAGE_DIR, "plan_cache"))
+
+
+def _file_hash(path: str) -> str:
+    """Get the SHA-256 digest of a file's content."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def plan_key(context: str = "") -> str:
+    """Build the cache key of the test plan for the current settings.
+
+    Args:
+        context (str): Further planning input, e.g. the note on generated tests.
+
+    Returns:
+        str: A hash of the requirements file, the crew agent and task
+            configuration files, the test plan schema, the model and the context.
+    """
+    config_dir = BASE.BASE_DIR + "tester_crew/"
+    return make_key(
+        _file_hash(settings.REQUIREMENTS_PATH),
+        _file_hash(config_dir + settings.AGENTS_CONFIG),
+        _file_hash(config_dir + settings.TASKS_CONFIG),
+        TestPlan.model_json_schema(),
+        getattr(settings, "MODEL", None),
+        context,
+    )
+
+
+def dump_task_output(output: TaskOutput) -> Dict[str, Any]:
+    """Convert a task output into a JSON-serializable entry.
+
+    Args:
+        output (TaskOutput): The task output.
+
+    Returns:
+        dict: The fields needed to restore the output with `restore_task_output`.
+    """
+    json_dict = output.json_dict
+    if json_dict is None and output.pydantic is not None:
+        json_dict = output.pydantic.model_dump(mode="json")
+
+    return {
+        "description": output.description,
+        "name": output.name,
+        "expected_output": output.expected_output,
+        "raw": output.raw,
+        "json_dict": json_dict,
+        "agent": output.agent,
+        "output_format": OutputFormat(output.output_format).value,
+    }
+
+
+def restore_task_output(entry: Dict[str, Any]) -> TaskOutput:
+    """Rebuild a task output from an entry made by `dump_task_output`."""
+    return TaskOutput(
+        description=entry["description"],
+        name=entry.get("name"),
+        expected_output=entry.get("expected_output"),
+        raw=entry["raw"],
+        json_dict=entry.get("json_dict"),
+        agent=entry["agent"],
+        output_format=OutputFormat(entry.get("output_format", OutputFormat.RAW.value)),
+    )
+
+
+def load_plan(context: str = "") -> Optional[TaskOutput]:
+    """Load the stored test plan for the current settings.
+
+    Args:
+        context (str): Further planning input the plan was made with.
+
+    Returns:
+        TaskOutput: The stored planner output, or None if no plan is stored.
+    """
+    entry: Optional[Dict[str, Any]] = get_plan_cache().get(plan_key(context))
+    if entry is None:
+        return None
+    logger.info("Reusing the stored test plan, planning is skipped")
+    return restore_task_output(entry)
+
+
+def store_plan(output: TaskOutput, context: str = "") -> None:
+    """Store the planner output for the current settings.
+
+    Args:
+        output (TaskOutput): The output of the planning task.
+        context (str): Further planning input the plan was made with.
+    """
+    get_plan_cache().set(plan_key(context), dump_task_output(output))
+    logger.info("Stored the test plan for reuse")
@@ -0,0 +1,277 @@
+"""Requirement fingerprints and test case history for selective re-testing.
+
+The requirements file is split into sections (headings, underlined titles,
+numbered or ID titles such as `FR-001: ...`), and each section is
+fingerprinted by a hash of its whitespace-normalized text. Test cases are
+linked to the sections whose specific wording they share.
+
+After every run the fingerprints, the planned test cases, their links and
+their results are stored under `Settings.STORAGE_DIR`. A `--changed-only` run
+compares the requirements with them: only the changed sections are planned
+again, and only new test cases, test cases of changed sections, test cases
+that failed last time and a share `Settings.CHANGED_ONLY_SAMPLE` of the rest,
+least recently run first, are executed.
+"""
+
+import hashlib
+import math
+import os
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.decorators import singleton
+from autonomous_tester.libs.common.disk_cache import DiskCache, make_key
+from autonomous_tester.libs.common.test_plan import TestCase
+from autonomous_tester.libs.common.test_report import CaseResult
+
+UNDERLINE = re.compile(r"^\s*(?:={3,}|-{3,})\s*$")
+WORD = re.compile(r"[\w/\-]+(?:\.[\w/\-]+)*")
+STOP_WORDS = {
+    "the", "and", "for", "with", "that", "this", "must", "should", "will", "are", "from",
+    "into", "when", "then", "test", "case", "verify", "check", "user", "can", "not", "its",
+}
+
+# Longest line that can be a section title.
+MAX_TITLE_CHARS = 80
+# Title of the text before the first section title.
+PREAMBLE = "Introduction"
+# A test case is linked to every section scoring at least this share of the best score.
+LINK_RATIO = 0.5
+MAX_LINKS = 3
+
+
+def _is_title(lines: List[str], index: int) -> bool:
+    """Whether a line of the requirements starts a section."""
+    line = lines[index].rstrip()
+    following = lines[index + 1] if index + 1 < len(lines) else ""
+    if not line.strip() or UNDERLINE.match(line):
+        return False
+    if UNDERLINE.match(following):
+        return True
+    if line[0].isspace() or len(line) > MAX_TITLE_CHARS or line[-1] in ".,;!?":
+        return False
+    if line.startswith("#"):
+        return True
+    after_blank = index == 0 or not lines[index - 1].strip()
+    return after_blank and (line[0].isupper() or line[0].isdigit())
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Split requirements into their sections.
+
+    Args:
+        text (str): The requirements text.
+
+    Returns:
+        Dict[str, str]: The text of each section by title, in document order.
+            Repeated titles are numbered, e.g. "Request (2)".
+    """
+    lines = text.splitlines()
+    sections: Dict[str, List[str]] = {}
+    title = PREAMBLE
+    for index, line in enumerate(lines):
+        if _is_title(lines, index):
+            name = line.strip().lstrip("#").strip().rstrip(":").strip() or PREAMBLE
+            title, number = name, 2
+            while title in sections:
+                title, number = f"{name} ({number})", number + 1
+        sections.setdefault(title, []).append(line)
+    return {title: "\n".join(body) for title, body in sections.items() if "".join(body).strip()}
+
+
+def fingerprint(text: str) -> str:
+    """Get the fingerprint of a section, which ignores whitespace changes."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def _words(text: str) -> Set[str]:
+    """Get the distinct words of a text that can link it to a section."""
+    words = {word.strip("/-_") for word in WORD.findall(text.lower())}
+    return {word for word in words if len(word) >= 3 and word not in STOP_WORDS}
+
+
+class RequirementSections:
+    """The fingerprinted sections of a requirements file."""
+
+    def __init__(self, text: str):
+        """Initialize the sections.
+
+        Args:
+            text (str): The requirements text.
+        """
+        self.sections = split_sections(text)
+        self.fingerprints = {title: fingerprint(body) for title, body in self.sections.items()}
+        self._words = {title: _words(body) for title, body in self.sections.items()}
+        self._counts = Counter(word for words in self._words.values() for word in words)
+
+    @classmethod
+    def load(cls, path: str) -> "RequirementSections":
+        """Read the sections of a requirements file."""
+        return cls(Path(path).read_text(encoding="utf-8"))
+
+    def changed(self, fingerprints: Dict[str, str]) -> Set[str]:
+        """Get the titles of the sections that are new, changed or removed since the given fingerprints."""
+        titles = set(self.fingerprints) | set(fingerprints)
+        return {title for title in titles if self.fingerprints.get(title) != fingerprints.get(title)}
+
+    def link(self, text: str) -> List[str]:
+        """Find the sections a test case covers.
+
+        Shared words are weighted by how few sections use them, so words
+        that appear everywhere (such as the application name) do not link.
+
+        Args:
+            text (str): The test case text.
+
+        Returns:
+            List[str]: Titles of the best matching sections, best first; empty
+                if the test case shares no specific wording with any section.
+        """
+        words = _words(text)
+        count = len(self.sections)
+        scores = {
+            title: sum(math.log(count / self._counts[word]) for word in words & section_words)
+            for title, section_words in self._words.items()
+        }
+        best = max(scores.values(), default=0.0)
+        if best <= 0:
+            return []
+        ranked = sorted((title for title, score in scores.items() if score >= best * LINK_RATIO), key=lambda title: -scores[title])
+        return ranked[:MAX_LINKS]
+
+
+def case_text(test_case: Union[TestCase, str]) -> str:
+    """Get the text of a test case, structured or free text."""
+    return test_case.to_prompt() if isinstance(test_case, TestCase) else test_case
+
+
+def link_text(test_case: Union[TestCase, str]) -> str:
+    """Get the words of a test case that say what it covers, without the field names of structured cases."""
+    if isinstance(test_case, str):
+        return test_case
+    parts = [test_case.id, test_case.description, *test_case.pre_steps, *test_case.steps]
+    if test_case.request is not None:
+        request = test_case.request
+        parts += [request.url, *map(str, request.params.values()), request.expected_contains or ""]
+        parts += [str(value) for value in (request.body.values() if isinstance(request.body, dict) else [request.body or ""])]
+    return "\n".join(parts)
+
+
+def case_key(test_case: Union[TestCase, str]) -> str:
+    """Get the key of a test case in the history, a hash of its content."""
+    return make_key(case_text(test_case))[:16]
+
+
+def dump_cases(test_cases: List[Union[TestCase, str]]) -> List[Union[Dict[str, Any], str]]:
+    """Convert test cases, structured or free text, into JSON-serializable entries."""
+    return [case if isinstance(case, str) else case.model_dump(mode="json") for case in test_cases]
+
+
+def restore_cases(entries: List[Union[Dict[str, Any], str]]) -> List[Union[TestCase, str]]:
+    """Rebuild test cases from entries made by `dump_cases`."""
+    return [entry if isinstance(entry, str) else TestCase.model_validate(entry) for entry in entries]
+
+
+@singleton
+def get_history_store() -> DiskCache:
+    """Get the store of the test histories."""
+    return DiskCache(os.path.join(settings.STORAGE_DIR, "test_history"))
+
+
+class TestHistory:
+    """Fingerprints, test cases and results of the last run against an endpoint."""
+
+    def __init__(self, endpoint: Optional[str] = None):
+        """Load the history of the current requirements file and the given endpoint.
+
+        Args:
+            endpoint (str, optional): The endpoint under test.
+        """
+        self.key = make_key(os.path.abspath(settings.REQUIREMENTS_PATH), endpoint)
+        entry: Dict[str, Any] = get_history_store().get(self.key) or {}
+        self.fingerprints: Dict[str, str] = entry.get("fingerprints", {})
+        self.links: Dict[str, List[str]] = entry.get("links", {})
+        self.results: Dict[str, Dict[str, Any]] = entry.get("results", {})
+        self._planned: List[Union[Dict[str, Any], str]] = entry.get("planned", [])
+
+    @property
+    def exists(self) -> bool:
+        """Whether a previous run was recorded."""
+        return bool(self.fingerprints)
+
+    def planned_cases(self) -> List[Union[TestCase, str]]:
+        """Get the planned test cases of the last run."""
+        return restore_cases(self._planned)
+
+    def select(
+        self,
+        test_cases: List[Union[TestCase, str]],
+        links: Dict[str, List[str]],
+        changed: Set[str],
+        sample: Optional[float] = None
+    ) -> Tuple[List[Union[TestCase, str]], Counter]:
+        """Choose the test cases of a `--changed-only` run.
+
+        Args:
+            test_cases (List): All test cases of the suite.
+            links (dict): The sections of each test case, by case key.
+            changed (Set[str]): Titles of the sections changed since the last run.
+            sample (float, optional): Share of the other test cases to run as
+                well, least recently run first. Defaults to `Settings.CHANGED_ONLY_SAMPLE`.
+
+        Returns:
+            Tuple[List, Counter]: The test cases to run, in suite order, and
+                the number chosen for each reason.
+        """
+        sample = settings.CHANGED_ONLY_SAMPLE if sample is None else sample
+        reasons: Dict[int, str] = {}
+        rest = []
+        for index, test_case in enumerate(test_cases):
+            key = case_key(test_case)
+            sections = links.get(key, [])
+            last = self.results.get(key)
+            if last is None:
+                reasons[index] = "new"
+            elif changed and (not sections or changed & set(sections)):
+                reasons[index] = "changed"
+            elif last["status"] != "PASSED":
+                reasons[index] = "failed"
+            else:
+                rest.append((last.get("run_at", 0), index))
+
+        for _, index in sorted(rest)[:math.ceil(len(rest) * max(0.0, min(1.0, sample)))]:
+            reasons[index] = "sampled"
+        return [test_cases[index] for index in sorted(reasons)], Counter(reasons.values())
+
+    def save(
+        self,
+        sections: RequirementSections,
+        planned: List[Union[TestCase, str]],
+        links: Dict[str, List[str]],
+        results: Dict[str, CaseResult]
+    ) -> None:
+        """Record a run.
+
+        Args:
+            sections (RequirementSections): The requirements the run was planned from.
+            planned (List): The planned test cases of the suite.
+            links (dict): The sections of every test case of the suite, by case key.
+            results (dict): The results of the executed test cases, by case key.
+                Test cases of the suite that did not run keep their last result.
+        """
+        now = time.time()
+        recorded = {key: self.results[key] for key in links if key in self.results}
+        recorded.update({key: {"status": result.status, "run_at": now} for key, result in results.items()})
+
+        self.fingerprints, self.links, self.results = dict(sections.fingerprints), dict(links), recorded
+        self._planned = dump_cases(planned)
+        get_history_store().set(self.key, {
+            "fingerprints": self.fingerprints,
+            "links": self.links,
+            "results": self.results,
+            "planned": self._planned,
+        })
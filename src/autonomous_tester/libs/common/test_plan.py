@@ -0,0 +1,169 @@
+"""Test plan schema and helpers for the autonomous tester.
+
+The planner writes its plan as a `TestPlan`, so the execution stage can take
+it case by case. API test cases that come with a complete request spec and
+expected results are run directly with the API tool, without the LLM.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Literal, Optional, Union
+from urllib.parse import urljoin
+
+from crewai.tasks.task_output import TaskOutput
+from pydantic import BaseModel, Field, ValidationError
+
+# A line that starts a test case, e.g. "**Test ID:** TC-01", "### Test Case 2",
+# "1. Test ID: TC001" or "- TC_003: Login with valid credentials".
+CASE_START = re.compile(
+    r"^[ \t#*>|\-\d.)]*(?:test\s*(?:case\s*)?id\b|test\s*case\s*#?\s*\d+|tc[\s_\-]*\d+\b)",
+    re.IGNORECASE | re.MULTILINE,
+)
+# A line that only labels a test case, e.g. "Test Case 3:" or "**TC-03**".
+CASE_LABEL = re.compile(r"^[ \t*>]*(?:test\s*case\s*#?\s*\d+|tc[\s_\-]*\d+)[\s*:]*$", re.IGNORECASE)
+TABLE_RULE = re.compile(r"^[\s|:\-]*$")
+
+
+def _is_heading(block: str) -> bool:
+    """Whether a block is only a case heading or table header, without case content."""
+    first, *rest = block.splitlines()
+    if rest:
+        return all(TABLE_RULE.match(line) for line in rest)
+    return first.lstrip().startswith("#") or bool(CASE_LABEL.match(first))
+
+
+def split_test_cases(plan: str) -> List[str]:
+    """Split a free-text test plan into its individual test cases.
+
+    Text before the first test case (such as an introduction) is dropped.
+
+    Args:
+        plan (str): The test plan written by the planner.
+
+    Returns:
+        List[str]: The text of each test case, in plan order. Empty if no
+            test case could be recognized.
+    """
+    starts = [match.start() for match in CASE_START.finditer(plan)]
+    if not starts:
+        return []
+
+    bounds = starts + [len(plan)]
+    cases, heading, table_header = [], "", ""
+    for start, end in zip(bounds, bounds[1:]):
+        block = plan[start:end].strip()
+        if not block:
+            continue
+        if _is_heading(block) and end != len(plan):
+            # e.g. "### Test Case 1" followed by "**Test ID:** TC-01": keep them together.
+            heading += block + "\n"
+            if block.startswith("|"):
+                table_header = heading
+            continue
+        if not heading and block.startswith("|"):
+            # Later rows of a test case table keep the column names.
+            heading = table_header
+        cases.append(heading + block)
+        heading = ""
+    return cases
+
+
+class APIRequestSpec(BaseModel):
+    """Request and expected response of an API test case."""
+
+    method: str = Field(default="GET", description="HTTP method, e.g. GET or POST.")
+    url: str = Field(description="Path relative to the application endpoint (e.g. /items/1), or an absolute URL.")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Request headers.")
+    params: Dict[str, str] = Field(default_factory=dict, description="URL query parameters.")
+    body: Optional[Union[Dict[str, Any], List[Any], str]] = Field(default=None, description="Request body.")
+    expected_status: Optional[int] = Field(default=None, description="Expected HTTP status code.")
+    expected_contains: Optional[str] = Field(default=None, description="Text the response body must contain.")
+    expected_json: Dict[str, Any] = Field(
+        default_factory=dict,
+        description=(
+            "Expected values of response JSON paths, e.g. {\"data.id\": 1}, "
+            "{\"items.length()\": 3} or {\"items[*].id.unique()\": true}."
+        ),
+    )
+
+    @property
+    def has_expectations(self) -> bool:
+        """Whether the spec says what a passing response looks like."""
+        return self.expected_status is not None or bool(self.expected_contains) or bool(self.expected_json)
+
+    def to_tool_input(self, endpoint: Optional[str] = None) -> Dict[str, Any]:
+        """Build the API tool input of the request.
+
+        Args:
+            endpoint (str, optional): Base URL that relative URLs are resolved against.
+        """
+        url = urljoin(endpoint.rstrip("/") + "/", self.url.lstrip("/")) if endpoint else self.url
+        validate: Dict[str, Any] = {}
+        if self.expected_status is not None:
+            validate["status_code"] = self.expected_status
+        if self.expected_contains:
+            validate["contains"] = self.expected_contains
+        if self.expected_json:
+            validate["json_path"] = self.expected_json
+
+        request: Dict[str, Any] = {"url": url, "method": self.method.upper(), "validate": validate}
+        if self.headers:
+            request["headers"] = self.headers
+        if self.params:
+            request["params"] = self.params
+        if self.body is not None:
+            request["body"] = self.body
+        return request
+
+
+class TestCase(BaseModel):
+    """A single test case of the test plan."""
+
+    id: str = Field(description="Test ID, e.g. TC-01.")
+    description: str = Field(description="What the test case verifies.")
+    pre_steps: List[str] = Field(default_factory=list, description="Preconditions before testing.")
+    steps: List[str] = Field(default_factory=list, description="Actions to perform the test.")
+    tool: Literal["browser", "api"] = Field(description="The tool that executes the test case.")
+    request: Optional[APIRequestSpec] = Field(
+        default=None,
+        description="For API test cases that are a single request: the request and its expected response.",
+    )
+
+    @property
+    def is_deterministic(self) -> bool:
+        """Whether the test case can be run by the API tool without the LLM."""
+        return self.tool == "api" and self.request is not None and self.request.has_expectations
+
+    def to_prompt(self) -> str:
+        """Get the compact text of the test case for the test specialist."""
+        return self.model_dump_json(exclude_none=True, exclude_defaults=True)
+
+
+class TestPlan(BaseModel):
+    """The test plan written by the test planner."""
+
+    test_cases: List[TestCase] = Field(description="The test cases of the plan.")
+
+
+def read_test_plan(output: TaskOutput) -> Optional[TestPlan]:
+    """Get the structured test plan of a planning task output.
+
+    Args:
+        output (TaskOutput): The planning task output, possibly restored from the plan cache.
+
+    Returns:
+        TestPlan: The test plan, or None if the planner did not produce a valid one.
+    """
+    if isinstance(output.pydantic, TestPlan):
+        return output.pydantic
+
+    candidates = [output.json_dict] if output.json_dict else []
+    candidates.append(output.raw)
+    for candidate in candidates:
+        try:
+            if isinstance(candidate, str):
+                return TestPlan.model_validate_json(candidate)
+            return TestPlan.model_validate(candidate)
+        except (ValidationError, json.JSONDecodeError):
+            continue
+    return None
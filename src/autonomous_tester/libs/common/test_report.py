@@ -0,0 +1,224 @@
+"""Test results and the local test report renderer.
+
+The tables, counts, defect list and timing statistics of the test report are
+built directly from the collected test case results. The report specialist
+only writes a short executive summary, from a digest whose size is bounded by
+`Settings.REPORT_SUMMARY_MAX_CHARS`, so reporting does not grow with the suite.
+"""
+
+import math
+import re
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel
+
+from autonomous_tester.libs.common.test_plan import TestCase
+
+STATUS = re.compile(r"status\W*(passed|failed|pass|fail)\b", re.IGNORECASE)
+TEST_ID = re.compile(r"test\s*id\W*([\w.\-]+)", re.IGNORECASE)
+DESCRIPTION = re.compile(r"description\W*(.+)", re.IGNORECASE)
+# Only a labelled line, e.g. "- **Defect:** ...", names the defect; the word may also
+# appear in descriptions or steps ("Verify the defect form opens").
+DEFECT = re.compile(r"^[\s>*\-]*defects?(?:\s+found)?[\s*]*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+NO_DEFECT = re.compile(r"^(none|n/?a|-|no defects?( found)?)\.?$", re.IGNORECASE)
+
+# Longest defect text kept in the report table and the summary digest.
+MAX_DEFECT_CHARS = 300
+
+
+class CaseResult(BaseModel):
+    """The result of one executed test case."""
+
+    id: str
+    description: str
+    status: Literal["PASSED", "FAILED"]
+    defect: Optional[str] = None
+    tool: Optional[str] = None
+    duration_ms: Optional[float] = None
+    response_time_ms: Optional[float] = None
+
+    @property
+    def passed(self) -> bool:
+        """Whether the test case passed."""
+        return self.status == "PASSED"
+
+    def to_text(self) -> str:
+        """Format the result like the test specialist reports it."""
+        lines = [f"- Test ID: {self.id}", f"- Description: {self.description}", f"- Status: {self.status}"]
+        if self.defect:
+            lines.append(f"- Defect: {self.defect}")
+        return "\n".join(lines)
+
+    @classmethod
+    def from_case(cls, test_case: TestCase, passed: bool, defect: Optional[str] = None, **kwargs) -> "CaseResult":
+        """Build the result of a planned test case."""
+        return cls(
+            id=test_case.id,
+            description=test_case.description,
+            status="PASSED" if passed else "FAILED",
+            defect=defect,
+            tool=test_case.tool,
+            **kwargs,
+        )
+
+    @classmethod
+    def from_text(cls, text: str, test_case: Optional[Union[TestCase, str]] = None, **kwargs) -> "CaseResult":
+        """Read the result of a test case from the test specialist's answer.
+
+        Args:
+            text (str): The answer of the test specialist.
+            test_case (TestCase | str, optional): The executed test case, which
+                provides the ID and description if the answer lacks them.
+            **kwargs: Further result fields, e.g. duration_ms.
+
+        Returns:
+            CaseResult: The result. An answer without a status counts as failed.
+        """
+        def search(pattern: re.Pattern, source: str) -> Optional[str]:
+            match = pattern.search(source)
+            return match.group(1).strip(" *`|") if match else None
+
+        case_text = test_case if isinstance(test_case, str) else ""
+        status = search(STATUS, text)
+        defect = search(DEFECT, text)
+        if defect and NO_DEFECT.match(defect):
+            defect = None
+        if status is None:
+            defect = defect or "The test result did not state a status"
+
+        if isinstance(test_case, TestCase):
+            return cls.from_case(test_case, status is not None and status.upper().startswith("PASS"), defect, **kwargs)
+        return cls(
+            id=search(TEST_ID, text) or search(TEST_ID, case_text) or "-",
+            description=search(DESCRIPTION, text) or search(DESCRIPTION, case_text) or case_text.strip()[:80],
+            status="PASSED" if status and status.upper().startswith("PASS") else "FAILED",
+            defect=defect,
+            **kwargs,
+        )
+
+
+def _cell(value: Optional[object]) -> str:
+    """Format a value as a Markdown table cell."""
+    if value is None or value == "":
+        return "-"
+    text = f"{value:.0f}" if isinstance(value, float) else str(value)
+    return " ".join(text.split()).replace("|", "\\|")
+
+
+def _shorten(text: str, limit: int = MAX_DEFECT_CHARS) -> str:
+    """Cut a text to at most `limit` characters."""
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Get a nearest-rank percentile of a non-empty list of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _timing_row(name: str, values: List[Optional[float]]) -> Optional[str]:
+    """Build a timing statistics table row, or None without measurements."""
+    measured = [value for value in values if value is not None]
+    if not measured:
+        return None
+    stats = [min(measured), sum(measured) / len(measured), _percentile(measured, 95), max(measured)]
+    return f"| {name} | {len(measured)} | " + " | ".join(f"{value:.0f}" for value in stats) + " |"
+
+
+def summary_digest(results: List[CaseResult], max_chars: int) -> str:
+    """Build the bounded input of the executive summary.
+
+    Args:
+        results (List[CaseResult]): The test case results.
+        max_chars (int): Longest digest to build.
+
+    Returns:
+        str: The pass/fail counts and as many failed test cases with their
+            defects as fit into `max_chars`.
+    """
+    failed = [result for result in results if not result.passed]
+    lines = [f"Test cases executed: {len(results)}, passed: {len(results) - len(failed)}, failed: {len(failed)}."]
+    if failed:
+        lines.append("Failed test cases:")
+
+    size = len(lines[0]) + len(lines[-1])
+    for shown, result in enumerate(failed):
+        line = f"- {result.id} {_shorten(result.description, 100)}: {_shorten(result.defect or 'no defect details')}"
+        if size + len(line) + 1 > max_chars:
+            lines.append(f"... and {len(failed) - shown} more failed test cases.")
+            break
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)[:max_chars]
+
+
+def render_report(results: List[CaseResult], summary: Optional[str] = None, skipped: int = 0) -> str:
+    """Render the Markdown test report of the test case results.
+
+    Args:
+        results (List[CaseResult]): The test case results, in plan order.
+        summary (str, optional): The executive summary written by the report specialist.
+        skipped (int): Test cases of the suite that were not run by a `--changed-only` run.
+
+    Returns:
+        str: The test report.
+    """
+    passed = sum(result.passed for result in results)
+    total_ms = [result.duration_ms for result in results if result.duration_ms is not None]
+    pass_rate = f"{passed / len(results):.0%}" if results else "-"
+
+    lines = ["# Test Report", ""]
+    if summary:
+        lines += ["## Executive Summary", "", summary.strip(), ""]
+
+    lines += [
+        "## Overview",
+        "",
+        "| Total | Passed | Failed | Pass rate |",
+        "|-------|--------|--------|-----------|",
+        f"| {len(results)} | {passed} | {len(results) - passed} | {pass_rate} |",
+        "",
+    ]
+    if skipped:
+        lines += [
+            f"Not run, because their requirement sections are unchanged and they passed last time: "
+            f"{skipped} test cases.",
+            "",
+        ]
+    lines += [
+        "## Results",
+        "",
+        "| Test ID | Description | Tool | Result | Duration (ms) | Defect |",
+        "|---------|-------------|------|--------|---------------|--------|",
+    ]
+    for result in results:
+        defect = _shorten(result.defect) if result.defect else None
+        lines.append(
+            f"| {_cell(result.id)} | {_cell(result.description)} | {_cell(result.tool)} | {result.status} "
+            f"| {_cell(result.duration_ms)} | {_cell(defect)} |"
+        )
+
+    defects = [result for result in results if not result.passed]
+    lines += ["", "## Defects", ""]
+    lines += [f"- **{result.id}** {result.description}: {result.defect or 'no defect details'}" for result in defects]
+    if not defects:
+        lines.append("No defects found.")
+
+    rows = [
+        _timing_row("Test case duration", [result.duration_ms for result in results]),
+        _timing_row("API response time", [result.response_time_ms for result in results]),
+    ]
+    rows = [row for row in rows if row]
+    if rows:
+        lines += [
+            "",
+            "## Timing (ms)",
+            "",
+            "| Measure | Count | Min | Mean | p95 | Max |",
+            "|---------|-------|-----|------|-----|-----|",
+            *rows,
+        ]
+    if total_ms:
+        lines += ["", f"Total test case time: {sum(total_ms) / 1000:.1f} s"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,197 @@
+"""Named authentication profiles of the API test tool.
+
+A profile describes how to obtain a token: a login request spec and the JSON
+path of the token in the login response. A request refers to a profile with
+`{"auth": {"type": "profile", "name": "admin"}}`; the token is fetched on first
+use, cached in memory until its TTL runs out, and fetched again when the
+server answers 401 to a request that used it.
+
+Profiles are loaded from the YAML (or JSON) file at `Settings.API_AUTH_PROFILES`,
+in which `${VAR}` references are replaced by environment variables, or
+registered at run time through the tool. The file is read on first use, so a
+missing or invalid file fails the requests that use profiles, not the import.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import yaml
+from pydantic import BaseModel, Field
+
+from autonomous_tester.libs import settings
+
+from .api_json_path import compile_path
+
+# Share of a token's lifetime, up to this many seconds, by which it is refreshed early.
+EXPIRY_MARGIN = 30.0
+
+
+class AuthProfile(BaseModel):
+    """How to log in and authenticate requests as one user."""
+
+    name: str
+    login: Dict[str, Any] = Field(description="Request spec of the login request; a relative URL is resolved against the request's URL.")
+    token_path: str = Field(default="access_token", description="JSON path of the token in the login response.")
+    header: str = Field(default="Authorization", description="Request header that carries the token.")
+    prefix: str = Field(default="Bearer ", description="Text put before the token in the header.")
+    ttl: Optional[float] = Field(default=None, description="Token lifetime in seconds. Defaults to `Settings.API_AUTH_TOKEN_TTL`.")
+    expires_in_path: Optional[str] = Field(default=None, description="JSON path of the token lifetime in the login response.")
+
+
+class AuthProfiles:
+    """Registry of auth profiles with an in-memory token cache."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the registry.
+
+        Args:
+            path (str, optional): Profiles file to load on first use. Defaults
+                to `Settings.API_AUTH_PROFILES`.
+        """
+        self.profiles: Dict[str, AuthProfile] = {}
+        self._tokens: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stats = {"hits": 0, "logins": 0, "refreshes": 0}
+        self._path = path
+        self._loaded = False
+
+    def _load(self) -> None:
+        """Load the profiles file, once.
+
+        Raises:
+            ValueError: If the file cannot be read or holds invalid profiles.
+                Loading is tried again on the next use.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            path = self._path or settings.API_AUTH_PROFILES
+            if path:
+                try:
+                    with open(path, "r") as file:
+                        profiles = yaml.safe_load(os.path.expandvars(file.read())) or {}
+                    self._add(profiles)
+                except (OSError, yaml.YAMLError, TypeError, ValueError, AttributeError) as e:
+                    raise ValueError(f"Cannot load auth profiles from {path}: {str(e)}")
+            self._loaded = True
+
+    def register(self, profiles: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Add or replace profiles.
+
+        Args:
+            profiles (dict): Profile definitions by name.
+
+        Returns:
+            List[str]: The names of the registered profiles.
+
+        Raises:
+            ValueError: If a definition is invalid, or the profiles file cannot
+                be loaded.
+        """
+        self._load()
+        return self._add(profiles)
+
+    def _add(self, profiles: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Parse profile definitions and replace the profiles and tokens of their names."""
+        parsed = {}
+        for name, definition in profiles.items():
+            profile = AuthProfile(name=name, **definition)
+            if str((profile.login.get("auth") or {}).get("type", "")).lower() == "profile":
+                raise ValueError(f"The login request of auth profile '{name}' cannot use an auth profile")
+            compile_path(profile.token_path)
+            parsed[name] = profile
+
+        with self._lock:
+            self.profiles.update(parsed)
+            for key in [key for key in self._tokens if key[0] in parsed]:
+                del self._tokens[key]
+        return list(parsed)
+
+    def _key(self, name: str, url: str) -> Tuple[AuthProfile, Tuple[str, str], str]:
+        """Get a profile, its cache key and its login URL for a request URL."""
+        self._load()
+        profile = self.profiles.get(name)
+        if profile is None:
+            raise ValueError(f"Unknown auth profile: {name}")
+        login_url = urljoin(url, profile.login.get("url", ""))
+        return profile, (name, login_url), login_url
+
+    def _login(self, profile: AuthProfile, login_url: str, send: Callable[[Dict[str, Any]], Any]) -> Tuple[str, float]:
+        """Send the login request of a profile and read the token and its expiry."""
+        result = send({**profile.login, "url": login_url})
+        if not result.success:
+            raise ValueError(
+                f"Login of auth profile '{profile.name}' failed: "
+                f"{result.error or f'status {result.status_code}'}"
+            )
+
+        token = compile_path(profile.token_path).evaluate(result.response_body)
+        if not isinstance(token, (str, int)) or token == "":
+            raise ValueError(f"No token at '{profile.token_path}' in the login response of auth profile '{profile.name}'")
+
+        ttl = profile.ttl or settings.API_AUTH_TOKEN_TTL
+        if profile.expires_in_path:
+            expires_in = compile_path(profile.expires_in_path).evaluate(result.response_body)
+            if isinstance(expires_in, (int, float)) and expires_in > 0:
+                ttl = float(expires_in)
+        return str(token), time.monotonic() + ttl - min(EXPIRY_MARGIN, ttl / 10)
+
+    def headers(self, name: str, url: str, send: Callable[[Dict[str, Any]], Any]) -> Dict[str, str]:
+        """Get the auth header of a profile, logging in if no valid token is cached.
+
+        Concurrent requests of a profile share a single login.
+
+        Args:
+            name (str): The profile name.
+            url (str): The URL of the request to authenticate.
+            send (Callable): Sends a request spec and returns its `APITestResult`.
+
+        Returns:
+            dict: The header that carries the token.
+
+        Raises:
+            ValueError: If the profile is unknown or the login fails.
+        """
+        profile, key, login_url = self._key(name, url)
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            with self._lock:
+                cached = self._tokens.get(key)
+                if cached is not None and cached[1] > time.monotonic():
+                    self._stats["hits"] += 1
+                    return {profile.header: profile.prefix + cached[0]}
+
+            token, expires_at = self._login(profile, login_url, send)
+            with self._lock:
+                self._stats["logins"] += 1
+                self._tokens[key] = (token, expires_at)
+        return {profile.header: profile.prefix + token}
+
+    def invalidate(self, name: str, url: str, headers: Dict[str, str]) -> None:
+        """Drop a token the server rejected, unless it was already replaced.
+
+        Args:
+            name (str): The profile name.
+            url (str): The URL of the rejected request.
+            headers (dict): The auth header the rejected request was sent with.
+        """
+        profile, key, _ = self._key(name, url)
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None and headers.get(profile.header) == profile.prefix + cached[0]:
+                del self._tokens[key]
+                self._stats["refreshes"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Get the token cache hits, logins and refreshes after a 401."""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,141 @@
+"""Record/replay cassette for the API test tool.
+
+In record mode every request/response pair is stored on disk under
+`Settings.STORAGE_DIR`. In replay mode stored responses are served back
+without touching the network, so repeat and offline runs need no live target.
+"""
+
+import base64
+import datetime
+import os
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.disk_cache import DiskCache, make_key
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+# Headers that vary between runs without changing what the server returns.
+IGNORED_HEADERS = {"user-agent", "accept-encoding", "connection", "content-length"}
+
+
+def _normalize_url(url: str, params: Optional[Dict[str, Any]]) -> str:
+    """Lower-case scheme and host, and merge query parameters in sorted order."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    for name, value in (params or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        query.extend((name, str(item)) for item in values)
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or "/",
+        urlencode(sorted(query)),
+        "",
+    ))
+
+
+def cassette_key(method: str, url: str, request_kwargs: Dict[str, Any]) -> str:
+    """Build the normalized cassette key of a prepared request.
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The request URL.
+        request_kwargs (dict): The `requests` keyword arguments of the request.
+
+    Returns:
+        str: A hash of method, URL, params, body and relevant headers.
+    """
+    headers = {
+        name.lower(): value
+        for name, value in (request_kwargs.get("headers") or {}).items()
+        if name.lower() not in IGNORED_HEADERS
+    }
+    auth = request_kwargs.get("auth")
+    if auth is not None:
+        headers["basic-auth-user"] = getattr(auth, "username", None)
+
+    body = request_kwargs.get("json", request_kwargs.get("data"))
+    return make_key(method.upper(), _normalize_url(url, request_kwargs.get("params")), body, headers)
+
+
+class Cassette:
+    """On-disk store of recorded API responses."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """Initialize the cassette.
+
+        Args:
+            directory (str, optional): Storage directory. Defaults to
+                `cassettes/` under `Settings.STORAGE_DIR`.
+            ttl (float, optional): Seconds before a recording expires.
+                Defaults to `Settings.API_CASSETTE_TTL` (0 keeps recordings forever).
+            max_bytes (int, optional): Size cap of the store.
+                Defaults to `Settings.API_CASSETTE_MAX_MB`.
+        """
+        self.store = DiskCache(
+            directory or os.path.join(settings.STORAGE_DIR, "cassettes"),
+            max_bytes=max_bytes or settings.API_CASSETTE_MAX_MB * 1024 * 1024,
+            ttl=settings.API_CASSETTE_TTL if ttl is None else ttl,
+        )
+
+    def record(
+        self,
+        key: str,
+        response: Union[requests.Response, httpx.Response],
+        response_time_ms: float,
+        phase_timings: Optional[Dict[str, Optional[float]]] = None,
+        content: Optional[bytes] = None
+    ) -> None:
+        """Store a response under its request key.
+
+        Args:
+            key (str): The cassette key of the request.
+            response: The completed response.
+            response_time_ms (float): The measured response time.
+            phase_timings (dict, optional): The measured phase timings.
+            content (bytes, optional): The body of a streamed response.
+                Defaults to the response content.
+        """
+        self.store.set(key, {
+            "url": str(response.url),
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "content": base64.b64encode(response.content if content is None else content).decode("ascii"),
+            "response_time_ms": response_time_ms,
+            "phase_timings": phase_timings or {},
+        })
+
+    def replay(self, key: str) -> Optional[Tuple[requests.Response, float, Dict[str, Optional[float]]]]:
+        """Load a recorded response.
+
+        Args:
+            key (str): The cassette key of the request.
+
+        Returns:
+            tuple: The rebuilt response with its recorded response time and phase
+                timings, or None if nothing was recorded for the key.
+        """
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+
+        response = requests.Response()
+        response.url = entry["url"]
+        response.status_code = entry["status_code"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        response._content = base64.b64decode(entry["content"])
+        response.elapsed = datetime.timedelta(milliseconds=entry["response_time_ms"])
+        return response, entry["response_time_ms"], entry["phase_timings"]
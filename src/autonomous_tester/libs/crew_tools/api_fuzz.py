@@ -0,0 +1,503 @@
+"""Property-based fuzzing of API endpoints for the API test tool.
+
+Starting from a valid seed request, thousands of mutated payloads are generated:
+boundary values, unicode, oversize strings, type confusion, missing and extra
+keys, and injection strings, guided by an optional JSON schema of the body.
+They are sent from concurrent workers over the tool's pooled connections.
+
+A response is a failure if it is a server error (5xx), the request did not
+complete, a validation failed, or its status is not among the expected ones.
+Failures are grouped by status code and response signature (the shape of the
+response and its error messages), and each group is shrunk to a minimal
+reproducing input: mutations that do not matter are reverted to the seed, and
+the remaining values are cut down while the failure still reproduces. Only the
+groups are returned, not the individual responses.
+"""
+
+import copy
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .api_output import dumps, summarize_body
+
+BOUNDARY_INTEGERS = (0, -1, 1, 2**31 - 1, -2**31, 2**31, 2**53 + 1, 2**63, -2**63 - 1)
+BOUNDARY_NUMBERS = (0.0, -0.0, 1e-308, 1.7976931348623157e308, -1.7976931348623157e308, 0.30000000000000004)
+UNICODE_STRINGS = (
+    "\u00fc", "\u03a9\u2248\u00e7\u221a\u222b", "\U0001f600", "\U0001f469\u200d\U0001f469\u200d\U0001f467",
+    "\u202eevil", "e\u0301", "\u0000", "\ufeff", "\U0001d54f\U0001d550", "\u4e2d\u6587", "\u0645\u0631\u062d\u0628\u0627",
+)
+INJECTION_STRINGS = (
+    "' OR '1'='1", "\"; DROP TABLE users; --", "<script>alert(1)</script>", "../../../../etc/passwd",
+    "%s%s%s%n", "{{7*7}}", "${7*7}", "\r\nX-Injected: 1",
+)
+OVERSIZE_LENGTHS = (256, 4096, 65536)
+TYPE_CONFUSION = (None, True, False, 0, -1, 1.5, "", "0", "true", "null", [], {}, [None], {"": None})
+MUTATION_KINDS = ("boundary", "unicode", "oversize", "type", "missing", "extra", "injection")
+
+# Keys of error responses whose text tells failures apart.
+MESSAGE_KEYS = {"detail", "message", "error", "errors", "msg", "type", "code", "title", "reason"}
+DIGITS = re.compile(r"\d+")
+
+MAX_GROUPS = 20
+MAX_SIGNATURE_CHARS = 200
+MAX_EXAMPLE_BYTES = 1000
+# Largest body kept from a fuzzed response, enough for its signature.
+FUZZ_BODY_BYTES = 64 * 1024
+
+
+class FuzzGroup(BaseModel):
+    """A group of failures with the same status and response signature."""
+    status_code: int
+    signature: str
+    count: int
+    changes: Dict[str, Any] = Field(default_factory=dict)
+    body: Optional[Any] = None
+    params: Dict[str, Any] = Field(default_factory=dict)
+    response: Optional[str] = None
+    shrink_requests: int = 0
+
+
+class FuzzResult(BaseModel):
+    """Model for fuzzing results."""
+    success: bool
+    requests: int
+    failures: int
+    duration_s: float
+    throughput_rps: float
+    status_codes: Dict[str, int]
+    groups: List[FuzzGroup] = Field(default_factory=list)
+    omitted_groups: int = 0
+    stopped: Optional[str] = None
+
+
+def _skeleton(value: Any, depth: int = 0) -> Any:
+    """Reduce a response body to its shape and error messages."""
+    if depth > 6:
+        return "..."
+    if isinstance(value, dict):
+        return {
+            key: (DIGITS.sub("#", item)[:80] if key in MESSAGE_KEYS and isinstance(item, str) else _skeleton(item, depth + 1))
+            for key, item in sorted(value.items())
+        }
+    if isinstance(value, list):
+        return [_skeleton(value[0], depth + 1)] if value else []
+    return type(value).__name__
+
+
+def signature(result: Any) -> str:
+    """Get the response signature of an API test result.
+
+    Args:
+        result (APITestResult): The result of a fuzzed request.
+
+    Returns:
+        str: The shape of the response body with its error messages, or the
+            normalized error of a request that did not complete.
+    """
+    if result.error:
+        return "error: " + DIGITS.sub("#", result.error.split(":")[0])[:MAX_SIGNATURE_CHARS]
+    body = result.response_body
+    text = dumps(_skeleton(body)) if isinstance(body, (dict, list)) else DIGITS.sub("#", str(body or ""))
+    return text[:MAX_SIGNATURE_CHARS]
+
+
+def _get(value: Any, path: Tuple[Any, ...]) -> Any:
+    for part in path:
+        value = value[part]
+    return value
+
+
+def _set(value: Any, path: Tuple[Any, ...], new: Any) -> Any:
+    """Set the value at a path, returning the new root."""
+    if not path:
+        return new
+    _get(value, path[:-1])[path[-1]] = new
+    return value
+
+
+def _delete(value: Any, path: Tuple[Any, ...]) -> Any:
+    """Delete the value at a path, returning the new root."""
+    parent = _get(value, path[:-1])
+    del parent[path[-1]]
+    return value
+
+
+def _has(value: Any, path: Tuple[Any, ...]) -> bool:
+    try:
+        _get(value, path)
+        return True
+    except (KeyError, IndexError, TypeError):
+        return False
+
+
+def _paths(value: Any, path: Tuple[Any, ...] = (), depth: int = 0) -> Iterator[Tuple[Any, ...]]:
+    """List the paths of a JSON value: the value itself, then its members."""
+    yield path
+    if depth >= 4:
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _paths(item, path + (key,), depth + 1)
+    elif isinstance(value, list) and value:
+        yield from _paths(value[0], path + (0,), depth + 1)
+
+
+def _diff(a: Any, b: Any, path: Tuple[Any, ...] = ()) -> Iterator[Tuple[Any, ...]]:
+    """List the paths at which two JSON values differ."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in list(a) + [key for key in b if key not in a]:
+            if key not in a or key not in b:
+                yield path + (key,)
+            else:
+                yield from _diff(a[key], b[key], path + (key,))
+    elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for index, (x, y) in enumerate(zip(a, b)):
+            yield from _diff(x, y, path + (index,))
+    elif type(a) is not type(b) or a != b:
+        yield path
+
+
+def _label(section: str, path: Tuple[Any, ...]) -> str:
+    """Format a payload path such as `body.items.0.name`."""
+    return ".".join([section, *map(str, path)])
+
+
+class FuzzRunner:
+    """Generate mutated payloads, send them concurrently, and group and shrink the failures."""
+
+    def __init__(
+        self,
+        execute: Callable[[Dict[str, Any]], Any],
+        iterations: int,
+        concurrency: int = 8,
+        seed: int = 0,
+        schema: Optional[Dict[str, Any]] = None,
+        expected_status: Optional[List[int]] = None,
+        shrink_requests: int = 50
+    ):
+        """Initialize the fuzz runner.
+
+        Args:
+            execute (Callable): Executes one request spec and returns an APITestResult.
+            iterations (int): Number of mutated requests to send.
+            concurrency (int): Number of concurrent workers.
+            seed (int): Seed of the payload generator, so a run can be repeated.
+            schema (dict, optional): JSON schema of the request body.
+            expected_status (List[int], optional): Statuses that are not
+                failures; without it every status below 500 is accepted.
+            shrink_requests (int): Most requests spent shrinking each group.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.execute = execute
+        self.iterations = iterations
+        self.concurrency = concurrency
+        self.seed = seed
+        self.schema = schema or {}
+        self.expected_status = set(expected_status or [])
+        self.shrink_requests = shrink_requests
+
+        self._lock = threading.Lock()
+        self._payloads: Optional[Iterator[Dict[str, Any]]] = None
+        self._statuses: Counter = Counter()
+        self._groups: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        self._sent = 0
+        self._failures = 0
+        self._stopped: Optional[str] = None
+
+    # Payload generation
+
+    def _field_schema(self, path: Tuple[Any, ...]) -> Dict[str, Any]:
+        """Get the schema of a body path, if a schema was given."""
+        schema = self.schema
+        for part in path:
+            if isinstance(part, int):
+                schema = schema.get("items", {}) if isinstance(schema, dict) else {}
+            else:
+                schema = (schema.get("properties") or {}).get(part, {}) if isinstance(schema, dict) else {}
+        return schema if isinstance(schema, dict) else {}
+
+    def _value(self, kind: str, current: Any, schema: Dict[str, Any], rng: random.Random) -> Tuple[Any, str]:
+        """Build a mutated value of one kind, with a description of it."""
+        if kind == "boundary":
+            if isinstance(current, bool):
+                kind = "type"
+            elif isinstance(current, int):
+                candidates = list(BOUNDARY_INTEGERS)
+                candidates += [schema[key] + step for key, step in (("minimum", -1), ("maximum", 1)) if key in schema]
+                value = rng.choice(candidates)
+                return value, f"boundary integer {value}"
+            elif isinstance(current, float):
+                value = rng.choice(BOUNDARY_NUMBERS)
+                return value, f"boundary number {value}"
+            elif isinstance(current, str):
+                lengths = [0, 1]
+                lengths += [schema[key] + step for key, step in (("minLength", -1), ("maxLength", 1)) if key in schema]
+                length = max(0, rng.choice(lengths))
+                return "a" * length if length else rng.choice(("", " ")), f"boundary string of {length} chars"
+            elif isinstance(current, list):
+                value = [] if rng.random() < 0.5 else (current[:1] or [None]) * 1000
+                return value, f"boundary list of {len(value)} items"
+            else:
+                kind = "type"
+        if kind == "unicode":
+            text = rng.choice(UNICODE_STRINGS)
+            value = f"{current}{text}" if isinstance(current, str) and rng.random() < 0.5 else text
+            return value, f"unicode string {value!r}"
+        if kind == "oversize":
+            length = rng.choice(OVERSIZE_LENGTHS)
+            return rng.choice("AZ9ü") * length, f"oversize string of {length} chars"
+        if kind == "injection":
+            value = rng.choice(INJECTION_STRINGS)
+            return value, f"injection string {value!r}"
+        options = [value for value in TYPE_CONFUSION if type(value) is not type(current)]
+        value = copy.deepcopy(rng.choice(options))
+        return value, f"type confusion {dumps(value)}"
+
+    def _mutate(self, payload: Dict[str, Any], rng: random.Random) -> Optional[str]:
+        """Apply one random mutation to a payload in place."""
+        body_paths = list(_paths(payload["body"])) if payload["body"] is not None else []
+        targets = [("body", path) for path in body_paths]
+        targets += [("params", (name,)) for name in payload["params"]]
+        if not targets:
+            return None
+
+        section, path = rng.choice(targets)
+        kind = rng.choice(MUTATION_KINDS)
+        root = payload[section]
+        current = _get(root, path) if _has(root, path) else None
+
+        if kind == "missing":
+            if path and isinstance(_get(root, path[:-1]), dict):
+                required = self._field_schema(path[:-1]).get("required") if section == "body" else None
+                if required:
+                    parent = _get(root, path[:-1])
+                    present = [key for key in required if key in parent]
+                    path = path[:-1] + (rng.choice(present),) if present else path
+                _delete(root, path)
+                return f"{_label(section, path)}: removed"
+            kind = "type"
+        if kind == "extra":
+            container = path if isinstance(current, dict) else path[:-1]
+            if _has(root, container) and isinstance(_get(root, container), dict):
+                value, description = self._value(rng.choice(("type", "oversize", "injection")), None, {}, rng)
+                _get(root, container)["__fuzz__"] = value if section == "body" or isinstance(value, str) else dumps(value)
+                return f"{_label(section, container + ('__fuzz__',))}: added {description}"
+            kind = "type"
+
+        value, description = self._value(kind, current, self._field_schema(path) if section == "body" else {}, rng)
+        if section == "params":
+            value = value if isinstance(value, str) else dumps(value)
+        payload[section] = _set(root, path, value)
+        return f"{_label(section, path)}: {description}"
+
+    def _generate(self, seed_payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Generate the mutated payloads of the run."""
+        rng = random.Random(self.seed)
+        for index in range(self.iterations):
+            payload = copy.deepcopy(seed_payload)
+            mutations = [self._mutate(payload, rng) for _ in range(rng.choice((1, 1, 1, 2, 3)))]
+            payload["mutations"] = [mutation for mutation in mutations if mutation]
+            payload["index"] = index
+            yield payload
+
+    # Execution
+
+    def _spec(self, spec: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the request spec of a payload."""
+        fuzzed = {**spec, "params": payload["params"]}
+        body = payload["body"]
+        if isinstance(body, (dict, list)):
+            fuzzed["body"] = body
+        elif "body" in spec or body is not None:
+            # The tool sends any other body as raw text, so a replaced JSON root is encoded here.
+            fuzzed["body"] = dumps(body)
+            fuzzed["headers"] = {**(spec.get("headers") or {}), "Content-Type": "application/json"}
+        return fuzzed
+
+    def _is_failure(self, result: Any) -> bool:
+        """Whether a response is a failure."""
+        if result.status_code == 0 or result.status_code >= 500:
+            return True
+        if self.expected_status and result.status_code not in self.expected_status:
+            return True
+        return any("✗" in validation for validation in result.validations)
+
+    def _record(self, payload: Dict[str, Any], result: Any) -> None:
+        """Count a result and keep the smallest failing payload of its group."""
+        failed = self._is_failure(result)
+        key = (result.status_code, signature(result)) if failed else None
+        # Ties go to the earliest payload, so a seeded run keeps the same examples whatever the concurrency.
+        size = (len(dumps([payload["body"], payload["params"]])), payload.get("index", 0))
+        with self._lock:
+            self._sent += 1
+            self._statuses[str(result.status_code)] += 1
+            if not failed:
+                return
+            self._failures += 1
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = {"count": 0, "payload": payload, "size": size, "result": result}
+            group["count"] += 1
+            if size < group["size"]:
+                group.update(payload=payload, size=size, result=result)
+            if result.error and result.error.startswith("Circuit open"):
+                self._stopped = result.error
+
+    def _worker(self, spec: Dict[str, Any]) -> None:
+        """Send payloads until the generator is exhausted or the run is stopped."""
+        while True:
+            with self._lock:
+                if self._stopped is not None:
+                    return
+                payload = next(self._payloads, None)
+            if payload is None:
+                return
+            self._record(payload, self._send(self._spec(spec, payload)))
+
+    def _send(self, spec: Dict[str, Any]) -> Any:
+        """Send a fuzzed request, sending it once more if it did not complete.
+
+        A server that crashes on one payload often drops pooled connections
+        that other requests were about to reuse; the second attempt tells those
+        apart from payloads that really break the connection.
+        """
+        result = self.execute(spec)
+        if result.status_code == 0 and not (result.error or "").startswith("Circuit open"):
+            result = self.execute(spec)
+        return result
+
+    # Shrinking
+
+    def _simplifications(self, payload: Dict[str, Any], seed_payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """List simpler variants of a payload: reverted mutations first, then smaller values."""
+        differences = [
+            (section, path)
+            for section in ("body", "params")
+            for path in _diff(payload[section], seed_payload[section])
+        ]
+        for section, path in differences:
+            candidate = copy.deepcopy(payload)
+            if _has(seed_payload[section], path):
+                if path and not _has(candidate[section], path[:-1]):
+                    continue
+                candidate[section] = _set(candidate[section], path, copy.deepcopy(_get(seed_payload[section], path)))
+            else:
+                candidate[section] = _delete(candidate[section], path)
+            yield candidate
+
+        for section, path in differences:
+            if not _has(payload[section], path):
+                continue
+            value = _get(payload[section], path)
+            if isinstance(value, (str, list)) and len(value) > 1:
+                length = len(value)
+                smaller = [value[:size] for size in dict.fromkeys((1, length // 2, length * 3 // 4, length * 7 // 8)) if 0 < size < length]
+            elif isinstance(value, int) and not isinstance(value, bool) and abs(value) > 1:
+                sign = 1 if value > 0 else -1
+                smaller = [sign] + [sign * (abs(value) >> shift) for shift in (1, 2, 3) if abs(value) >> shift > 1]
+            else:
+                continue
+            for item in smaller:
+                candidate = copy.deepcopy(payload)
+                candidate[section] = _set(candidate[section], path, item)
+                yield candidate
+
+    def _shrink(self, spec: Dict[str, Any], key: Tuple[int, str], seed_payload: Dict[str, Any]) -> FuzzGroup:
+        """Shrink the smallest failing payload of a group while its failure still reproduces."""
+        group = self._groups[key]
+        payload, result = group["payload"], group["result"]
+        spent = 0
+        improved = True
+        while improved and spent < self.shrink_requests:
+            improved = False
+            for candidate in self._simplifications(payload, seed_payload):
+                if spent >= self.shrink_requests:
+                    break
+                spent += 1
+                candidate_result = self._send(self._spec(spec, candidate))
+                if self._is_failure(candidate_result) and (candidate_result.status_code, signature(candidate_result)) == key:
+                    payload, result = candidate, candidate_result
+                    improved = True
+                    break
+
+        return self._group(key, payload, result, seed_payload, spent)
+
+    def _group(
+        self,
+        key: Tuple[int, str],
+        payload: Dict[str, Any],
+        result: Any,
+        seed_payload: Dict[str, Any],
+        shrink_requests: int = 0
+    ) -> FuzzGroup:
+        """Describe a failure group by its reproducing input, as changes to the seed."""
+        changes = {}
+        for section in ("body", "params"):
+            for path in _diff(payload[section], seed_payload[section]):
+                value = _get(payload[section], path) if _has(payload[section], path) else "<removed>"
+                changes[_label(section, path)] = summarize_body(value, 200)[0]
+
+        response = result.error or dumps(result.response_body)
+        return FuzzGroup(
+            status_code=key[0],
+            signature=key[1],
+            count=self._groups[key]["count"],
+            changes=changes,
+            body=summarize_body(payload["body"], MAX_EXAMPLE_BYTES)[0],
+            params=payload["params"],
+            response=response[:300],
+            shrink_requests=shrink_requests,
+        )
+
+    def run(self, spec: Dict[str, Any]) -> FuzzResult:
+        """Fuzz a request spec and summarise the failure groups.
+
+        Args:
+            spec (dict): The seed request spec; its body and query parameters are mutated.
+
+        Returns:
+            FuzzResult: Request counts, statuses and the shrunk failure groups.
+        """
+        seed_payload = {"body": copy.deepcopy(spec.get("body")), "params": dict(spec.get("params") or {})}
+        if not isinstance(seed_payload["body"], (dict, list)) and not seed_payload["params"]:
+            raise ValueError("Fuzzing needs a JSON request body or query parameters to mutate")
+        self._payloads = self._generate(seed_payload)
+
+        started = time.monotonic()
+        workers = [threading.Thread(target=self._worker, args=(spec,), daemon=True) for _ in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.monotonic() - started
+
+        # Server errors and requests that did not complete come first, then the most frequent groups.
+        keys = sorted(self._groups, key=lambda key: (0 < key[0] < 500, -self._groups[key]["count"]))[:MAX_GROUPS]
+        if self._stopped is not None or not keys:
+            # The target stopped answering, so failures could not be reproduced.
+            groups = [
+                self._group(key, self._groups[key]["payload"], self._groups[key]["result"], seed_payload)
+                for key in keys
+            ]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(keys))) as executor:
+                groups = list(executor.map(lambda key: self._shrink(spec, key, seed_payload), keys))
+
+        return FuzzResult(
+            success=self._failures == 0,
+            requests=self._sent,
+            failures=self._failures,
+            duration_s=round(elapsed, 3),
+            throughput_rps=round(self._sent / elapsed, 2) if elapsed > 0 else 0.0,
+            status_codes=dict(self._statuses),
+            groups=groups,
+            stopped=self._stopped,
+        )
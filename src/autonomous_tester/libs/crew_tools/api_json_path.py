@@ -0,0 +1,452 @@
+"""Compiled JSON path expressions for API response validation.
+
+Paths extend the dot notation of `json_path` validations:
+
+- `data.items.0.id` or `data.items[0].id`: keys and list indexes (`[-1]` counts from the end)
+- `data.*` or `items[*]`: every value of an object or list
+- `items[1:5]`, `items[::2]`: list slices
+- `items[?(@.status == "active")]`, `items[?(@.price > 10)]`, `items[?(@.email)]`:
+  items whose field compares to a JSON literal with `==`, `!=`, `<`, `<=`, `>`, `>=`,
+  or whose field exists
+- `items.length()`, `items[*].id.unique()`, `items[*].price.min()`: a function
+  at the end of the path (`length`, `unique`, `min`, `max`, `sum`)
+
+A path with a wildcard, slice or filter selects a list of matches; other paths
+select a single value, or None if it does not exist. Expressions are compiled
+once and cached, and the paths of a validation are evaluated together over a
+whole batch of responses, so shared prefixes are walked only once per batch.
+
+A `Collector` builds the result of a path from the elements of its container
+one at a time (e.g. from a streamed body), folding the function in as the
+matches arrive, so the container is never held in memory.
+"""
+
+import json
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+
+def _unique(values: Any) -> bool:
+    """Whether all values of a list are distinct."""
+    encoded = [json.dumps(value, sort_keys=True) for value in values]
+    return len(set(encoded)) == len(encoded)
+
+
+FUNCTIONS: Dict[str, Callable[[Any], Any]] = {
+    "length": len,
+    "unique": _unique,
+    "min": min,
+    "max": max,
+    "sum": sum,
+}
+
+SEGMENT = re.compile(
+    r"""
+    \.?\*(?![\w(])                                   # wildcard: .* or *
+    | \[\*\]                                         # wildcard: [*]
+    | \[\?\((?P<filter>[^\]]*)\)\]                   # filter: [?(@.field op literal)]
+    | \[(?P<start>-?\d*):(?P<stop>-?\d*)(?::(?P<step>-?\d*))?\]   # slice: [a:b:c]
+    | \[(?P<index>-?\d+)\]                           # index: [3]
+    | \[(?P<quote>['"])(?P<quoted>.*?)(?P=quote)\]   # quoted key: ['a.b']
+    | \.?(?P<function>[A-Za-z_]\w*)\(\)$             # function: .length()
+    | \.?(?P<key>[^.\[\]]+)                          # key: .name
+    """,
+    re.VERBOSE,
+)
+FILTER = re.compile(r"^\s*@(?P<field>(?:\.[^\s.=!<>]+)*)\s*(?:(?P<op>==|!=|<=|>=|<|>)\s*(?P<literal>.+?))?\s*$")
+
+
+class Step:
+    """One step of a compiled path."""
+
+    multi = False
+    # Whether the step can pick the elements of a container one at a time.
+    elementwise = False
+
+    def apply(self, value: Any) -> List[Any]:
+        """Get the values this step selects from a value."""
+        raise NotImplementedError
+
+    def selects(self, key: Any, item: Any) -> bool:
+        """Whether the step selects one element of a container, given its key or list index."""
+        raise NotImplementedError
+
+
+class Key(Step):
+    """An object key, or a list index written as a dotted key."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def apply(self, value: Any) -> List[Any]:
+        if isinstance(value, dict):
+            return [value[self.name]] if self.name in value else []
+        if isinstance(value, list) and self.name.isdigit():
+            index = int(self.name)
+            return [value[index]] if index < len(value) else []
+        return []
+
+
+class Index(Step):
+    """A list index, negative from the end."""
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def apply(self, value: Any) -> List[Any]:
+        if isinstance(value, list) and -len(value) <= self.index < len(value):
+            return [value[self.index]]
+        return []
+
+
+class Wildcard(Step):
+    """Every value of an object or list."""
+
+    multi = True
+    elementwise = True
+
+    def apply(self, value: Any) -> List[Any]:
+        if isinstance(value, dict):
+            return list(value.values())
+        return list(value) if isinstance(value, list) else []
+
+    def selects(self, key: Any, item: Any) -> bool:
+        return True
+
+
+class Slice(Step):
+    """A slice of a list."""
+
+    multi = True
+
+    def __init__(self, start: Optional[int], stop: Optional[int], step: Optional[int]):
+        self.slice = slice(start, stop, step)
+        # Only slices that need not know the length of the list.
+        self.elementwise = all(bound is None or bound >= 0 for bound in (start, stop)) and (step is None or step > 0)
+
+    def apply(self, value: Any) -> List[Any]:
+        return value[self.slice] if isinstance(value, list) else []
+
+    def selects(self, key: Any, item: Any) -> bool:
+        start, stop, step = self.slice.start or 0, self.slice.stop, self.slice.step or 1
+        return isinstance(key, int) and key >= start and (stop is None or key < stop) and (key - start) % step == 0
+
+
+class Filter(Step):
+    """The values of an object or list whose field matches a condition."""
+
+    multi = True
+    elementwise = True
+
+    def __init__(self, field: Tuple[Step, ...], compare: Optional[Callable[[Any, Any], bool]], literal: Any):
+        self.field = field
+        self.compare = compare
+        self.literal = literal
+
+    def _matches(self, item: Any) -> bool:
+        values = [item]
+        for step in self.field:
+            values = [selected for value in values for selected in step.apply(value)]
+        if not values:
+            return False
+        if self.compare is None:
+            return True
+        try:
+            return bool(self.compare(values[0], self.literal))
+        except TypeError:
+            return False
+
+    def apply(self, value: Any) -> List[Any]:
+        items = value.values() if isinstance(value, dict) else value if isinstance(value, list) else []
+        return [item for item in items if self._matches(item)]
+
+    def selects(self, key: Any, item: Any) -> bool:
+        return self._matches(item)
+
+
+def _literal(text: str) -> Any:
+    """Parse a filter literal: JSON, or a single-quoted string."""
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        return text[1:-1]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError(f"Invalid literal in JSON path filter: {text}")
+
+
+def _filter(expression: str) -> Filter:
+    """Compile a filter expression such as `@.price > 10`."""
+    match = FILTER.match(expression)
+    if match is None:
+        raise ValueError(f"Invalid JSON path filter: {expression}")
+    field = tuple(Key(name) for name in match.group("field").split(".")[1:])
+    op = match.group("op")
+    literal = _literal(match.group("literal")) if op else None
+    return Filter(field, COMPARISONS[op] if op else None, literal)
+
+
+class CompiledPath:
+    """A parsed JSON path, ready to be evaluated against many documents."""
+
+    def __init__(self, expression: str, steps: Tuple[Step, ...], function: Optional[str] = None):
+        self.expression = expression
+        self.steps = steps
+        self.function = function
+        self.multi = any(step.multi for step in steps)
+
+    @property
+    def prefix(self) -> Tuple[str, ...]:
+        """The leading plain keys and indexes of the path, as dotted path parts."""
+        parts = []
+        for step in self.steps:
+            if isinstance(step, Key):
+                parts.append(step.name)
+            elif isinstance(step, Index) and step.index >= 0:
+                parts.append(str(step.index))
+            else:
+                break
+        return tuple(parts)
+
+    @property
+    def streams_elements(self) -> bool:
+        """Whether the step after the prefix picks the elements of its container one at a time."""
+        start = len(self.prefix)
+        return start < len(self.steps) and self.steps[start].elementwise
+
+    def finish(self, values: List[Any]) -> Any:
+        """Turn the selected values into the result of the path."""
+        result = values if self.multi else (values[0] if values else None)
+        if self.function is None:
+            return result
+        try:
+            return FUNCTIONS[self.function](result)
+        except (TypeError, ValueError):
+            return None
+
+    def select(self, data: Any, start: int = 0) -> List[Any]:
+        """Get the values the steps of the path select, before any function.
+
+        Args:
+            data: The parsed JSON document.
+            start (int): Number of leading steps already applied to `data`.
+        """
+        values = [data]
+        for step in self.steps[start:]:
+            values = [selected for value in values for selected in step.apply(value)]
+        return values
+
+    def evaluate(self, data: Any, start: int = 0) -> Any:
+        """Evaluate the path against a document.
+
+        Args:
+            data: The parsed JSON document.
+            start (int): Number of leading steps already applied to `data`.
+
+        Returns:
+            The selected value, the list of matches of a multi-value path,
+            or the function result.
+        """
+        return self.finish(self.select(data, start))
+
+
+class Collector:
+    """The result of a path, built from the elements of its container one at a time.
+
+    For paths whose step after the prefix picks elements one by one (see
+    `CompiledPath.streams_elements`). Only the matches are kept, and not even
+    those when the path ends in a function: `length()`, `sum()`, `min()`,
+    `max()` and `unique()` are folded in as the matches arrive.
+    """
+
+    def __init__(self, path: CompiledPath):
+        """Initialize the collector.
+
+        Args:
+            path (CompiledPath): The path, with `streams_elements` set.
+        """
+        self.path = path
+        self._start = len(path.prefix)
+        self._matches: List[Any] = []
+        self._count = 0
+        self._total: Any = 0
+        self._best: Any = None
+        self._seen: set = set()
+        self._unique = True
+        self._failed = False
+
+    def add(self, key: Any, item: Any) -> None:
+        """Take the next element of the container.
+
+        Args:
+            key: The element's list index or object key.
+            item: The element.
+        """
+        if not self.path.steps[self._start].selects(key, item):
+            return
+        for value in self.path.select(item, self._start + 1):
+            self._fold(value)
+
+    def _fold(self, value: Any) -> None:
+        """Fold one match into the result, as `FUNCTIONS` would over the list of matches."""
+        function = self.path.function
+        if function is None:
+            self._matches.append(value)
+        elif function == "unique":
+            encoded = json.dumps(value, sort_keys=True)
+            self._unique = self._unique and encoded not in self._seen
+            self._seen.add(encoded)
+        elif function in ("sum", "min", "max") and not self._failed:
+            try:
+                if function == "sum":
+                    self._total = self._total + value
+                elif not self._count or (value < self._best if function == "min" else value > self._best):
+                    self._best = value
+            except TypeError:
+                self._failed = True
+        self._count += 1
+
+    def result(self) -> Any:
+        """Get the result of the path over the elements taken so far."""
+        function = self.path.function
+        if function is None:
+            return self._matches
+        if function == "length":
+            return self._count
+        if function == "unique":
+            return self._unique
+        if self._failed or (function != "sum" and not self._count):
+            return None
+        return self._total if function == "sum" else self._best
+
+
+@lru_cache(maxsize=1024)
+def compile_path(expression: str) -> CompiledPath:
+    """Compile a JSON path expression.
+
+    Args:
+        expression (str): The path, optionally starting with `$`.
+
+    Returns:
+        CompiledPath: The compiled path, cached per expression.
+
+    Raises:
+        ValueError: If the expression is not a valid path.
+    """
+    text = expression.strip()
+    text = text[1:] if text.startswith("$") else text
+    steps: List[Step] = []
+    function = None
+    position = 0
+    while position < len(text):
+        match = SEGMENT.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid JSON path: {expression}")
+        position = match.end()
+
+        groups = match.groupdict()
+        if groups["filter"] is not None:
+            steps.append(_filter(groups["filter"]))
+        elif groups["index"] is not None:
+            steps.append(Index(int(groups["index"])))
+        elif groups["start"] is not None:
+            bounds = [int(value) if value else None for value in (groups["start"], groups["stop"], groups["step"])]
+            if bounds[2] == 0:
+                raise ValueError(f"Invalid JSON path slice step: {expression}")
+            steps.append(Slice(*bounds))
+        elif groups["quoted"] is not None:
+            steps.append(Key(groups["quoted"]))
+        elif groups["function"] is not None:
+            if groups["function"] not in FUNCTIONS:
+                raise ValueError(f"Unknown JSON path function: {groups['function']}()")
+            function = groups["function"]
+        elif groups["key"] is not None:
+            steps.append(Key(groups["key"]))
+        else:
+            steps.append(Wildcard())
+    return CompiledPath(expression, tuple(steps), function)
+
+
+class PathSet:
+    """Several compiled paths evaluated in a single walk over a batch of documents.
+
+    Paths are merged into a tree of their steps, and every node of the tree is
+    applied once to the values of all documents, so a prefix shared by several
+    paths is walked once per batch.
+    """
+
+    def __init__(self, expressions: Iterable[str]):
+        """Compile the paths.
+
+        Raises:
+            ValueError: If an expression is not a valid path.
+        """
+        self.paths = {expression: compile_path(expression) for expression in expressions}
+        self._tree: Dict[str, Any] = {"ends": [], "children": {}}
+        for expression, path in self.paths.items():
+            node = self._tree
+            for step in path.steps:
+                key = _step_key(step)
+                node = node["children"].setdefault(key, {"step": step, "ends": [], "children": {}})
+            node["ends"].append(expression)
+
+    def _walk(self, node: Dict[str, Any], values: List[Tuple[int, Any]], results: List[Dict[str, Any]]) -> None:
+        """Apply a node of the tree to the selected values, each tagged with the index of its document."""
+        for expression in node["ends"]:
+            matches: List[List[Any]] = [[] for _ in results]
+            for document, value in values:
+                matches[document].append(value)
+            for document, selected in enumerate(matches):
+                results[document][expression] = self.paths[expression].finish(selected)
+        for child in node["children"].values():
+            step = child["step"]
+            self._walk(child, [(document, item) for document, value in values for item in step.apply(value)], results)
+
+    def evaluate(self, data: Any) -> Dict[str, Any]:
+        """Evaluate every path against a document.
+
+        Returns:
+            dict: The result of each path expression.
+        """
+        return self.evaluate_many([data])[0]
+
+    def evaluate_many(self, documents: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Evaluate every path against each document of a batch, in one walk.
+
+        Returns:
+            List[dict]: The result of each path expression, per document in order.
+        """
+        documents = list(documents)
+        results: List[Dict[str, Any]] = [{} for _ in documents]
+        self._walk(self._tree, list(enumerate(documents)), results)
+        return results
+
+
+def _step_key(step: Step) -> Tuple[Any, ...]:
+    """Get a key that is equal for equivalent steps."""
+    if isinstance(step, Key):
+        return ("key", step.name)
+    if isinstance(step, Index):
+        return ("index", step.index)
+    if isinstance(step, Slice):
+        return ("slice", step.slice.start, step.slice.stop, step.slice.step)
+    if isinstance(step, Filter):
+        return ("filter", id(step))
+    return ("wildcard",)
+
+
+@lru_cache(maxsize=256)
+def path_set(expressions: Tuple[str, ...]) -> PathSet:
+    """Get the cached `PathSet` of a tuple of path expressions."""
+    return PathSet(expressions)
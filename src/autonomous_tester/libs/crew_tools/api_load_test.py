@@ -0,0 +1,245 @@
+"""Load-test runner for the API test tool.
+
+Drives one request spec from several concurrent workers and summarises the
+run as throughput, error rate and latency percentiles. Requests the tool
+refused to send (`rejected` results) are counted apart and left out of every
+statistic, so they cannot pass for fast server errors.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+PERCENTILE_VALIDATION = re.compile(r"^p(100|\d{1,2}(?:\.\d+)?)_ms$")
+AGGREGATE_VALIDATIONS = ("min_rps", "max_error_rate")
+REPORTED_PERCENTILES = (50, 90, 95, 99)
+HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MAX_ERROR_SAMPLES = 3
+
+
+class LoadTestResult(BaseModel):
+    """Model for load test results."""
+    success: bool
+    requests: int
+    rejected: int = 0
+    errors: int
+    error_rate: float
+    duration_s: float
+    throughput_rps: float
+    latency_ms: Dict[str, float]
+    histogram_ms: Dict[str, int]
+    status_codes: Dict[str, int]
+    error_samples: List[str] = Field(default_factory=list)
+    validations: List[str] = Field(default_factory=list)
+
+
+def split_validations(
+    validations: Optional[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split a validate block into per-request and aggregate (load) validations.
+
+    Args:
+        validations (dict): The `validate` block of a request spec.
+
+    Returns:
+        tuple: Per-request validations and aggregate validations.
+    """
+    per_request, aggregate = {}, {}
+    for key, value in (validations or {}).items():
+        if key in AGGREGATE_VALIDATIONS or PERCENTILE_VALIDATION.match(key):
+            aggregate[key] = value
+        else:
+            per_request[key] = value
+    return per_request, aggregate
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Get the nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _histogram(sorted_values: List[float]) -> Dict[str, int]:
+    """Count latencies into fixed buckets, keeping only non-empty ones."""
+    buckets = Counter()
+    for value in sorted_values:
+        bound = next((b for b in HISTOGRAM_BOUNDS_MS if value <= b), None)
+        buckets[f"<={bound}" if bound is not None else f">{HISTOGRAM_BOUNDS_MS[-1]}"] += 1
+
+    labels = [f"<={b}" for b in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"]
+    return {label: buckets[label] for label in labels if buckets[label]}
+
+
+class LoadRunner:
+    """Run a request spec repeatedly from concurrent workers.
+
+    Workers are started along a linear ramp over `ramp_up` seconds, then loop
+    until the iteration budget is spent or the duration has elapsed.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[Dict[str, Any]], Any],
+        concurrency: int = 1,
+        iterations: Optional[int] = None,
+        duration: Optional[float] = None,
+        ramp_up: float = 0.0
+    ):
+        """Initialize the load runner.
+
+        Args:
+            execute (Callable): Executes one request spec and returns an APITestResult.
+            concurrency (int): Number of concurrent workers at full load.
+            iterations (int, optional): Total number of requests to send.
+            duration (float, optional): Seconds to keep sending requests.
+            ramp_up (float): Seconds over which workers are started.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if iterations is None and duration is None:
+            raise ValueError("Either iterations or duration is required for a load test")
+
+        self.execute = execute
+        self.concurrency = concurrency
+        self.iterations = iterations
+        self.duration = duration
+        self.ramp_up = max(0.0, ramp_up)
+
+        self._lock = threading.Lock()
+        self._issued = 0
+        self._results: List[Any] = []
+
+    def _claim(self, deadline: Optional[float]) -> bool:
+        """Reserve the next request slot, if any budget is left."""
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        with self._lock:
+            if self.iterations is not None and self._issued >= self.iterations:
+                return False
+            self._issued += 1
+            return True
+
+    def _worker(
+        self,
+        spec: Dict[str, Any],
+        index: int,
+        started: float,
+        deadline: Optional[float]
+    ) -> None:
+        """Wait for the worker's ramp slot, then send requests until done."""
+        delay = self.ramp_up * index / self.concurrency
+        time.sleep(max(0.0, started + delay - time.monotonic()))
+
+        while self._claim(deadline):
+            result = self.execute(spec)
+            with self._lock:
+                self._results.append(result)
+
+    def run(self, spec: Dict[str, Any], validations: Optional[Dict[str, Any]] = None) -> LoadTestResult:
+        """Drive the request spec and summarise the run.
+
+        Args:
+            spec (dict): The request spec, with per-request validations only.
+            validations (dict, optional): Aggregate validations such as `p95_ms`,
+                `min_rps` and `max_error_rate`.
+
+        Returns:
+            LoadTestResult: Throughput, error rate and latency statistics.
+        """
+        started = time.monotonic()
+        deadline = started + self.duration if self.duration is not None else None
+
+        workers = [
+            threading.Thread(target=self._worker, args=(spec, index, started, deadline), daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        elapsed = time.monotonic() - started
+        return self._summarise(elapsed, validations or {})
+
+    def _summarise(self, elapsed: float, validations: Dict[str, Any]) -> LoadTestResult:
+        """Build the compact load test result from the collected samples."""
+        results = [result for result in self._results if not result.rejected]
+        rejected = len(self._results) - len(results)
+        total = len(results)
+        failed = [result for result in results if not result.success]
+        latencies = sorted(result.response_time_ms for result in results if result.status_code)
+
+        latency_ms = {f"p{pct}": round(percentile(latencies, pct), 2) for pct in REPORTED_PERCENTILES}
+        latency_ms["min"] = round(latencies[0], 2) if latencies else 0.0
+        latency_ms["max"] = round(latencies[-1], 2) if latencies else 0.0
+        latency_ms["mean"] = round(sum(latencies) / len(latencies), 2) if latencies else 0.0
+
+        error_samples = []
+        for result in failed:
+            sample = result.error or next((v for v in result.validations if "✗" in v), None)
+            sample = sample or f"HTTP {result.status_code}"
+            if sample not in error_samples:
+                error_samples.append(sample)
+            if len(error_samples) >= MAX_ERROR_SAMPLES:
+                break
+
+        error_rate = len(failed) / total if total else 0.0
+        throughput = total / elapsed if elapsed > 0 else 0.0
+        validation_results = self._validate(latencies, throughput, error_rate, validations)
+
+        return LoadTestResult(
+            success=(
+                total > 0
+                and not any("✗" in v for v in validation_results)
+                and (not failed or "max_error_rate" in validations)
+            ),
+            requests=total,
+            rejected=rejected,
+            errors=len(failed),
+            error_rate=round(error_rate, 4),
+            duration_s=round(elapsed, 3),
+            throughput_rps=round(throughput, 2),
+            latency_ms=latency_ms,
+            histogram_ms=_histogram(latencies),
+            status_codes=dict(Counter(str(result.status_code) for result in results)),
+            error_samples=error_samples,
+            validations=validation_results,
+        )
+
+    @staticmethod
+    def _validate(
+        latencies: List[float],
+        throughput: float,
+        error_rate: float,
+        validations: Dict[str, Any]
+    ) -> List[str]:
+        """Check aggregate validations against the run statistics."""
+        validation_results = []
+
+        for key, expected in validations.items():
+            match = PERCENTILE_VALIDATION.match(key)
+            if match:
+                actual = percentile(latencies, float(match.group(1)))
+                if actual <= expected:
+                    validation_results.append(f"✓ {key[:-3]} latency {actual:.2f}ms <= {expected}ms")
+                else:
+                    validation_results.append(f"✗ {key[:-3]} latency {actual:.2f}ms > {expected}ms")
+            elif key == "min_rps":
+                if throughput >= expected:
+                    validation_results.append(f"✓ Throughput {throughput:.2f} rps >= {expected} rps")
+                else:
+                    validation_results.append(f"✗ Throughput {throughput:.2f} rps < {expected} rps")
+            elif key == "max_error_rate":
+                if error_rate <= expected:
+                    validation_results.append(f"✓ Error rate {error_rate:.2%} <= {expected:.2%}")
+                else:
+                    validation_results.append(f"✗ Error rate {error_rate:.2%} > {expected:.2%}")
+
+        return validation_results
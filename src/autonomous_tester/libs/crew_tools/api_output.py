@@ -0,0 +1,244 @@
+"""Compact, size-budgeted output of the API test tool.
+
+Large response bodies and full header sets flood the test specialist's context
+and slow every later LLM turn. In compact mode a result keeps the fields that
+decide a test (status, validations, timings, errors), only the headers that
+usually matter or were validated, and a structure-preserving summary of the
+body that fits the output budget. Bodies that had to be shortened are stored
+under `Settings.STORAGE_DIR` and the result carries a handle to fetch them.
+A batch shares one budget; when its results still do not fit, the largest are
+cut down to their outcome until the batch does.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.disk_cache import DiskCache, make_key
+
+OUTPUT_MODES = ("compact", "full")
+
+# Response headers kept in compact output, besides validated ones.
+HEADER_ALLOWLIST = {
+    "content-type",
+    "content-length",
+    "location",
+    "retry-after",
+    "www-authenticate",
+    "allow",
+}
+
+# Result flags that are only shown when set.
+FLAGS = ("replayed", "truncated", "stopped_early", "rejected")
+
+# Body handles are the first 16 hex digits of the body's content hash.
+HANDLE_LENGTH = 16
+BODY_HANDLE = re.compile(rf"[0-9a-f]{{{HANDLE_LENGTH}}}")
+
+# Summary limits tried in turn until the body fits the budget:
+# (nesting depth, list items, object keys, string characters).
+SUMMARY_LEVELS: List[Tuple[int, int, int, int]] = [
+    (6, 5, 20, 200),
+    (4, 3, 10, 100),
+    (3, 2, 6, 60),
+    (2, 1, 4, 40),
+    (1, 1, 3, 20),
+    (0, 0, 0, 0),
+]
+
+
+def dumps(value: Any) -> str:
+    """Encode a value as JSON without indentation."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _summarize(value: Any, depth: int, items: int, keys: int, chars: int) -> Any:
+    """Shorten a JSON value while keeping its structure.
+
+    Lists keep their first `items` entries, objects their first `keys` keys
+    and strings their first `chars` characters; each cut is marked with what
+    was left out. Below `depth` levels containers are replaced by their size.
+    """
+    if isinstance(value, dict):
+        if depth <= 0:
+            return f"{{{len(value)} keys}}"
+        summary = {key: _summarize(item, depth - 1, items, keys, chars) for key, item in list(value.items())[:keys]}
+        if len(value) > keys:
+            summary["..."] = f"{len(value) - keys} more keys"
+        return summary
+    if isinstance(value, list):
+        if depth <= 0:
+            return f"[{len(value)} items]"
+        summary = [_summarize(item, depth - 1, items, keys, chars) for item in value[:items]]
+        if len(value) > items:
+            summary.append(f"... {len(value) - items} more items")
+        return summary
+    if isinstance(value, str) and len(value) > chars:
+        return value[:chars] + f"... ({len(value)} chars)"
+    return value
+
+
+def summarize_body(body: Any, max_bytes: int) -> Tuple[Any, bool]:
+    """Fit a response body into a byte budget.
+
+    Args:
+        body: The parsed JSON body, or the body text.
+        max_bytes (int): Largest encoded size of the summary.
+
+    Returns:
+        tuple: The body or its summary, and whether it was shortened.
+    """
+    if len(dumps(body).encode("utf-8")) <= max_bytes:
+        return body, False
+
+    if isinstance(body, (dict, list)):
+        for level in SUMMARY_LEVELS:
+            summary = _summarize(body, *level)
+            if len(dumps(summary).encode("utf-8")) <= max_bytes:
+                return summary, True
+        body = dumps(body)
+
+    text = str(body)
+    return text[:max(0, max_bytes - 40)] + f"... ({len(text)} chars)", True
+
+
+def filter_headers(headers: Dict[str, str], validated: Iterable[str] = ()) -> Dict[str, str]:
+    """Keep the allowlisted and validated response headers."""
+    keep = HEADER_ALLOWLIST | {name.lower() for name in validated}
+    return {name: value for name, value in headers.items() if name.lower() in keep}
+
+
+class BodyStore:
+    """On-disk store of full response bodies left out of compact results."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        """Initialize the store.
+
+        Args:
+            directory (str, optional): Storage directory. Defaults to
+                `api_bodies/` under `Settings.STORAGE_DIR`.
+            max_bytes (int, optional): Size cap of the store.
+                Defaults to `Settings.API_BODY_STORE_MAX_MB`.
+        """
+        self.store = DiskCache(
+            directory or os.path.join(settings.STORAGE_DIR, "api_bodies"),
+            max_bytes=max_bytes or settings.API_BODY_STORE_MAX_MB * 1024 * 1024,
+        )
+
+    def save(self, body: Any) -> str:
+        """Store a response body and get its handle."""
+        handle = make_key(body)[:HANDLE_LENGTH]
+        self.store.set(handle, body)
+        return handle
+
+    def load(self, handle: str) -> Optional[Any]:
+        """Load a stored response body, or None for an unknown handle.
+
+        Raises:
+            ValueError: If the handle is not one `save` could have issued,
+                so it cannot point outside the store.
+        """
+        if not isinstance(handle, str) or not BODY_HANDLE.fullmatch(handle):
+            raise ValueError(f"Invalid body handle: {handle!r}")
+        return self.store.get(handle)
+
+
+def compact_result(
+    result: Dict[str, Any],
+    max_bytes: int,
+    body_store: BodyStore,
+    validations: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Shrink a dumped API test result to the output budget.
+
+    Args:
+        result (dict): The `APITestResult` as a dict.
+        max_bytes (int): Output budget of the result.
+        body_store (BodyStore): Where full bodies that do not fit are stored.
+        validations (dict, optional): The request's validations; validated
+            headers are kept.
+
+    Returns:
+        dict: The result without empty fields and with rounded timings,
+            filtered headers and the body, or its summary with a `body_handle`.
+    """
+    compact = {
+        name: round(value, 2) if isinstance(value, float) else value
+        for name, value in result.items()
+        if value not in (None, [], {}) and name not in ("headers", "response_body", *FLAGS)
+    }
+    compact.update({flag: True for flag in FLAGS if result.get(flag)})
+
+    headers = filter_headers(result.get("headers") or {}, (validations or {}).get("headers", {}))
+    if headers:
+        compact["headers"] = headers
+
+    body = result.get("response_body")
+    if body in (None, ""):
+        return compact
+
+    budget = max(0, max_bytes - len(dumps(compact).encode("utf-8")) - 80)
+    summary, shortened = summarize_body(body, budget)
+    compact["response_body"] = summary
+    if shortened:
+        compact["body_handle"] = body_store.save(body)
+        compact.setdefault("body_bytes", len(dumps(body).encode("utf-8")))
+    return compact
+
+
+def brief_result(result: Dict[str, Any], body_store: BodyStore) -> Dict[str, Any]:
+    """Cut a dumped API test result down to its outcome.
+
+    Args:
+        result (dict): The `APITestResult` as a dict.
+        body_store (BodyStore): Where the body is stored.
+
+    Returns:
+        dict: Success, status code, error, flags and failed validations, with
+            a `body_handle` for the body and `"brief": true`.
+    """
+    brief = {name: result[name] for name in ("success", "status_code") if name in result}
+    if result.get("error"):
+        brief["error"] = result["error"]
+    brief.update({flag: True for flag in FLAGS if result.get(flag)})
+    failed = [line for line in result.get("validations") or [] if line.startswith("✗")]
+    if failed:
+        brief["validations"] = failed
+    if result.get("response_body") not in (None, ""):
+        brief["body_handle"] = body_store.save(result["response_body"])
+    brief["brief"] = True
+    return brief
+
+
+def fit_batch(
+    results: List[Dict[str, Any]],
+    compacted: List[Dict[str, Any]],
+    max_bytes: int,
+    body_store: BodyStore
+) -> List[Dict[str, Any]]:
+    """Brief the largest results of a batch until it fits the output budget.
+
+    Every result keeps its outcome, so a batch of very many results can
+    still exceed a small budget by the size of their briefs.
+
+    Args:
+        results (List[dict]): The dumped `APITestResult` of each request.
+        compacted (List[dict]): Their compact results, in the same order.
+        max_bytes (int): Output budget of the whole batch.
+        body_store (BodyStore): Where the bodies of briefed results are stored.
+
+    Returns:
+        List[dict]: The compact results, some of them replaced by briefs.
+    """
+    sizes = [len(dumps(result).encode("utf-8")) for result in compacted]
+    # The list brackets and the commas between the results.
+    total = sum(sizes) + len(sizes) + 1
+    fitted = list(compacted)
+    for index in sorted(range(len(fitted)), key=lambda index: -sizes[index]):
+        if total <= max_bytes:
+            break
+        fitted[index] = brief_result(results[index], body_store)
+        total -= sizes[index] - len(dumps(fitted[index]).encode("utf-8"))
+    return fitted
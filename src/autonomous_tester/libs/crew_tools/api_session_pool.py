@@ -0,0 +1,210 @@
+"""Pooled keep-alive HTTP sessions for the API test tool."""
+
+import asyncio
+import importlib.util
+import threading
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import AsyncGenerator, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from autonomous_tester.libs import logger, settings
+
+from .api_timing import CONNECTION_PHASES, TIMED_POOL_CLASSES, TimedConnectionMixin, elapsed_ms
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTP adapter that times each request and records connection reuse.
+
+    Connections are opened through the timed pools of `api_timing`, so each
+    response carries its DNS, connect, TLS and time-to-first-byte durations.
+    A response whose connection has no fresh setup timings reused a pooled one.
+    """
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        """Create the pool manager with timed connection pools."""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+    def send(self, request, *args, **kwargs) -> requests.Response:
+        """Send the request and derive its time to first byte."""
+        started = time.perf_counter()
+        response = super().send(request, *args, **kwargs)
+
+        setup_ms = sum(response.phase_timings.get(phase) or 0.0 for phase in CONNECTION_PHASES)
+        response.phase_timings["ttfb_ms"] = elapsed_ms(started, response.headers_received_at) - setup_ms
+        return response
+
+    def build_response(self, req, resp) -> requests.Response:
+        """Build the response and attach its connection setup timings."""
+        response = super().build_response(req, resp)
+        response.headers_received_at = time.perf_counter()
+
+        connection = getattr(resp, "connection", None)
+        if isinstance(connection, TimedConnectionMixin):
+            timings = connection.take_phase_timings()
+            response.connection_reused = timings is None
+            response.phase_timings = timings or dict.fromkeys(CONNECTION_PHASES, 0.0)
+        else:
+            response.connection_reused = None
+            response.phase_timings = dict.fromkeys(CONNECTION_PHASES)
+        return response
+
+
+class SessionPool:
+    """Per-host pool of keep-alive `requests` sessions.
+
+    Each scheme/host/port gets its own session with a bounded connection pool,
+    so repeated tests against the same target skip connection setup.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, keep_alive: Optional[bool] = None):
+        """Initialize the session pool.
+
+        Args:
+            pool_size (int, optional): Maximum pooled connections per host.
+                Defaults to `Settings.API_POOL_SIZE`.
+            keep_alive (bool, optional): Keep connections open between requests.
+                Defaults to `Settings.API_KEEP_ALIVE`.
+        """
+        self.pool_size = pool_size or settings.API_POOL_SIZE
+        self.keep_alive = settings.API_KEEP_ALIVE if keep_alive is None else keep_alive
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        """Get the pool key (scheme://host:port) for a URL."""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def _new_session(self) -> requests.Session:
+        """Create a session with a pooled adapter mounted for HTTP and HTTPS."""
+        session = requests.Session()
+        # Test cases must stay independent, so cookies are never carried over.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+
+        adapter = PooledAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get(self, url: str) -> requests.Session:
+        """Get the session for the host of the given URL.
+
+        Args:
+            url (str): The request URL.
+
+        Returns:
+            requests.Session: The pooled session for the URL's host.
+        """
+        key = self._host_key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._new_session()
+                self._sessions[key] = session
+        return session
+
+    def close(self) -> None:
+        """Close every pooled session and drop its connections."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+async def _close_with_loop(client: httpx.AsyncClient) -> AsyncGenerator[None, None]:
+    """Async generator that closes a client when its event loop shuts it down.
+
+    `asyncio.run` closes the async generators of its loop before closing the
+    loop itself, so the client's connections are closed on the loop they
+    belong to.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+class AsyncClientPool:
+    """Pool of keep-alive `httpx.AsyncClient` instances, one per event loop.
+
+    An async client is bound to the loop it first ran on, so each running loop
+    gets its own client. A client is closed when its loop shuts down (see
+    `_close_with_loop`), and dropped from the pool once the loop has closed.
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        keep_alive: Optional[bool] = None,
+        http2: Optional[bool] = None
+    ):
+        """Initialize the async client pool.
+
+        Args:
+            pool_size (int, optional): Maximum kept-alive connections per client.
+                Defaults to `Settings.API_POOL_SIZE`.
+            keep_alive (bool, optional): Keep connections open between requests.
+                Defaults to `Settings.API_KEEP_ALIVE`.
+            http2 (bool, optional): Negotiate HTTP/2 when the server supports it.
+                Defaults to `Settings.API_HTTP2`.
+        """
+        self.pool_size = pool_size or settings.API_POOL_SIZE
+        self.keep_alive = settings.API_KEEP_ALIVE if keep_alive is None else keep_alive
+        self.http2 = settings.API_HTTP2 if http2 is None else http2
+        self._clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncGenerator[None, None]]] = {}
+
+    def _new_client(self) -> httpx.AsyncClient:
+        """Create an async client with pooled connection limits."""
+        http2 = self.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1.")
+            http2 = False
+
+        limits = httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=self.pool_size if self.keep_alive else 0,
+        )
+        # Test cases must stay independent, so cookies are never carried over.
+        cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        return httpx.AsyncClient(limits=limits, http2=http2, cookies=cookies)
+
+    def get(self) -> httpx.AsyncClient:
+        """Get the async client for the running event loop.
+
+        Returns:
+            httpx.AsyncClient: The pooled client for the current loop.
+        """
+        loop = asyncio.get_running_loop()
+        for stale_loop in [known for known in self._clients if known.is_closed()]:
+            client, _ = self._clients.pop(stale_loop)
+            if not client.is_closed:
+                # The loop was closed without shutting down its async generators.
+                logger.warning("An async HTTP client was left open by an event loop that closed without shutdown")
+
+        entry = self._clients.get(loop)
+        if entry is None:
+            client = self._new_client()
+            closer = _close_with_loop(client)
+            # Start the generator up to its `yield`, which registers it with the running loop.
+            try:
+                closer.asend(None).send(None)
+            except StopIteration:
+                pass
+            entry = self._clients[loop] = (client, closer)
+        return entry[0]
+
+    async def aclose(self) -> None:
+        """Close the client bound to the running event loop."""
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()
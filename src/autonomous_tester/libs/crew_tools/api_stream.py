@@ -0,0 +1,476 @@
+"""Streamed, size-capped reading of API response bodies.
+
+Response bodies are read chunk by chunk instead of all at once. Only the first
+`Settings.API_MAX_BODY_MB` megabytes are kept in memory; the rest of a larger
+body is still hashed, counted and checked, but not stored:
+
+- `contains` validations are matched on the text stream, across chunk borders.
+- `json_path` validations of a body over the cap are answered by an incremental
+  JSON scanner. A path whose step after its plain-key prefix picks elements one
+  by one (e.g. `items[*].id.unique()`, `items[?(@.stock == 0)].length()`) gets
+  the elements of that container one at a time, so only its matches, or just
+  its running function result, are kept; other paths keep the value under their
+  prefix (e.g. `data.total` for `data.total`, `items` for `items[-1].id`).
+- With early stop, reading ends as soon as every `contains` text and JSON path
+  has been found, so a bulk export does not have to be downloaded completely.
+"""
+
+import codecs
+import functools
+import hashlib
+import json
+import re
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .api_json_path import Collector, PathSet, compile_path
+
+# One JSON token: punctuation, a complete string, or a literal (number, true, false, null).
+TOKEN = re.compile(r'\s*(?:([{}\[\],:])|("[^"\\]*+(?:\\.[^"\\]*+)*+")|([^\s{}\[\],:"]+))')
+# The start of a string that does not end in the text read so far.
+STRING_START = re.compile(r'\s*"')
+# Characters that matter while skipping a value: quotes and brackets outside of
+# strings, quotes and backslashes inside them.
+SKIP_SPECIAL = re.compile(r'["{}\[\]]')
+STRING_SPECIAL = re.compile(r'["\\]')
+TRAILING_SPACE = re.compile(r"\s*")
+
+CHUNK_SIZE = 64 * 1024
+
+
+class JSONPathScanner:
+    """Incremental JSON parser that extracts the values at given key paths,
+    or hands over the elements of given containers one at a time.
+
+    Text is fed in pieces as it arrives. Objects, arrays and strings outside
+    the requested paths are skipped without being tokenized, and only the
+    requested values are built, so memory stays bounded by the size of those
+    values, not of the document. Every character is looked at once: between
+    pieces the scanner keeps only its skip depth, whether it is inside a
+    string and after a backslash, and the start of a token that continues.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[Tuple[str, ...]],
+        streams: Optional[Dict[Tuple[str, ...], Callable[[Any, Any], None]]] = None
+    ):
+        """Initialize the scanner.
+
+        Args:
+            paths (Iterable[tuple]): Key paths to extract, with list indexes as
+                strings, e.g. `("data", "items", "0", "id")`.
+            streams (dict, optional): Key paths of containers whose elements are
+                passed, each as soon as it is complete, to the given function
+                with the element's list index or object key; the container
+                itself is not kept.
+        """
+        self.targets = set(paths)
+        self.streams = dict(streams or {})
+        self.prefixes = {
+            target[:depth] for target in self.targets | set(self.streams) for depth in range(len(target) + 1)
+        }
+        self.values: Dict[Tuple[str, ...], Any] = {}
+        self._streamed: set = set()
+        self._stack: List[List[Any]] = []
+        self._expect_key = False
+        self._captures: List[List[Any]] = []
+        self._skip_depth = 0
+        self._in_string = False
+        self._escape = False
+        self._partial: Optional[List[str]] = None
+        self._buffer = ""
+
+    @property
+    def complete(self) -> bool:
+        """Whether every requested path has been found and every streamed container has ended."""
+        return len(self.values) == len(self.targets) and len(self._streamed) == len(self.streams) and not self._captures
+
+    def _path(self) -> Tuple[str, ...]:
+        """Get the path of the value at the current position."""
+        return tuple(str(frame[1]) for frame in self._stack)
+
+    def _requested(self, path: Tuple[str, ...]) -> bool:
+        """Whether the value at a path is extracted or is an element of a streamed container."""
+        return path in self.targets or (bool(path) and path[:-1] in self.streams)
+
+    def _store(self, path: Tuple[str, ...], value: Any) -> None:
+        """Keep a requested value, or pass it on as an element of a streamed container."""
+        if path in self.targets:
+            self.values[path] = value
+        if path and path[:-1] in self.streams:
+            self.streams[path[:-1]](self._stack[-1][1], value)
+
+    def _value(self, token: str, container: bool) -> None:
+        """Handle the start of a value (a container) or a whole scalar value."""
+        for capture in self._captures:
+            capture[2].append(token)
+
+        path = self._path()
+        if self._requested(path):
+            if container:
+                self._captures.append([path, len(self._stack), [token]])
+            else:
+                self._store(path, json.loads(token))
+        if path in self.streams and not container:
+            # A scalar has no elements to stream.
+            self._streamed.add(path)
+
+        if container and not self._captures and path not in self.prefixes:
+            self._skip_depth = 1
+        elif container:
+            self._stack.append([token, 0 if token == "[" else None])
+            self._expect_key = token == "{"
+
+    def _close(self, token: str) -> None:
+        """Handle the end of an object or array."""
+        for capture in self._captures:
+            capture[2].append(token)
+        container = self._path()[:-1]
+        if container in self.streams:
+            self._streamed.add(container)
+        self._stack.pop()
+        self._expect_key = False
+
+        while self._captures and self._captures[-1][1] == len(self._stack):
+            path, _, tokens = self._captures.pop()
+            self._store(path, json.loads("".join(tokens)))
+
+    def _token(self, punctuation: Optional[str], string: Optional[str], literal: Optional[str]) -> None:
+        """Handle one token."""
+        if punctuation in ("{", "["):
+            self._value(punctuation, container=True)
+        elif punctuation in ("}", "]"):
+            self._close(punctuation)
+        elif punctuation is not None:
+            for capture in self._captures:
+                capture[2].append(punctuation)
+            frame = self._stack[-1] if self._stack else None
+            if punctuation == "," and frame is not None:
+                if frame[0] == "[":
+                    frame[1] += 1
+                else:
+                    self._expect_key = True
+            elif punctuation == ":":
+                self._expect_key = False
+        elif string is not None and self._expect_key:
+            for capture in self._captures:
+                capture[2].append(string)
+            # Keys are only decoded where they can lead to a requested path.
+            frame = self._stack[-1]
+            frame[1] = json.loads(string) if self._path()[:-1] in self.prefixes else ""
+        else:
+            self._value(string if string is not None else literal, container=False)
+
+    def _wanted(self) -> bool:
+        """Whether the string at the current position has to be read, not skipped."""
+        return self._expect_key or bool(self._captures) or self._requested(self._path())
+
+    def _string_end(self, text: str, position: int) -> Optional[int]:
+        """Find the end of the string the position is in.
+
+        Returns:
+            int: The position after the closing quote, or None if the string
+                continues in the next piece.
+        """
+        while True:
+            if self._escape:
+                if position >= len(text):
+                    return None
+                position += 1
+                self._escape = False
+            match = STRING_SPECIAL.search(text, position)
+            if match is None:
+                return None
+            position = match.end()
+            if match.group() == '"':
+                return position
+            self._escape = True
+
+    def _skip(self, text: str, position: int) -> Optional[int]:
+        """Skip the rest of a value that cannot contain a requested path.
+
+        Returns:
+            int: The position after the value, or None if it continues in the next piece.
+        """
+        while True:
+            if self._in_string:
+                position = self._string_end(text, position)
+                if position is None:
+                    return None
+                self._in_string = False
+                if not self._skip_depth:
+                    return position
+            match = SKIP_SPECIAL.search(text, position)
+            if match is None:
+                return None
+            position = match.end()
+            if match.group() == '"':
+                self._in_string = True
+                continue
+            self._skip_depth += 1 if match.group() in "{[" else -1
+            if not self._skip_depth:
+                return position
+
+    def feed(self, text: str, final: bool = False) -> None:
+        """Parse the next piece of the document.
+
+        Args:
+            text (str): The next piece of the JSON text.
+            final (bool): Whether this is the last piece.
+
+        Raises:
+            ValueError: If the document is not valid JSON.
+        """
+        position = 0
+        if self._partial is not None:
+            # A requested string that started in an earlier piece.
+            end = self._string_end(text, 0)
+            if end is None:
+                self._partial.append(text)
+                position = len(text)
+            else:
+                self._partial.append(text[:end])
+                self._token(None, "".join(self._partial), None)
+                self._partial = None
+                position = end
+        else:
+            text = self._buffer + text
+
+        while position < len(text):
+            if self._skip_depth or self._in_string:
+                end = self._skip(text, position)
+                position = len(text) if end is None else end
+                continue
+
+            match = TOKEN.match(text, position)
+            if match is not None and not (match.group(3) and match.end() == len(text) and not final):
+                self._token(*match.groups())
+                position = match.end()
+                continue
+
+            start = STRING_START.match(text, position)
+            if start is None:
+                # Trailing whitespace, or a literal that continues in the next piece.
+                break
+            end = self._string_end(text, start.end())
+            if end is not None:
+                raise ValueError("Invalid JSON string")
+            if self._wanted():
+                self._partial = [text[start.end() - 1:]]
+            else:
+                self._in_string = True
+            position = len(text)
+        self._buffer = text[position:]
+
+        incomplete = self._stack or self._skip_depth or self._in_string or self._partial is not None
+        if final and (incomplete or TRAILING_SPACE.fullmatch(self._buffer) is None):
+            raise ValueError("Incomplete or invalid JSON document")
+
+
+class StreamedBody:
+    """A response body read chunk by chunk, with a cap on what stays in memory."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        validations: Optional[Dict[str, Any]] = None,
+        stop_early: bool = False,
+        encoding: Optional[str] = None
+    ):
+        """Initialize the body.
+
+        Args:
+            max_bytes (int): Largest part of the body kept in memory.
+            validations (dict, optional): The request's validations, whose
+                `contains` text and `json_path` paths are checked while reading.
+            stop_early (bool): Stop reading once all of them have been found.
+            encoding (str, optional): Text encoding of the body.
+        """
+        validations = validations or {}
+        self.max_bytes = max_bytes
+        self.stop_early = stop_early
+        self.encoding = encoding or "utf-8"
+        self.size = 0
+        self.truncated = False
+        self.stopped_early = False
+        self.complete = False
+
+        self._head = bytearray()
+        self._hash = hashlib.sha256()
+        self._needles = [validations["contains"]] if validations.get("contains") else []
+        self._found: set = set()
+        self._tail = ""
+        self._text_decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        self._json_paths = list(validations.get("json_path") or {})
+        self._scan_targets = set()
+        self._collectors: Dict[str, Collector] = {}
+        for path in self._json_paths:
+            try:
+                compiled = compile_path(path)
+            except ValueError:
+                continue
+            if compiled.streams_elements:
+                self._collectors[path] = Collector(compiled)
+            elif compiled.prefix:
+                self._scan_targets.add(compiled.prefix)
+        self._scanner: Optional[JSONPathScanner] = None
+        self._scan_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._scan_error: Optional[str] = None
+
+    @classmethod
+    def from_content(cls, content: bytes, **kwargs) -> "StreamedBody":
+        """Wrap a body that is already in memory, e.g. a recorded response."""
+        body = cls(max_bytes=max(len(content), 1), **kwargs)
+        body.feed(content)
+        body.finish()
+        return body
+
+    @property
+    def content(self) -> bytes:
+        """The part of the body kept in memory."""
+        return bytes(self._head)
+
+    @property
+    def sha256(self) -> Optional[str]:
+        """SHA-256 digest of the whole body, or None if it was not read completely."""
+        return self._hash.hexdigest() if self.complete else None
+
+    @property
+    def text(self) -> str:
+        """The kept part of the body as text."""
+        return self._head.decode(self.encoding, errors="replace")
+
+    @property
+    def scanned(self) -> bool:
+        """Whether JSON paths are answered by the incremental scanner."""
+        return self._scanner is not None
+
+    def _add_element(self, prefix: Tuple[str, ...], key: Any, item: Any) -> None:
+        """Pass an element of a streamed container to the collectors of its paths."""
+        for collector in self._collectors.values():
+            if collector.path.prefix == prefix:
+                collector.add(key, item)
+
+    def _scan(self, data: bytes, final: bool = False) -> None:
+        """Feed the incremental JSON scanner."""
+        if self._scan_error is not None:
+            return
+        try:
+            self._scanner.feed(self._scan_decoder.decode(data, final), final)
+        except ValueError as e:
+            self._scan_error = str(e)
+
+    def _done(self) -> bool:
+        """Whether early stop can end the download."""
+        if not self.stop_early or not (self._needles or self._json_paths):
+            return False
+        if len(self._found) < len(self._needles):
+            return False
+        if self._json_paths and not (self._scanner is not None and self._scanner.complete):
+            return False
+        return True
+
+    def feed(self, chunk: bytes) -> bool:
+        """Take the next chunk of the body.
+
+        Args:
+            chunk (bytes): The next chunk.
+
+        Returns:
+            bool: Whether to keep reading.
+        """
+        self.size += len(chunk)
+        self._hash.update(chunk)
+
+        if self._needles and len(self._found) < len(self._needles):
+            text = self._tail + self._text_decoder.decode(chunk)
+            self._found.update(needle for needle in self._needles if needle in text)
+            longest = max(len(needle) for needle in self._needles)
+            self._tail = text[-(longest - 1):] if longest > 1 else ""
+
+        room = self.max_bytes - len(self._head)
+        if not self.truncated and len(chunk) <= room:
+            self._head += chunk
+        elif not self.truncated:
+            self._head += chunk[:room]
+            self.truncated = True
+            if self._json_paths:
+                # The body does not fit: answer JSON paths from the stream instead.
+                prefixes = {collector.path.prefix for collector in self._collectors.values()}
+                streams = {prefix: functools.partial(self._add_element, prefix) for prefix in prefixes}
+                self._scanner = JSONPathScanner(self._scan_targets, streams)
+                self._scan(self.content + chunk[room:])
+        elif self._scanner is not None:
+            self._scan(chunk)
+
+        if self._done():
+            self.stopped_early = True
+            return False
+        return True
+
+    def finish(self) -> None:
+        """Mark the body as read to its end."""
+        self.complete = not self.stopped_early
+        if self._scanner is not None and self.complete:
+            self._scan(b"", final=True)
+
+    def read(self, chunks: Iterable[bytes]) -> "StreamedBody":
+        """Read a body from an iterator of chunks, honoring early stop."""
+        for chunk in chunks:
+            if chunk and not self.feed(chunk):
+                break
+        self.finish()
+        return self
+
+    async def aread(self, chunks: AsyncIterable[bytes]) -> "StreamedBody":
+        """Read a body from an async iterator of chunks, honoring early stop."""
+        async for chunk in chunks:
+            if chunk and not self.feed(chunk):
+                break
+        self.finish()
+        return self
+
+    def contains(self, needle: str) -> bool:
+        """Whether the whole body contains a text."""
+        if needle in self._needles:
+            return needle in self._found
+        return needle in self.text
+
+    def json(self) -> Any:
+        """Parse the body as JSON.
+
+        Raises:
+            ValueError: If the body is not valid JSON or was not kept completely.
+        """
+        if self.truncated or self.stopped_early:
+            raise ValueError(f"Response body of {self.size} bytes was not kept completely")
+        return json.loads(self.content)
+
+    def scanned_values(self, paths: PathSet) -> Dict[str, Any]:
+        """Evaluate JSON paths on the values found by the incremental scanner.
+
+        Args:
+            paths (PathSet): The compiled paths.
+
+        Returns:
+            dict: The result of each path that was streamed element by element
+                or has a plain-key prefix; other paths would need the whole
+                body and are left out.
+
+        Raises:
+            ValueError: If the streamed body was not valid JSON.
+        """
+        results = {}
+        for expression, path in paths.paths.items():
+            collector = self._collectors.get(expression)
+            if collector is not None:
+                if self._scan_error is not None:
+                    raise ValueError(self._scan_error)
+                results[expression] = collector.result()
+                continue
+            if not path.prefix:
+                continue
+            if path.prefix not in self._scanner.values and self._scan_error is not None:
+                raise ValueError(self._scan_error)
+            results[expression] = path.evaluate(self._scanner.values.get(path.prefix), start=len(path.prefix))
+        return results
@@ -3,14 +3,31 @@ API Testing Tool for CrewAI
 A comprehensive tool for testing REST APIs with various HTTP methods and validations.
 """
 
+import asyncio
+import functools
 import json
 import time
-from typing import Any, Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from enum import Enum
 
+import httpx
 import requests
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from autonomous_tester.libs import logger, settings
+
+from .api_auth import AuthProfiles
+from .api_cassette import CASSETTE_MODES, Cassette, cassette_key
+from .api_fuzz import FUZZ_BODY_BYTES, FuzzResult, FuzzRunner
+from .api_json_path import PathSet, compile_path, path_set
+from .api_load_test import LoadRunner, LoadTestResult, split_validations
+from .api_output import OUTPUT_MODES, BodyStore, compact_result, dumps, fit_batch
+from .api_session_pool import AsyncClientPool, SessionPool
+from .api_stream import CHUNK_SIZE, StreamedBody
+from .api_throttle import IDEMPOTENT_METHODS, NO_THROTTLE, RETRY_STATUSES, CircuitOpenError, Throttle
+from .api_timing import PHASES, AsyncPhaseTrace, elapsed_ms
 
 
 class HttpMethod(str, Enum):
@@ -33,6 +50,21 @@ class APITestResult(BaseModel):
     headers: Dict[str, str]
     error: Optional[str] = None
     validations: List[str] = Field(default_factory=list)
+    connection_reused: Optional[bool] = None
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    download_ms: Optional[float] = None
+    replayed: bool = False
+    body_bytes: Optional[int] = None
+    body_sha256: Optional[str] = None
+    truncated: bool = False
+    stopped_early: bool = False
+    retries: Optional[int] = None
+    rejected: bool = False
+    # Where the results of deferred JSON path checks go in `validations`, see `APITestTool._build_result`.
+    _json_paths_at: Optional[int] = PrivateAttr(default=None)
 
 
 
@@ -47,7 +79,17 @@ class APITestTool(BaseTool):
         - Request body (JSON, form data, raw)
         - Response validation (status codes, headers, body content)
         - Response time measurement
-        - JSON path validation
+        - JSON path validation with wildcards, slices, filters and functions
+        - Pooled keep-alive connections per host
+        - Batches of requests executed concurrently
+        - Native async execution (optionally over HTTP/2)
+        - Load testing with throughput and latency percentiles
+        - Record/replay of responses for repeat and offline runs
+        - Compact, size-budgeted results with full bodies stored on disk
+        - Streamed downloads with a body size cap, hashing and early stop
+        - Per-host rate limiting, adaptive concurrency, retries and a circuit breaker
+        - Named auth profiles with cached, automatically refreshed tokens
+        - Property-based fuzzing with failure grouping and shrinking
     """
     
     name: str = "API Test Tool"
@@ -61,27 +103,109 @@ class APITestTool(BaseTool):
         "headers": {"Content-Type": "application/json"},  # optional
         "body": {"key": "value"},  # optional, for POST/PUT/PATCH
         "params": {"query_param": "value"},  # optional, URL parameters
-        "auth": {"type": "bearer", "token": "your_token"},  # optional
+        "auth": {"type": "bearer", "token": "your_token"},  # optional, or {"type": "profile", "name": "admin"}
         "timeout": 30,  # optional, default 30 seconds
+        "cassette": "record|replay|off",  # optional, overrides AT_API_CASSETTE
+        "output": "full|compact",  # optional, overrides AT_API_OUTPUT (default full)
+        "max_output_bytes": 4000,  # optional, overrides AT_API_OUTPUT_MAX_BYTES
+        "max_body_bytes": 10485760,  # optional, overrides AT_API_MAX_BODY_MB
+        "stop_early": true,  # optional, stop downloading once "contains" and "json_path" are found
+        "retries": 2,  # optional, overrides AT_API_RETRIES (GET, HEAD, OPTIONS, PUT and DELETE only)
         "validate": {  # optional validations
             "status_code": 200,
             "contains": "expected text",
-            "json_path": {"path.to.field": "expected_value"}
+            "json_path": {"path.to.field": "expected_value", "items[*].id.unique()": true},
+            "max_response_time_ms": 500,
+            "max_ttfb_ms": 200  # also max_dns_ms, max_connect_ms, max_tls_ms, max_download_ms
         }
     }
     
+    To run several independent tests in one call, pass a list of such objects,
+    or {"requests": [...], "max_workers": 8}. They run concurrently and the
+    results come back as a list in the same order.
+    
+    To load test an endpoint, add a "load" block to a single request:
+        "load": {"concurrency": 10, "iterations": 500, "ramp_up": 2}  # or "duration": 30 (seconds)
+    The "validate" block then also accepts aggregate checks such as
+    "p95_ms": 200, "p99_ms": 500 (any "p<0-100>_ms"), "min_rps": 50 and "max_error_rate": 0.01.
+    A load test returns throughput, error rate and latency percentiles instead of a single response.
+    
+    An auth profile logs in once and reuses its token in every request that refers to it
+    (the token is fetched again when it expires or a request gets a 401). Profiles come from
+    AT_API_AUTH_PROFILES, or can be registered with:
+        {"auth_profiles": {"admin": {
+            "login": {"url": "/login", "method": "POST", "body": {"email": "...", "password": "..."}},
+            "token_path": "access_token",  # JSON path of the token in the login response
+            "header": "Authorization", "prefix": "Bearer ",  # optional, how the token is sent
+            "ttl": 3600  # optional, or "expires_in_path": "expires_in"
+        }}}
+    A relative login URL is resolved against the URL of the request that needs the token.
+    
+    To fuzz an endpoint, give a valid request as the seed and add a "fuzz" block:
+        "fuzz": {"iterations": 2000, "concurrency": 16, "seed": 1,  # all optional
+                 "schema": {...},  # optional JSON schema of the body, for boundaries and required keys
+                 "expected_status": [200, 400, 422]}  # optional, other statuses count as failures
+    Its body and query parameters are mutated (boundary values, unicode, oversize strings,
+    type confusion, missing and extra keys, injection strings). Server errors, requests that do
+    not complete, failed validations and unexpected statuses are grouped by status and response
+    signature; each group comes back with its count and a minimal input that reproduces it
+    ("changes" to the seed request), instead of every response.
+    
+    JSON paths support keys and indexes (items.0.id, items[-1]), wildcards (items[*].id, data.*),
+    slices (items[1:5]), filters (items[?(@.status == "active")], items[?(@.price > 10)]) and a
+    final function: length(), unique(), min(), max() or sum(). Paths with a wildcard, slice or
+    filter select a list of matches, e.g. {"items[?(@.stock == 0)].length()": 0}.
+    
     Returns a detailed test result including status code, response time, body, and validation results.
+    A status of 400 or above fails the test, unless "validate" has a "status_code" that it matches:
+    {"status_code": 401} passes on a 401 (e.g. for wrong credentials) and fails on anything else.
+    With "output": "compact", results keep only the relevant headers and summarize large bodies
+    (long lists and objects are cut, with a note of what was left out). A summarized body comes
+    with a "body_handle"; to read the full body, pass {"body_handle": "<handle>"} and optionally
+    "path": "path.to.field" to get a single field of it. A compact batch shares max_output_bytes;
+    if it does not fit, its largest results are cut down to a brief ("brief": true) with the
+    success, status code, error, failed validations and a "body_handle".
+    `connection_reused` tells whether the request skipped connection setup on a pooled connection.
+    `replayed` is true when the response was served from a recording without network access.
+    `dns_ms`, `connect_ms`, `tls_ms`, `ttfb_ms` and `download_ms` break the response time into phases,
+    showing whether time went to the network or to the server.
+    `body_bytes` and `body_sha256` describe the whole downloaded body. Only the first
+    max_body_bytes are kept (`truncated` is true beyond that), but "contains" and
+    "json_path" validations still check the whole body. `stopped_early` is true when
+    the download ended once the validated content was found.
+    Requests are throttled per host and slow down when the server answers 429 or 503.
+    Idempotent requests are retried on connection errors and 429/502/503/504 responses
+    (unless that status is the expected one); `retries` tells how often. While a host keeps
+    failing, requests fail fast with a "Circuit open" error instead of waiting for timeouts
+    (`rejected` is then true: the request was not sent). Load tests are not throttled, so the
+    configured concurrency is what the server gets.
     """
-    def _parse_input(self, query: str) -> Dict[str, Any]:
-        """Parse the input query string to extract API test parameters."""
+    _session_pool: SessionPool = PrivateAttr(default_factory=SessionPool)
+    _async_client_pool: AsyncClientPool = PrivateAttr(default_factory=AsyncClientPool)
+    _cassette: Cassette = PrivateAttr(default_factory=Cassette)
+    _body_store: BodyStore = PrivateAttr(default_factory=BodyStore)
+    _throttle: Throttle = PrivateAttr(default_factory=Throttle)
+    _auth_profiles: AuthProfiles = PrivateAttr(default_factory=AuthProfiles)
+
+    def _parse_input(self, query: str) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Parse the input query string to extract API test parameters.
+
+        Raises:
+            ValueError: If the input is not JSON, or not a request spec, a list
+                of request specs or {"requests": [...]} with a list of request specs.
+        """
         try:
             if isinstance(query, str):
                 params = json.loads(query)
             else:
                 params = query
-            return params
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON input: {str(e)}")
+
+        specs = params.get("requests", []) if isinstance(params, dict) else params
+        if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+            raise ValueError("Input must be a JSON object, a list of objects or {\"requests\": [objects]}")
+        return params
     
     def _prepare_auth(self, auth_config: Optional[Dict[str, str]]) -> Optional[Any]:
         """Prepare authentication based on config."""
@@ -106,35 +230,71 @@ class APITestTool(BaseTool):
         return None
     
     def _get_json_path_value(self, data: Any, path: str) -> Any:
-        """Extract value from nested JSON using dot notation path."""
-        keys = path.split('.')
-        value = data
-        
-        for key in keys:
-            if isinstance(value, dict):
-                value = value.get(key)
-            elif isinstance(value, list) and key.isdigit():
-                index = int(key)
-                value = value[index] if index < len(value) else None
+        """Extract value from nested JSON using a compiled JSON path (see `api_json_path`)."""
+        return compile_path(path).evaluate(data)
+    
+    def _compile_json_paths(self, expressions: Iterable[str]) -> Tuple[PathSet, Dict[str, str]]:
+        """Compile the paths of a `json_path` validation, with the error of each invalid one."""
+        errors = {}
+        for path in expressions:
+            try:
+                compile_path(path)
+            except ValueError as e:
+                errors[path] = str(e)
+        return path_set(tuple(path for path in expressions if path not in errors)), errors
+    
+    def _validate_json_paths(self, body: StreamedBody, json_path_validations: Dict[str, Any]) -> List[str]:
+        """Check the expected values of JSON paths, all evaluated in one walk over the body."""
+        paths, errors = self._compile_json_paths(json_path_validations)
+        try:
+            actual_values = body.scanned_values(paths) if body.scanned else paths.evaluate(body.json())
+        except ValueError:
+            return ["✗ Response is not valid JSON"]
+        return self._json_path_results(json_path_validations, errors, actual_values)
+    
+    def _json_path_results(
+        self,
+        json_path_validations: Dict[str, Any],
+        errors: Dict[str, str],
+        actual_values: Dict[str, Any]
+    ) -> List[str]:
+        """Compare the values of JSON paths with the expected ones."""
+        validation_results = []
+        for path, expected_value in json_path_validations.items():
+            if path in errors:
+                validation_results.append(f"✗ {errors[path]}")
+            elif path not in actual_values:
+                validation_results.append(f"✗ JSON path '{path}' cannot be checked on a body over the size cap")
+            elif actual_values[path] == expected_value:
+                validation_results.append(f"✓ JSON path '{path}' = {expected_value}")
             else:
-                return None
-            
-            if value is None:
-                return None
-        
-        return value
+                validation_results.append(
+                    f"✗ JSON path '{path}' = {actual_values[path]} != expected {expected_value}"
+                )
+        return validation_results
     
     def _validate_response(
         self, 
-        response: requests.Response, 
-        validations: Optional[Dict[str, Any]]
+        response: Union[requests.Response, httpx.Response], 
+        validations: Optional[Dict[str, Any]],
+        timings: Optional[Dict[str, Optional[float]]] = None,
+        body: Optional[StreamedBody] = None
     ) -> List[str]:
-        """Validate response against specified criteria."""
+        """Validate response against specified criteria.
+        
+        `timings` holds the measured `response_time_ms` and phase durations;
+        when given, time validations use it instead of `response.elapsed`.
+        `body` is the streamed response body; without it the response content
+        is read into memory.
+        """
         validation_results = []
         
         if not validations:
             return validation_results
         
+        if body is None:
+            body = StreamedBody.from_content(response.content, validations=validations, encoding=response.encoding)
+        
         expected_status = validations.get("status_code")
         if expected_status is not None:
             if response.status_code == expected_status:
@@ -146,27 +306,14 @@ class APITestTool(BaseTool):
         
         contains_text = validations.get("contains")
         if contains_text:
-            if contains_text in response.text:
+            if body.contains(contains_text):
                 validation_results.append(f"✓ Response contains '{contains_text}'")
             else:
                 validation_results.append(f"✗ Response does not contain '{contains_text}'")
         
         json_path_validations = validations.get("json_path", {})
         if json_path_validations:
-            try:
-                response_json = response.json()
-                for path, expected_value in json_path_validations.items():
-                    actual_value = self._get_json_path_value(response_json, path)
-                    if actual_value == expected_value:
-                        validation_results.append(
-                            f"✓ JSON path '{path}' = {expected_value}"
-                        )
-                    else:
-                        validation_results.append(
-                            f"✗ JSON path '{path}' = {actual_value} != expected {expected_value}"
-                        )
-            except json.JSONDecodeError:
-                validation_results.append("✗ Response is not valid JSON")
+            validation_results.extend(self._validate_json_paths(body, json_path_validations))
         
         header_validations = validations.get("headers", {})
         for header_name, expected_value in header_validations.items():
@@ -180,7 +327,10 @@ class APITestTool(BaseTool):
         
         max_response_time = validations.get("max_response_time_ms")
         if max_response_time is not None:
-            response_time_ms = response.elapsed.total_seconds() * 1000
+            if timings and timings.get("response_time_ms") is not None:
+                response_time_ms = timings["response_time_ms"]
+            else:
+                response_time_ms = response.elapsed.total_seconds() * 1000
             if response_time_ms <= max_response_time:
                 validation_results.append(
                     f"✓ Response time {response_time_ms:.2f}ms <= {max_response_time}ms"
@@ -190,96 +340,822 @@ class APITestTool(BaseTool):
                     f"✗ Response time {response_time_ms:.2f}ms > {max_response_time}ms"
                 )
         
+        for phase in PHASES:
+            max_phase_time = validations.get(f"max_{phase}")
+            if max_phase_time is None:
+                continue
+            phase_name = phase.removesuffix("_ms").upper()
+            phase_time = (timings or {}).get(phase)
+            if phase_time is None:
+                validation_results.append(f"- {phase_name} time was not measured separately")
+            elif phase_time <= max_phase_time:
+                validation_results.append(
+                    f"✓ {phase_name} time {phase_time:.2f}ms <= {max_phase_time}ms"
+                )
+            else:
+                validation_results.append(
+                    f"✗ {phase_name} time {phase_time:.2f}ms > {max_phase_time}ms"
+                )
+        
         return validation_results
     
-    def _run(self, query: str) -> str:
+    def _error_result(self, error: str, rejected: bool = False) -> APITestResult:
+        """Build a failed test result for a request that did not complete.
+        
+        `rejected` marks a request the tool refused to send.
         """
-        Execute the API test with the given parameters.
+        return APITestResult(
+            success=False,
+            status_code=0,
+            response_time_ms=0.0,
+            headers={},
+            error=error,
+            rejected=rejected
+        )
+
+    def _prepare_request(self, params: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Turn a request spec into the method, URL and `requests` keyword arguments.
         
         Args:
-            query: JSON string containing API test parameters
+            params: Parsed request spec (url, method, headers, body, ...)
             
         Returns:
-            str: JSON string containing test results
+            Tuple[str, str, Dict[str, Any]]: Method, URL and request kwargs
         """
+        url = params.get("url")
+        if not url:
+            raise ValueError("URL is required")
+        
+        method = params.get("method", "GET").upper()
+        headers = dict(params.get("headers") or {})
+        body = params.get("body")
+        query_params = params.get("params", {})
+        auth_config = params.get("auth")
+        timeout = params.get("timeout", 30)
+        
+        auth = self._prepare_auth(auth_config)
+        if auth and isinstance(auth, dict):
+            headers.update(auth)
+            auth = None
+        
+        request_kwargs = {
+            "headers": headers,
+            "params": query_params,
+            "timeout": timeout,
+            "auth": auth
+        }
+        
+        if method in ["POST", "PUT", "PATCH"] and body is not None:
+            if isinstance(body, (dict, list)):
+                request_kwargs["json"] = body
+            else:
+                request_kwargs["data"] = body
+        
+        return method, url, request_kwargs
+
+    def _cassette_mode(self, params: Dict[str, Any]) -> str:
+        """Get the cassette mode of a request spec, falling back to the settings."""
+        mode = (params.get("cassette") or settings.API_CASSETTE_MODE).lower()
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        return mode
+
+    def _stream_options(self, params: Dict[str, Any]) -> Tuple[int, bool]:
+        """Get the body size cap and early stop option of a request spec."""
+        max_body_bytes = params.get("max_body_bytes") or settings.API_MAX_BODY_MB * 1024 * 1024
+        return int(max_body_bytes), bool(params.get("stop_early", False))
+
+    def _replay(
+        self,
+        key: str,
+        method: str,
+        url: str,
+        validations: Optional[Dict[str, Any]],
+        defer_json_paths: bool = False
+    ) -> APITestResult:
+        """Serve a request from the cassette without network access."""
+        recording = self._cassette.replay(key)
+        if recording is None:
+            return self._error_result(f"No recorded response for {method} {url} (cassette replay mode)")
+        
+        response, response_time_ms, phase_timings = recording
+        result = self._build_result(
+            response, response_time_ms, validations, None, phase_timings, defer_json_paths=defer_json_paths
+        )
+        result.replayed = True
+        return result
+
+    def _record(
+        self,
+        key: str,
+        response: Union[requests.Response, httpx.Response],
+        body: StreamedBody,
+        response_time_ms: float,
+        phase_timings: Dict[str, Optional[float]]
+    ) -> None:
+        """Record a response in the cassette, unless only part of its body was kept."""
+        if body.truncated or not body.complete:
+            logger.warning(f"Response of {response.url} was not kept completely and is not recorded")
+            return
+        self._cassette.record(key, response, response_time_ms, phase_timings, body.content)
+
+    def _build_result(
+        self,
+        response: Union[requests.Response, httpx.Response],
+        response_time_ms: float,
+        validations: Optional[Dict[str, Any]],
+        connection_reused: Optional[bool] = None,
+        phase_timings: Optional[Dict[str, Optional[float]]] = None,
+        body: Optional[StreamedBody] = None,
+        defer_json_paths: bool = False
+    ) -> APITestResult:
+        """Validate a completed response and wrap it in an APITestResult.
+        
+        `body` is the streamed response body; without it the response content
+        is read into memory. With `defer_json_paths`, the JSON path checks of a
+        parsed body are left to `_validate_batch_json_paths`, which evaluates
+        them for a whole batch at once.
+        """
+        if body is None:
+            body = StreamedBody.from_content(response.content, validations=validations, encoding=response.encoding)
+        parsed = True
         try:
-            params = self._parse_input(query)
+            response_body = body.json()
+        except ValueError:
+            response_body = body.text
+            parsed = False
+        
+        timings = {**(phase_timings or {}), "response_time_ms": response_time_ms}
+        deferred = defer_json_paths and parsed and bool((validations or {}).get("json_path"))
+        if deferred:
+            validations_now = {key: value for key, value in validations.items() if key != "json_path"}
+        else:
+            validations_now = validations
+        validation_results = self._validate_response(response, validations_now, timings, body)
+        
+        # An expected error status (e.g. 401 for wrong credentials) is a passing test;
+        # the status_code validation fails any other status.
+        success = response.status_code < 400 or (validations or {}).get("status_code") is not None
+        if validations and validation_results:
+            success = success and not any("✗" in v for v in validation_results)
+        
+        result = APITestResult(
+            success=success,
+            status_code=response.status_code,
+            response_time_ms=response_time_ms,
+            response_body=response_body,
+            headers=dict(response.headers),
+            validations=validation_results,
+            connection_reused=connection_reused,
+            body_bytes=body.size,
+            body_sha256=body.sha256,
+            truncated=body.truncated,
+            stopped_early=body.stopped_early,
+            **{phase: timings.get(phase) for phase in PHASES},
+        )
+        if deferred:
+            # JSON path results follow the status code and contains checks, as in `_validate_response`.
+            result._json_paths_at = sum(1 for key in ("status_code", "contains") if validations.get(key))
+        return result
+    
+    def _validate_batch_json_paths(self, results: List[APITestResult], specs: List[Dict[str, Any]]) -> None:
+        """
+        Run the JSON path checks deferred by `_build_result`.
+        
+        The bodies of the batch that share a set of paths are evaluated
+        together, in one walk over the paths.
+        
+        Args:
+            results: The results of the batch, updated in place
+            specs: The request spec of each result
+        """
+        pending: Dict[Tuple[str, ...], List[Tuple[APITestResult, Dict[str, Any]]]] = {}
+        for result, spec in zip(results, specs):
+            if result._json_paths_at is not None:
+                json_path_validations = spec["validate"]["json_path"]
+                pending.setdefault(tuple(json_path_validations), []).append((result, json_path_validations))
+        
+        for expressions, group in pending.items():
+            paths, errors = self._compile_json_paths(expressions)
+            batch_values = paths.evaluate_many([result.response_body for result, _ in group])
+            for (result, json_path_validations), actual_values in zip(group, batch_values):
+                validation_results = self._json_path_results(json_path_validations, errors, actual_values)
+                position = result._json_paths_at
+                result.validations[position:position] = validation_results
+                result.success = result.success and not any("✗" in v for v in validation_results)
+                result._json_paths_at = None
+
+    def _attempts(self, method: str, params: Dict[str, Any]) -> int:
+        """Get how often a request may be sent: retries are only allowed for idempotent methods."""
+        if method not in IDEMPOTENT_METHODS:
+            return 1
+        retries = params.get("retries")
+        return 1 + max(0, int(settings.API_RETRIES if retries is None else retries))
+
+    def _should_retry(self, result: APITestResult, params: Dict[str, Any]) -> bool:
+        """Whether a response asks for the request to be sent again, unless the test expects it."""
+        expected_status = (params.get("validate") or {}).get("status_code")
+        return result.status_code in RETRY_STATUSES and result.status_code != expected_status
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        request_kwargs: Dict[str, Any],
+        params: Dict[str, Any],
+        key: str,
+        cassette_mode: str,
+        defer_json_paths: bool = False
+    ) -> APITestResult:
+        """Send one attempt of a request on the pooled session and read its body."""
+        start_time = time.perf_counter()
+        
+        session = self._session_pool.get(url)
+        response = session.request(method, url, stream=True, **request_kwargs)
+        
+        download_start = time.perf_counter()
+        max_body_bytes, stop_early = self._stream_options(params)
+        body = StreamedBody(max_body_bytes, params.get("validate"), stop_early, response.encoding)
+        body.read(response.iter_content(CHUNK_SIZE))
+        if not body.complete:
+            response.close()
+        end_time = time.perf_counter()
+        
+        phase_timings = dict(getattr(response, "phase_timings", {}))
+        phase_timings["download_ms"] = elapsed_ms(download_start, end_time)
+        response_time_ms = elapsed_ms(start_time, end_time)
+        
+        if cassette_mode == "record":
+            self._record(key, response, body, response_time_ms, phase_timings)
+        
+        return self._build_result(
+            response,
+            response_time_ms,
+            params.get("validate"),
+            getattr(response, "connection_reused", None),
+            phase_timings,
+            body,
+            defer_json_paths,
+        )
+
+    def _dispatch(
+        self,
+        params: Dict[str, Any],
+        throttled: bool = True,
+        defer_json_paths: bool = False
+    ) -> APITestResult:
+        """
+        Send a single API test request with resolved authentication.
+        
+        The request waits for the host's throttle, and idempotent requests are
+        retried with jittered backoff on connection errors and 429/502/503/504
+        responses.
+        
+        Args:
+            params: Parsed request spec (url, method, headers, body, validate, ...)
+            throttled: Whether the request goes through the host's throttle
+                and circuit breaker
+            defer_json_paths: Leave JSON path checks to `_validate_batch_json_paths`
             
-            url = params.get("url")
-            if not url:
-                raise ValueError("URL is required")
+        Returns:
+            APITestResult: The result of the request and its validations
+        """
+        try:
+            method, url, request_kwargs = self._prepare_request(params)
             
-            method = params.get("method", "GET").upper()
-            headers = params.get("headers", {})
-            body = params.get("body")
-            query_params = params.get("params", {})
-            auth_config = params.get("auth")
-            timeout = params.get("timeout", 30)
-            validations = params.get("validate")
+            cassette_mode = self._cassette_mode(params)
+            key = cassette_key(method, url, request_kwargs)
+            if cassette_mode == "replay":
+                return self._replay(key, method, url, params.get("validate"), defer_json_paths)
             
-            auth = self._prepare_auth(auth_config)
-            if auth and isinstance(auth, dict):
-                headers.update(auth)
-                auth = None
+            throttle = self._throttle.get(url) if throttled else NO_THROTTLE
+            attempts = self._attempts(method, params)
+            for attempt in range(attempts):
+                throttle.acquire()
+                try:
+                    result = self._send(method, url, request_kwargs, params, key, cassette_mode, defer_json_paths)
+                except requests.exceptions.RequestException:
+                    throttle.release()
+                    if attempt + 1 == attempts:
+                        raise
+                    time.sleep(throttle.backoff(attempt))
+                    continue
+                except BaseException:
+                    throttle.release()
+                    raise
+                
+                retry_after = throttle.release(result.status_code, result.headers)
+                if attempt + 1 == attempts or not self._should_retry(result, params):
+                    result.retries = attempt or None
+                    return result
+                time.sleep(throttle.backoff(attempt, retry_after))
             
-            start_time = time.time()
+        except CircuitOpenError as e:
+            return self._error_result(str(e), rejected=True)
             
-            request_kwargs = {
-                "headers": headers,
-                "params": query_params,
-                "timeout": timeout,
-                "auth": auth
-            }
+        except requests.exceptions.RequestException as e:
+            return self._error_result(f"Request failed: {str(e)}")
             
-            if method in ["POST", "PUT", "PATCH"] and body is not None:
-                if isinstance(body, (dict, list)):
-                    request_kwargs["json"] = body
-                else:
-                    request_kwargs["data"] = body
+        except Exception as e:
+            return self._error_result(f"Unexpected error: {str(e)}")
+
+    async def _asend(
+        self,
+        method: str,
+        url: str,
+        request_kwargs: Dict[str, Any],
+        auth: Optional[Tuple[str, str]],
+        params: Dict[str, Any],
+        key: str,
+        cassette_mode: str,
+        defer_json_paths: bool = False
+    ) -> APITestResult:
+        """Send one attempt of a request on the shared async client and read its body."""
+        trace = AsyncPhaseTrace()
+        
+        start_time = time.perf_counter()
+        
+        client = self._async_client_pool.get()
+        request = client.build_request(method, url, extensions={"trace": trace}, **request_kwargs)
+        response = await client.send(request, auth=auth, stream=True)
+        
+        download_start = time.perf_counter()
+        max_body_bytes, stop_early = self._stream_options(params)
+        body = StreamedBody(max_body_bytes, params.get("validate"), stop_early, response.encoding)
+        try:
+            await body.aread(response.aiter_bytes(CHUNK_SIZE))
+        finally:
+            await response.aclose()
+        
+        end_time = time.perf_counter()
+        response_time_ms = elapsed_ms(start_time, end_time)
+        phase_timings = trace.phase_timings()
+        phase_timings["download_ms"] = elapsed_ms(download_start, end_time)
+        
+        if cassette_mode == "record":
+            self._record(key, response, body, response_time_ms, phase_timings)
+        
+        return self._build_result(
+            response,
+            response_time_ms,
+            params.get("validate"),
+            trace.connection_reused,
+            phase_timings,
+            body,
+            defer_json_paths,
+        )
+
+    async def _adispatch(self, params: Dict[str, Any], defer_json_paths: bool = False) -> APITestResult:
+        """
+        Send a single API test request on the shared async HTTP client.
+        
+        Throttling and retries work as in `_dispatch`, waiting on the event loop.
+        
+        Args:
+            params: Parsed request spec (url, method, headers, body, validate, ...)
+            defer_json_paths: Leave JSON path checks to `_validate_batch_json_paths`
             
-            response = requests.request(method, url, **request_kwargs)
+        Returns:
+            APITestResult: The result of the request and its validations
+        """
+        try:
+            method, url, request_kwargs = self._prepare_request(params)
             
-            end_time = time.time()
-            response_time_ms = (end_time - start_time) * 1000
+            cassette_mode = self._cassette_mode(params)
+            key = cassette_key(method, url, request_kwargs)
+            if cassette_mode == "replay":
+                return self._replay(key, method, url, params.get("validate"), defer_json_paths)
             
-            try:
-                response_body = response.json()
-            except json.JSONDecodeError:
-                response_body = response.text
+            auth = request_kwargs.pop("auth")
+            if auth is not None:
+                auth = (auth.username, auth.password)
+            if "data" in request_kwargs:
+                request_kwargs["content"] = request_kwargs.pop("data")
             
-            validation_results = self._validate_response(response, validations)
+            throttle = self._throttle.get(url)
+            attempts = self._attempts(method, params)
+            for attempt in range(attempts):
+                await throttle.aacquire()
+                try:
+                    result = await self._asend(
+                        method, url, request_kwargs, auth, params, key, cassette_mode, defer_json_paths
+                    )
+                except httpx.TransportError:
+                    throttle.release()
+                    if attempt + 1 == attempts:
+                        raise
+                    await asyncio.sleep(throttle.backoff(attempt))
+                    continue
+                except BaseException:
+                    throttle.release()
+                    raise
+                
+                retry_after = throttle.release(result.status_code, result.headers)
+                if attempt + 1 == attempts or not self._should_retry(result, params):
+                    result.retries = attempt or None
+                    return result
+                await asyncio.sleep(throttle.backoff(attempt, retry_after))
             
-            success = response.status_code < 400
-            if validations and validation_results:
-                success = success and not any("✗" in v for v in validation_results)
+        except CircuitOpenError as e:
+            return self._error_result(str(e), rejected=True)
             
-            result = APITestResult(
-                success=success,
-                status_code=response.status_code,
-                response_time_ms=response_time_ms,
-                response_body=response_body,
-                headers=dict(response.headers),
-                validations=validation_results
-            )
+        except httpx.HTTPError as e:
+            return self._error_result(f"Request failed: {str(e)}")
             
-            return json.dumps(result.model_dump(), indent=2)
+        except Exception as e:
+            return self._error_result(f"Unexpected error: {str(e)}")
+
+    def _profile_name(self, params: Dict[str, Any]) -> Optional[str]:
+        """Get the auth profile a request spec refers to, if any."""
+        auth = params.get("auth") or {}
+        if str(auth.get("type", "")).lower() != "profile":
+            return None
+        return auth.get("name") or "default"
+
+    def _with_profile_auth(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the profile reference of a request spec by the profile's token header."""
+        token_headers = self._auth_profiles.headers(self._profile_name(params), params.get("url", ""), self._dispatch)
+        return {**params, "auth": None, "headers": {**(params.get("headers") or {}), **token_headers}}
+
+    def _needs_new_token(self, result: APITestResult, params: Dict[str, Any]) -> bool:
+        """Whether the server rejected the profile token, unless the test expects a 401."""
+        expected_status = (params.get("validate") or {}).get("status_code")
+        return result.status_code == 401 and expected_status != 401 and not result.replayed
+
+    def _execute(
+        self,
+        params: Dict[str, Any],
+        throttled: bool = True,
+        defer_json_paths: bool = False
+    ) -> APITestResult:
+        """
+        Execute a single API test request.
+        
+        A request that refers to an auth profile is sent with the profile's
+        cached token; if the server answers 401, the token is fetched again
+        and the request is sent once more.
+        
+        Args:
+            params: Parsed request spec (url, method, headers, body, validate, ...)
+            throttled: Whether the request goes through the host's throttle
+                and circuit breaker
+            defer_json_paths: Leave JSON path checks to `_validate_batch_json_paths`
             
-        except requests.exceptions.RequestException as e:
-            error_result = APITestResult(
-                success=False,
-                status_code=0,
-                response_time_ms=0.0,
-                headers={},
-                error=f"Request failed: {str(e)}"
-            )
-            return json.dumps(error_result.model_dump(), indent=2)
+        Returns:
+            APITestResult: The result of the request and its validations
+        """
+        name = self._profile_name(params)
+        if name is None:
+            return self._dispatch(params, throttled, defer_json_paths)
+        
+        try:
+            resolved = self._with_profile_auth(params)
+            result = self._dispatch(resolved, throttled, defer_json_paths)
+            if self._needs_new_token(result, params):
+                self._auth_profiles.invalidate(name, params.get("url", ""), resolved["headers"])
+                result = self._dispatch(self._with_profile_auth(params), throttled, defer_json_paths)
+            return result
+        except ValueError as e:
+            return self._error_result(f"Authentication failed: {str(e)}")
+
+    async def _aexecute(self, params: Dict[str, Any], defer_json_paths: bool = False) -> APITestResult:
+        """
+        Execute a single API test request on the shared async HTTP client.
+        
+        Auth profiles work as in `_execute`; their login requests run in a
+        worker thread so the event loop is not blocked.
+        
+        Args:
+            params: Parsed request spec (url, method, headers, body, validate, ...)
+            defer_json_paths: Leave JSON path checks to `_validate_batch_json_paths`
+            
+        Returns:
+            APITestResult: The result of the request and its validations
+        """
+        name = self._profile_name(params)
+        if name is None:
+            return await self._adispatch(params, defer_json_paths)
+        
+        try:
+            resolved = await asyncio.to_thread(self._with_profile_auth, params)
+            result = await self._adispatch(resolved, defer_json_paths)
+            if self._needs_new_token(result, params):
+                self._auth_profiles.invalidate(name, params.get("url", ""), resolved["headers"])
+                resolved = await asyncio.to_thread(self._with_profile_auth, params)
+                result = await self._adispatch(resolved, defer_json_paths)
+            return result
+        except ValueError as e:
+            return self._error_result(f"Authentication failed: {str(e)}")
+
+    def _output_options(self, params: Dict[str, Any]) -> Tuple[str, int]:
+        """Get the output mode and budget of a query, falling back to the settings."""
+        mode = (params.get("output") or settings.API_OUTPUT_MODE).lower()
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"Unsupported output mode: {mode}")
+        return mode, int(params.get("max_output_bytes") or settings.API_OUTPUT_MAX_BYTES)
+
+    def _format_results(
+        self,
+        results: List[APITestResult],
+        specs: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        batch: bool = False
+    ) -> str:
+        """
+        Encode test results as the tool output.
+        
+        In compact mode the output budget is shared by the results of a batch,
+        and the largest results are briefed if the batch still does not fit.
+        
+        Args:
+            results: The test results
+            specs: The request spec of each result
+            params: The query, which may set the output mode and budget
+            batch: Whether to return a list of results
+            
+        Returns:
+            str: JSON string containing the test results
+        """
+        mode, max_bytes = self._output_options(params)
+        if mode == "full":
+            dumped = [result.model_dump() for result in results]
+            return json.dumps(dumped if batch else dumped[0], indent=2)
+        
+        budget = max_bytes // max(1, len(results))
+        dumped = [result.model_dump() for result in results]
+        compacted = [
+            compact_result(result, budget, self._body_store, spec.get("validate"))
+            for result, spec in zip(dumped, specs)
+        ]
+        if not batch:
+            return dumps(compacted[0])
+        return dumps(fit_batch(dumped, compacted, max_bytes, self._body_store))
+
+    def _fetch_body(self, params: Dict[str, Any]) -> str:
+        """
+        Get a response body stored for a compact result.
+        
+        Args:
+            params: {"body_handle": "...", "path": "optional.json.path"}
+            
+        Returns:
+            str: The full body, or the value at the path, as JSON
+        """
+        try:
+            body = self._body_store.load(params["body_handle"])
+        except ValueError as e:
+            return dumps({"error": str(e)})
+        if body is None:
+            return dumps({"error": f"No stored response body for handle {params['body_handle']}"})
+        if params.get("path"):
+            body = self._get_json_path_value(body, params["path"])
+        return dumps(body)
+
+    def _register_profiles(self, params: Dict[str, Any]) -> str:
+        """
+        Register auth profiles for later requests.
+        
+        Args:
+            params: {"auth_profiles": {"name": {"login": {...}, "token_path": "..."}}}
+            
+        Returns:
+            str: The registered profile names, or the error, as JSON
+        """
+        try:
+            return dumps({"registered": self._auth_profiles.register(params["auth_profiles"])})
+        except (TypeError, ValueError, AttributeError) as e:
+            return dumps({"error": f"Invalid auth profile: {str(e)}"})
+
+    def _run_load(self, params: Dict[str, Any]) -> LoadTestResult:
+        """
+        Drive a single request spec as a load test.
+        
+        The requests bypass the host's throttle: a load test sets its own
+        concurrency, and its errors must not open the circuit for other tests.
+        
+        Args:
+            params: Request spec with a "load" block (concurrency, iterations
+                or duration, ramp_up)
+            
+        Returns:
+            LoadTestResult: Throughput, error rate and latency percentiles
+        """
+        load_config = params.get("load") or {}
+        per_request, aggregate = split_validations(params.get("validate"))
+        spec = {key: value for key, value in params.items() if key != "load"}
+        spec["validate"] = per_request
+        # Retries would hide errors and skew the latency of a load test.
+        spec.setdefault("retries", 0)
+        
+        runner = LoadRunner(
+            functools.partial(self._execute, throttled=False),
+            concurrency=load_config.get("concurrency", 1),
+            iterations=load_config.get("iterations"),
+            duration=load_config.get("duration"),
+            ramp_up=load_config.get("ramp_up", 0.0),
+        )
+        return runner.run(spec, aggregate)
+
+    def _run_fuzz(self, params: Dict[str, Any]) -> FuzzResult:
+        """
+        Fuzz a seed request spec with mutated payloads.
+        
+        Args:
+            params: Request spec with a "fuzz" block (iterations, concurrency,
+                seed, schema, expected_status, shrink_requests)
+            
+        Returns:
+            FuzzResult: Request counts, statuses and the shrunk failure groups
+        """
+        fuzz_config = params.get("fuzz") or {}
+        spec = {key: value for key, value in params.items() if key != "fuzz"}
+        # Retries and recordings of thousands of throwaway requests would only slow the run down.
+        spec.setdefault("retries", 0)
+        spec.setdefault("cassette", "off")
+        spec.setdefault("max_body_bytes", FUZZ_BODY_BYTES)
+        
+        runner = FuzzRunner(
+            self._execute,
+            iterations=int(fuzz_config.get("iterations", settings.API_FUZZ_ITERATIONS)),
+            concurrency=int(fuzz_config.get("concurrency", settings.API_MAX_WORKERS)),
+            seed=fuzz_config.get("seed", 0),
+            schema=fuzz_config.get("schema"),
+            expected_status=fuzz_config.get("expected_status"),
+            shrink_requests=int(fuzz_config.get("shrink_requests", 50)),
+        )
+        return runner.run(spec)
+
+    def _format_fuzz(self, result: FuzzResult, params: Dict[str, Any]) -> str:
+        """Encode a fuzz result, leaving out the last groups that do not fit a compact output budget."""
+        mode, max_bytes = self._output_options(params)
+        dumped = result.model_dump(exclude_none=True)
+        if mode == "compact":
+            while len(dumps(dumped).encode("utf-8")) > max_bytes and len(dumped["groups"]) > 1:
+                dumped["groups"].pop()
+                dumped["omitted_groups"] += 1
+        return dumps(dumped)
+
+    def _run_batch(
+        self,
+        specs: List[Dict[str, Any]],
+        max_workers: Optional[int] = None
+    ) -> List[APITestResult]:
+        """
+        Execute several request specs concurrently on a bounded thread pool.
+        
+        The JSON path checks of the batch run together once all responses are in.
+        
+        Args:
+            specs: Request specs, each in the single-request input format
+            max_workers: Upper bound on concurrent requests
+            
+        Returns:
+            List[APITestResult]: One result per spec, in input order
+        """
+        if not specs:
+            return []
+        
+        workers = min(max_workers or settings.API_MAX_WORKERS, len(specs))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(functools.partial(self._execute, defer_json_paths=True), specs))
+        self._validate_batch_json_paths(results, specs)
+        return results
+
+    async def _arun_batch(
+        self,
+        specs: List[Dict[str, Any]],
+        max_workers: Optional[int] = None
+    ) -> List[APITestResult]:
+        """
+        Execute several request specs concurrently on the event loop.
+        
+        The JSON path checks of the batch run together once all responses are in.
+        
+        Args:
+            specs: Request specs, each in the single-request input format
+            max_workers: Upper bound on requests in flight at once
+            
+        Returns:
+            List[APITestResult]: One result per spec, in input order
+        """
+        semaphore = asyncio.Semaphore(max_workers or settings.API_MAX_WORKERS)
+        
+        async def bounded(spec: Dict[str, Any]) -> APITestResult:
+            async with semaphore:
+                return await self._aexecute(spec, defer_json_paths=True)
+        
+        results = list(await asyncio.gather(*(bounded(spec) for spec in specs)))
+        self._validate_batch_json_paths(results, specs)
+        return results
+
+    def _run(self, query: str) -> str:
+        """
+        Execute the API test with the given parameters.
+        
+        Args:
+            query: JSON string containing API test parameters, a list of
+                request specs, or {"requests": [...], "max_workers": n}
+            
+        Returns:
+            str: JSON string containing test results
+        """
+        try:
+            params = self._parse_input(query)
+            self._output_options(params if isinstance(params, dict) else {})
+        except Exception as e:
+            return json.dumps(self._error_result(f"Unexpected error: {str(e)}").model_dump(), indent=2)
+        
+        if isinstance(params, dict) and "body_handle" in params:
+            return self._fetch_body(params)
+        
+        if isinstance(params, dict) and "auth_profiles" in params:
+            return self._register_profiles(params)
+        
+        if isinstance(params, list) or "requests" in params:
+            specs = params if isinstance(params, list) else params["requests"]
+            max_workers = None if isinstance(params, list) else params.get("max_workers")
+            results = self._run_batch(specs, max_workers)
+            return self._format_results(results, specs, params if isinstance(params, dict) else {}, batch=True)
+        
+        if "fuzz" in params:
+            try:
+                fuzz_result = self._run_fuzz(params)
+            except Exception as e:
+                return json.dumps(self._error_result(f"Unexpected error: {str(e)}").model_dump(), indent=2)
+            return self._format_fuzz(fuzz_result, params)
+        
+        if "load" in params:
+            try:
+                load_result = self._run_load(params)
+            except Exception as e:
+                return json.dumps(self._error_result(f"Unexpected error: {str(e)}").model_dump(), indent=2)
+            return json.dumps(load_result.model_dump())
+        
+        result = self._execute(params)
+        return self._format_results([result], [params], params)
+
+    async def _arun(self, query: str) -> str:
+        """
+        Execute the API test asynchronously with the given parameters.
+        
+        Accepts the same input as `_run`, but sends requests from the running
+        event loop through a shared async client instead of blocking a thread.
+        
+        Args:
+            query: JSON string containing API test parameters, a list of
+                request specs, or {"requests": [...], "max_workers": n}
             
+        Returns:
+            str: JSON string containing test results
+        """
+        try:
+            params = self._parse_input(query)
+            self._output_options(params if isinstance(params, dict) else {})
         except Exception as e:
-            error_result = APITestResult(
-                success=False,
-                status_code=0,
-                response_time_ms=0.0,
-                headers={},
-                error=f"Unexpected error: {str(e)}"
-            )
-            return json.dumps(error_result.model_dump(), indent=2)
+            return json.dumps(self._error_result(f"Unexpected error: {str(e)}").model_dump(), indent=2)
+        
+        if isinstance(params, dict) and "body_handle" in params:
+            return self._fetch_body(params)
+        
+        if isinstance(params, dict) and "auth_profiles" in params:
+            return self._register_profiles(params)
+        
+        if isinstance(params, list) or "requests" in params:
+            specs = params if isinstance(params, list) else params["requests"]
+            max_workers = None if isinstance(params, list) else params.get("max_workers")
+            results = await self._arun_batch(specs, max_workers)
+            return self._format_results(results, specs, params if isinstance(params, dict) else {}, batch=True)
+        
+        if "fuzz" in params:
+            try:
+                fuzz_result = await asyncio.to_thread(self._run_fuzz, params)
+            except Exception as e:
+                return json.dumps(self._error_result(f"Unexpected error: {str(e)}").model_dump(), indent=2)
+            return self._format_fuzz(fuzz_result, params)
+        
+        if "load" in params:
+            try:
+                load_result = await asyncio.to_thread(self._run_load, params)
+            except Exception as e:
+                return json.dumps(self._error_result(f"Unexpected error: {str(e)}").model_dump(), indent=2)
+            return json.dumps(load_result.model_dump())
+        
+        result = await self._aexecute(params)
+        return self._format_results([result], [params], params)
+
+    def throttle_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the throttling statistics of each host the tool sent requests to."""
+        return self._throttle.stats()
+
+    def auth_stats(self) -> Dict[str, int]:
+        """Get the token cache hits, logins and refreshes of the auth profiles."""
+        return self._auth_profiles.stats()
+
+    def close(self) -> None:
+        """Close the pooled HTTP sessions held by the tool."""
+        self._session_pool.close()
+
+    async def aclose(self) -> None:
+        """Close the async HTTP client bound to the running event loop."""
+        await self._async_client_pool.aclose()
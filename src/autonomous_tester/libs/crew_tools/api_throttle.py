@@ -0,0 +1,323 @@
+"""Per-host throttling of the API test tool's outbound traffic.
+
+Every target host gets its own `HostThrottle`, shared by all threads and event
+loops of the tool:
+
+- A token bucket caps the request rate at `Settings.API_RATE_LIMIT` requests per
+  second, with bursts of up to `Settings.API_RATE_BURST` requests.
+- An AIMD concurrency limit caps the requests in flight: it grows by about one
+  for every window of successful responses and halves on a 429 or 503
+  response, up to `Settings.API_HOST_CONCURRENCY`. A `Retry-After` header
+  pauses the host for the given time.
+- A circuit breaker opens after `Settings.API_CIRCUIT_THRESHOLD` consecutive
+  failures (connection errors or 502/503/504 responses; a 500 shows the host is
+  up, answering with an application error). While it is open, requests
+  fail fast; after `Settings.API_CIRCUIT_COOLDOWN` seconds a single probe
+  request decides whether it closes again.
+
+Retry delays use exponential backoff with full jitter, and never undercut the
+`Retry-After` time the server asked for.
+
+Load tests set their own pace and go through `NO_THROTTLE` instead, so they
+are neither capped nor able to open a host's circuit for the other tests.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+from autonomous_tester.libs import settings
+
+# Methods that may be sent again without changing the outcome.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Responses worth retrying: the server is overloaded or briefly unavailable.
+RETRY_STATUSES = {429, 502, 503, 504}
+# Responses that ask the client to slow down.
+BACKOFF_STATUSES = {429, 503}
+# Responses that count as failures of the host for the circuit breaker.
+DOWN_STATUSES = {502, 503, 504}
+
+# Longest wait before retrying a request, in seconds.
+MAX_BACKOFF = 30.0
+# How long a request waits before checking again for a free concurrency slot.
+POLL_INTERVAL = 0.01
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the host's circuit is open."""
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Get the delay before retrying a request.
+
+    Args:
+        attempt (int): Number of the attempt that failed, from 0.
+        retry_after (float, optional): The `Retry-After` time the server asked for.
+
+    Returns:
+        float: Seconds to wait, with full jitter.
+    """
+    delay = random.uniform(0, min(MAX_BACKOFF, settings.API_RETRY_BACKOFF * 2 ** attempt))
+    return min(MAX_BACKOFF, max(delay, retry_after or 0.0))
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Read the `Retry-After` header of a response.
+
+    Args:
+        headers (Mapping): The response headers.
+
+    Returns:
+        float: Seconds to wait, or None without a valid header.
+    """
+    value = next((value for name, value in (headers or {}).items() if name.lower() == "retry-after"), None)
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostThrottle:
+    """Rate limit, adaptive concurrency limit and circuit breaker of one host."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None
+    ):
+        """Initialize the throttle.
+
+        Args:
+            rate (float, optional): Requests per second, 0 for no rate limit.
+                Defaults to `Settings.API_RATE_LIMIT`.
+            burst (int, optional): Size of the token bucket.
+                Defaults to `Settings.API_RATE_BURST`.
+            max_concurrency (int, optional): Upper bound of the concurrency limit.
+                Defaults to `Settings.API_HOST_CONCURRENCY`.
+            failure_threshold (int, optional): Consecutive failures that open
+                the circuit, 0 to never open it. Defaults to `Settings.API_CIRCUIT_THRESHOLD`.
+            cooldown (float, optional): Seconds the circuit stays open.
+                Defaults to `Settings.API_CIRCUIT_COOLDOWN`.
+        """
+        self.rate = settings.API_RATE_LIMIT if rate is None else rate
+        self.burst = max(1, burst or settings.API_RATE_BURST)
+        self.max_concurrency = max(1, max_concurrency or settings.API_HOST_CONCURRENCY)
+        self.failure_threshold = settings.API_CIRCUIT_THRESHOLD if failure_threshold is None else failure_threshold
+        self.cooldown = settings.API_CIRCUIT_COOLDOWN if cooldown is None else cooldown
+
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.state = "closed"
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "delayed": 0,
+            "wait_ms": 0.0,
+            "backoff_responses": 0,
+            "failures": 0,
+            "circuit_opened": 0,
+            "rejected": 0,
+        }
+
+    def _reserve(self) -> float:
+        """Take a concurrency slot and a token if both are free.
+
+        Returns:
+            float: 0 if the request may start, otherwise seconds to wait before trying again.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "open" and now - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "open" or (self.state == "half_open" and self._probing):
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(
+                    f"Circuit open after {self._failures} consecutive failures; failing fast "
+                    f"(retrying the host in {max(0.0, self._opened_at + self.cooldown - now):.1f}s)"
+                )
+
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.in_flight >= int(self.limit):
+                return POLL_INTERVAL
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens < 1:
+                    return (1 - self._tokens) / self.rate
+                self._tokens -= 1
+
+            self.in_flight += 1
+            self._probing = self.state == "half_open"
+            self._stats["requests"] += 1
+            return 0.0
+
+    def _count_wait(self, started: float) -> None:
+        """Record the time a request waited for the throttle."""
+        with self._lock:
+            self._stats["delayed"] += 1
+            self._stats["wait_ms"] += (time.perf_counter() - started) * 1000
+
+    def acquire(self) -> None:
+        """Wait until a request to the host may start.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        started = time.perf_counter()
+        wait = self._reserve()
+        if not wait:
+            return
+        while wait:
+            time.sleep(wait)
+            wait = self._reserve()
+        self._count_wait(started)
+
+    async def aacquire(self) -> None:
+        """Wait on the event loop until a request to the host may start.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+        """
+        started = time.perf_counter()
+        wait = self._reserve()
+        if not wait:
+            return
+        while wait:
+            await asyncio.sleep(wait)
+            wait = self._reserve()
+        self._count_wait(started)
+
+    def release(self, status_code: Optional[int] = None, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """Free the request's slot and adapt the limits to its outcome.
+
+        Args:
+            status_code (int, optional): The response status, None if the request failed without one.
+            headers (Mapping, optional): The response headers.
+
+        Returns:
+            float: The `Retry-After` time the server asked for, in seconds, if any.
+        """
+        retry_after = retry_after_seconds(headers)
+        with self._lock:
+            now = time.monotonic()
+            self.in_flight = max(0, self.in_flight - 1)
+            was_probe, self._probing = self._probing, False
+
+            if status_code in BACKOFF_STATUSES:
+                self._stats["backoff_responses"] += 1
+                self.limit = max(1.0, self.limit / 2)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + min(retry_after, MAX_BACKOFF))
+            elif status_code is not None and status_code not in DOWN_STATUSES:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+
+            if status_code is None or status_code in DOWN_STATUSES:
+                self._stats["failures"] += 1
+                self._failures += 1
+                threshold_reached = self.failure_threshold and self._failures >= self.failure_threshold
+                if was_probe or (self.state == "closed" and threshold_reached):
+                    self.state = "open"
+                    self._opened_at = now
+                    self._stats["circuit_opened"] += 1
+            else:
+                self._failures = 0
+                if was_probe:
+                    self.state = "closed"
+        return retry_after
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Get the delay before retrying a request, see `backoff_delay`."""
+        with self._lock:
+            self._stats["retries"] += 1
+        return backoff_delay(attempt, retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the throttling statistics of the host."""
+        with self._lock:
+            return {
+                **self._stats,
+                "wait_ms": round(self._stats["wait_ms"], 1),
+                "concurrency_limit": round(self.limit, 2),
+                "circuit": self.state,
+            }
+
+
+class NoThrottle:
+    """Stand-in for `HostThrottle` that lets every request through and keeps no state."""
+
+    def acquire(self) -> None:
+        """Let the request start at once."""
+
+    async def aacquire(self) -> None:
+        """Let the request start at once."""
+
+    def release(self, status_code: Optional[int] = None, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """Get the `Retry-After` time of the response, if any."""
+        return retry_after_seconds(headers)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Get the delay before retrying a request, see `backoff_delay`."""
+        return backoff_delay(attempt, retry_after)
+
+
+NO_THROTTLE = NoThrottle()
+
+
+class Throttle:
+    """Registry of the per-host throttles of the API test tool."""
+
+    def __init__(self, **options):
+        """Initialize the registry.
+
+        Args:
+            **options: `HostThrottle` options applied to every host.
+        """
+        self.options = options
+        self._hosts: Dict[str, HostThrottle] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        """Get the throttle key (scheme://host:port) for a URL."""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get(self, url: str) -> HostThrottle:
+        """Get the throttle of the host of the given URL."""
+        key = self._host_key(url)
+        with self._lock:
+            host = self._hosts.get(key)
+            if host is None:
+                host = HostThrottle(**self.options)
+                self._hosts[key] = host
+        return host
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the throttling statistics of every host that received requests."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {key: host.stats() for key, host in hosts.items()}
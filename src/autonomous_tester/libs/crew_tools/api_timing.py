@@ -0,0 +1,157 @@
+"""Phase-level timing for API test requests.
+
+Every phase is measured with `time.perf_counter`, a monotonic high-resolution
+clock, so the phases of a request add up to its reported response time:
+
+- dns_ms: resolving the host name
+- connect_ms: establishing the TCP connection
+- tls_ms: the TLS handshake (0 for plain HTTP)
+- ttfb_ms: sending the request until the response headers arrive
+- download_ms: reading the response body
+
+Connection setup phases are 0 when a pooled connection is reused.
+"""
+
+import socket
+import time
+from typing import Any, Dict, Optional
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+
+PHASES = ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")
+CONNECTION_PHASES = ("dns_ms", "connect_ms", "tls_ms")
+
+
+def elapsed_ms(started: float, finished: float) -> float:
+    """Get the milliseconds between two `time.perf_counter` readings."""
+    return (finished - started) * 1000
+
+
+class TimedConnectionMixin:
+    """Record DNS, TCP connect and TLS durations when a connection is opened.
+
+    The timings are kept on the connection until taken once by the adapter,
+    so a later request on the same (reused) connection finds none.
+    """
+
+    phase_timings: Optional[Dict[str, float]] = None
+    _connect_marks: Optional[tuple] = None
+
+    def _new_conn(self) -> socket.socket:
+        """Resolve the host and open the socket, timing each step separately.
+
+        The resolved addresses are tried in turn, so a dead address does not
+        fail a host that has a working one.
+
+        Raises:
+            ConnectTimeoutError: The error of the last address, such as a
+                `NewConnectionError`, if no address accepts the connection.
+        """
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = [info[4][0] for info in socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)]
+        except OSError:
+            # Leave the lookup to urllib3 so it raises its usual resolution error.
+            addresses = [host]
+        resolved_at = time.perf_counter()
+
+        unique = list(dict.fromkeys(addresses))
+        for index, address in enumerate(unique):
+            self._dns_host = address
+            try:
+                sock = super()._new_conn()
+                break
+            except (OSError, ConnectTimeoutError):
+                # Refused, unreachable or timed out: try the next address, and
+                # report the failure of the last one once none is left.
+                if index == len(unique) - 1:
+                    raise
+            finally:
+                self._dns_host = host
+
+        self._connect_marks = (started, resolved_at, time.perf_counter())
+        return sock
+
+    def connect(self) -> None:
+        """Connect and store the connection setup phase timings."""
+        super().connect()
+        started, resolved_at, connected_at = self._connect_marks
+        finished = time.perf_counter()
+        self.phase_timings = {
+            "dns_ms": elapsed_ms(started, resolved_at),
+            "connect_ms": elapsed_ms(resolved_at, connected_at),
+            "tls_ms": elapsed_ms(connected_at, finished) if isinstance(self, HTTPSConnection) else 0.0,
+        }
+
+    def take_phase_timings(self) -> Optional[Dict[str, float]]:
+        """Return the connection setup timings once, or None for a reused connection."""
+        timings, self.phase_timings = self.phase_timings, None
+        return timings
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    """HTTP connection that records its setup phase timings."""
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    """HTTPS connection that records its setup phase timings."""
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    """HTTP connection pool that opens timed connections."""
+
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS connection pool that opens timed connections."""
+
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {
+    "http": TimedHTTPConnectionPool,
+    "https": TimedHTTPSConnectionPool,
+}
+
+
+class AsyncPhaseTrace:
+    """httpx/httpcore trace callback that derives phase timings from trace events.
+
+    httpcore resolves and connects in a single step, so for async requests the
+    DNS lookup is included in `connect_ms` and `dns_ms` is left empty.
+    """
+
+    def __init__(self):
+        self.marks: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        """Record when a trace event fired, ignoring the HTTP version prefix."""
+        _, _, event = event_name.partition(".")
+        if event_name.startswith("connection."):
+            event = event_name
+        self.marks[event] = time.perf_counter()
+
+    @property
+    def connection_reused(self) -> bool:
+        """Whether the request went out on an already open connection."""
+        return "connection.connect_tcp.started" not in self.marks
+
+    def _span(self, start: str, end: str) -> float:
+        """Get the duration between two recorded events, 0 if either is missing."""
+        if start in self.marks and end in self.marks:
+            return elapsed_ms(self.marks[start], self.marks[end])
+        return 0.0
+
+    def phase_timings(self) -> Dict[str, Optional[float]]:
+        """Get the phase timings of the traced request."""
+        return {
+            "dns_ms": None if not self.connection_reused else 0.0,
+            "connect_ms": self._span("connection.connect_tcp.started", "connection.connect_tcp.complete"),
+            "tls_ms": self._span("connection.start_tls.started", "connection.start_tls.complete"),
+            "ttfb_ms": self._span("send_request_headers.started", "receive_response_headers.complete"),
+            "download_ms": self._span("receive_response_body.started", "receive_response_body.complete"),
+        }
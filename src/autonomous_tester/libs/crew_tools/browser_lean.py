@@ -0,0 +1,135 @@
+"""Lean browsing mode for the browser tool.
+
+Functional checks do not need images, fonts, media or third-party analytics,
+so in lean mode the pooled browsers run headless with a fixed viewport and
+unneeded browser features turned off, and block such requests through the
+Chrome DevTools Protocol `Fetch` domain:
+
+- Requests matching a blocked URL pattern are failed before they are sent.
+- Responses of a blocked resource type are failed once their headers arrive,
+  so the body is never downloaded. The `Content-Length` header tells how many
+  bytes that saved.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+from browser_use import Browser
+
+from autonomous_tester.libs import logger, settings
+
+# Chrome switches for features a test run never uses.
+LEAN_ARGS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+]
+
+
+def _split(value: str) -> List[str]:
+    """Split a comma separated setting into its non-empty items."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _viewport() -> Dict[str, int]:
+    """Get the lean viewport from `Settings.BROWSER_VIEWPORT` (e.g. 1280x800)."""
+    width, _, height = settings.BROWSER_VIEWPORT.lower().partition("x")
+    return {"width": int(width), "height": int(height)}
+
+
+def lean_profile_options() -> Dict[str, Any]:
+    """Get the `BrowserProfile` options of the lean profile."""
+    viewport = _viewport()
+    return {
+        "headless": True,
+        "viewport": viewport,
+        "window_size": viewport,
+        "enable_default_extensions": False,
+        "highlight_elements": False,
+        "args": LEAN_ARGS,
+    }
+
+
+class RequestBlocker:
+    """Blocks requests of one browser and counts what that saved."""
+
+    def __init__(
+        self,
+        resource_types: Optional[List[str]] = None,
+        url_patterns: Optional[List[str]] = None
+    ):
+        """Initialize the blocker.
+
+        Args:
+            resource_types (List[str], optional): CDP resource types to block,
+                e.g. Image, Media, Font. Defaults to `Settings.BROWSER_BLOCK_RESOURCES`.
+            url_patterns (List[str], optional): URL wildcard patterns to block.
+                Defaults to `Settings.BROWSER_BLOCK_URLS`.
+        """
+        self.resource_types = _split(settings.BROWSER_BLOCK_RESOURCES) if resource_types is None else resource_types
+        self.url_patterns = _split(settings.BROWSER_BLOCK_URLS) if url_patterns is None else url_patterns
+        self.requests_blocked = 0
+        self.bytes_saved = 0
+        self.by_type: Counter = Counter()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _patterns(self) -> List[Dict[str, str]]:
+        """Get the `Fetch.enable` patterns, so only blocked requests are paused."""
+        patterns = [{"urlPattern": pattern, "requestStage": "Request"} for pattern in self.url_patterns]
+        patterns += [
+            {"urlPattern": "*", "resourceType": resource_type, "requestStage": "Response"}
+            for resource_type in self.resource_types
+        ]
+        return patterns
+
+    async def install(self, browser: Browser) -> None:
+        """Start blocking requests in every tab of a started browser."""
+        patterns = self._patterns()
+        if not patterns:
+            return
+
+        client = browser.cdp_client
+
+        def on_request_paused(event: Dict[str, Any], session_id: Optional[str] = None) -> None:
+            # CDP handlers run inside the client's message loop, so reply from a task.
+            task = asyncio.create_task(self._block(client, event, session_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        client.register.Fetch.requestPaused(on_request_paused)
+        await client.send.Fetch.enable(params={"patterns": patterns})
+
+    async def _block(self, client: Any, event: Dict[str, Any], session_id: Optional[str]) -> None:
+        """Fail a paused request and count it."""
+        size = 0
+        for header in event.get("responseHeaders") or []:
+            if header.get("name", "").lower() == "content-length":
+                size = int(header.get("value") or 0)
+
+        self.requests_blocked += 1
+        self.bytes_saved += size
+        self.by_type[event.get("resourceType", "Other")] += 1
+
+        try:
+            await client.send.Fetch.failRequest(
+                params={"requestId": event["requestId"], "errorReason": "BlockedByClient"},
+                session_id=session_id,
+            )
+        except Exception as e:
+            logger.debug(f"Could not block request {event.get('request', {}).get('url')}: {e}")
+
+    def take_stats(self) -> Dict[str, Any]:
+        """Get what was blocked since the last call and reset the counters."""
+        stats = {
+            "requests_blocked": self.requests_blocked,
+            "bytes_saved": self.bytes_saved,
+            "by_type": dict(self.by_type),
+        }
+        self.requests_blocked = 0
+        self.bytes_saved = 0
+        self.by_type.clear()
+        return stats
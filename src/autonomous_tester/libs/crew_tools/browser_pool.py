@@ -0,0 +1,150 @@
+"""Browser pool for the browser tool.
+
+Each pool slot is a separate browser with its own temporary profile, so test
+cases running at the same time never share cookies, storage or tabs. Browsers
+are started on first use and kept warm between test cases; when a test case
+finishes its browser is wiped before the next one gets it.
+
+With `Settings.BROWSER_LEAN` the browsers use the lean profile and block
+unneeded requests (see `browser_lean`); what that saved is logged per test case.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from browser_use import Browser, BrowserProfile
+
+from autonomous_tester.libs import logger, settings
+
+from .browser_lean import RequestBlocker, lean_profile_options
+
+
+class BrowserPool:
+    """Pool of isolated, reusable browsers."""
+
+    def __init__(self, size: Optional[int] = None):
+        """Initialize the pool.
+
+        Args:
+            size (int, optional): Maximum number of browsers running at once.
+                Defaults to `Settings.BROWSER_POOL_SIZE`.
+        """
+        self.size = max(1, size or settings.BROWSER_POOL_SIZE)
+        self._browsers: List[Browser] = []
+        self._idle: List[Browser] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._blockers: Dict[int, RequestBlocker] = {}
+        self.savings: Counter = Counter()
+
+    def _new_browser(self) -> Browser:
+        """Create a browser with a fresh temporary profile."""
+        options = lean_profile_options() if settings.BROWSER_LEAN else {}
+        return Browser(browser_profile=BrowserProfile(keep_alive=True, user_data_dir=None, **options))
+
+    async def acquire(self) -> Browser:
+        """Get an idle browser, or start a new one if none is idle.
+
+        Waits for a browser to be released once `size` browsers are in use.
+        """
+        if self._slots is None:
+            # Created on first use so it belongs to the running event loop.
+            self._slots = asyncio.Semaphore(self.size)
+        await self._slots.acquire()
+
+        if self._idle:
+            return self._idle.pop()
+
+        browser = self._new_browser()
+        try:
+            await browser.start()
+            if settings.BROWSER_LEAN:
+                blocker = RequestBlocker()
+                await blocker.install(browser)
+                self._blockers[id(browser)] = blocker
+        except Exception:
+            self._slots.release()
+            raise
+        self._browsers.append(browser)
+        return browser
+
+    def _record_savings(self, browser: Browser) -> None:
+        """Log and add up the requests and bytes lean mode saved for a test case."""
+        blocker = self._blockers.get(id(browser))
+        if blocker is None:
+            return
+        stats = blocker.take_stats()
+        self.savings["requests_blocked"] += stats["requests_blocked"]
+        self.savings["bytes_saved"] += stats["bytes_saved"]
+        logger.info(
+            f"Lean browsing blocked {stats['requests_blocked']} requests "
+            f"({stats['bytes_saved'] / 1024:.1f} KB saved): {stats['by_type']}"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the requests and bytes lean mode saved across all test cases."""
+        return dict(self.savings)
+
+    async def _reset(self, browser: Browser) -> None:
+        """Wipe a browser so the next test case starts from a clean state.
+
+        Navigates to a blank page, closes any other tabs, and clears cookies and
+        the storage of every origin that was open.
+        """
+        origins = set()
+        for target in browser.get_page_targets():
+            parts = urlsplit(target.url)
+            if parts.scheme in ("http", "https"):
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+
+        await browser.navigate_to("about:blank")
+        for target in browser.get_page_targets():
+            if target.target_id != browser.agent_focus_target_id:
+                await browser.close_page(target.target_id)
+
+        for origin in origins:
+            await browser.cdp_client.send.Storage.clearDataForOrigin(
+                params={"origin": origin, "storageTypes": "all"}
+            )
+        await browser.clear_cookies()
+
+    async def release(self, browser: Browser) -> None:
+        """Return a browser to the pool, or discard it if it cannot be wiped."""
+        self._record_savings(browser)
+        try:
+            await self._reset(browser)
+            self._idle.append(browser)
+        except Exception as e:
+            logger.warning(f"Discarding pooled browser that could not be reset: {e}")
+            self._browsers.remove(browser)
+            self._blockers.pop(id(browser), None)
+            await self._kill(browser)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def browser(self) -> AsyncIterator[Browser]:
+        """Borrow a browser for the duration of a test case."""
+        browser = await self.acquire()
+        try:
+            yield browser
+        finally:
+            await self.release(browser)
+
+    async def _kill(self, browser: Browser) -> None:
+        """Stop a browser, ignoring errors from an already dead process."""
+        try:
+            await browser.kill()
+        except Exception as e:
+            logger.debug(f"Error while stopping browser: {e}")
+
+    async def close(self) -> None:
+        """Stop every browser in the pool."""
+        browsers, self._browsers = self._browsers, []
+        self._blockers.clear()
+        self._idle = []
+        self._slots = None
+        for browser in browsers:
+            await self._kill(browser)
@@ -1,24 +1,60 @@
 """Browser tool for autonomous tester."""
 
 import asyncio
+import atexit
+import json
+from typing import Any, Dict, List, Optional
 
 from crewai.tools import BaseTool
-from browser_use import BrowserProfile, ChatAzureOpenAI, Agent, Browser
+from browser_use import ChatAzureOpenAI, Agent
+from pydantic import PrivateAttr
 
-from autonomous_tester.libs import settings
+from autonomous_tester.libs import logger, settings
+from autonomous_tester.libs.common.background_loop import BackgroundLoop
+
+from .browser_pool import BrowserPool
+from .browser_trace import ReplaySummaryLLM, TraceStore, same_page, trace_key
+
+# Upper bound of the pause before each replayed step. Recorded step intervals
+# include LLM thinking time, which a replay does not need to wait for.
+REPLAY_MAX_STEP_INTERVAL = 1.0
 
 
 class BrowserTool(BaseTool):
     """Tool for performing browser related tasks in the autonomous tester."""
 
     name: str = "Browser task tool"
-    description: str = "An asynchronous tool to perform browser related tasks."
-    _browser: Browser | None = None
+    description: str = """
+    An asynchronous tool to perform browser related tasks.
+
+    Input is the instruction for one browser task (test case).
+
+    To run several independent test cases at the same time, pass a JSON list of
+    instructions, or {"tasks": [...]}. Each test case runs in its own isolated
+    browser and the results come back as a JSON list in the same order.
 
-    def _get_llm(self) -> ChatAzureOpenAI:
-        """Get the language model for the tool."""
+    Passed test cases are recorded and replayed on later runs without the LLM
+    agent, as long as the page still matches the recorded steps. Only extract
+    steps ask a model again, to read the current page.
+    """
+    _browser_pool: BrowserPool = PrivateAttr(default_factory=BrowserPool)
+    _loop: BackgroundLoop = PrivateAttr(default_factory=lambda: BackgroundLoop("browser-tool-loop"))
+    _traces: TraceStore = PrivateAttr(default_factory=TraceStore)
 
-        *_, llm_model = settings.MODEL.partition("/")
+    def model_post_init(self, __context: Any) -> None:
+        """Close the browsers and stop the tool's event loop at interpreter exit."""
+        super().model_post_init(__context)
+        atexit.register(self.close)
+
+    def _get_llm(self, model: Optional[str] = None) -> ChatAzureOpenAI:
+        """Get the language model for the tool.
+
+        Args:
+            model (str, optional): The model, e.g. "azure/gpt-4o-mini".
+                Defaults to `Settings.MODEL`.
+        """
+
+        *_, llm_model = (model or settings.MODEL).rpartition("/")
         llm = ChatAzureOpenAI(
             api_key = settings.AZURE_API_KEY,
             # api_version: str | None = '2024-10-21'
@@ -27,53 +63,155 @@ class BrowserTool(BaseTool):
         )
         return llm
 
-    async def _get_browser(self) -> Browser:
-        """Get the browser instance for the tool."""
-        if self._browser is None:
-            self._browser = Browser(browser_profile=BrowserProfile(keep_alive=True))
-            await self._browser.start()
-        return self._browser
-    
+    def _parse_tasks(self, query: str) -> List[str] | None:
+        """Get the test case instructions of a batch query, or None for a single task."""
+        try:
+            params = json.loads(query)
+        except (TypeError, json.JSONDecodeError):
+            return None
+
+        if isinstance(params, dict):
+            params = params.get("tasks")
+        if isinstance(params, list) and all(isinstance(task, str) for task in params):
+            return params
+        return None
+
     async def _async_run(self, query: str = "") -> str:
         """Async implementation of the browser task.
-        
+
         Args:
             query (str): The query describing the browser task to be performed.
-        
+
         Returns:
             str: The result of the browser task.
         """
-        browser = await self._get_browser()
-        agent = Agent(task=query, llm=self._get_llm(), browser=browser)
-        history = await agent.run()
+        key = trace_key(query)
+        if settings.BROWSER_REPLAY:
+            result = await self._replay(query, key)
+            if result is not None:
+                return result
+
+        async with self._browser_pool.browser() as browser:
+            agent = Agent(task=query, llm=self._get_llm(), browser=browser)
+            history = await agent.run()
+
+        if history.is_successful():
+            self._traces.save(key, history)
+        else:
+            self._traces.delete(key)
         return history.action_results()[-1].extracted_content
 
+    async def _replay(self, query: str, key: str) -> Optional[str]:
+        """Replay the recorded actions of a test case that passed before.
+
+        Every step must find its recorded target element on the page and the
+        replay must end on the recorded final page, otherwise the test case
+        is left to the LLM agent. A browser is only borrowed when a recording
+        exists. Recorded extract steps read the current page again with
+        `Settings.BROWSER_REPLAY_EXTRACT_MODEL`, which defaults to the agent's model.
+
+        Args:
+            query (str): The query describing the browser task to be performed.
+            key (str): The trace key of the task.
+
+        Returns:
+            str: The recorded result of the task, or None if there is no
+                recording or the page no longer matches it.
+        """
+        entry = self._traces.get(key)
+        if entry is None:
+            return None
+
+        async with self._browser_pool.browser() as browser:
+            agent = Agent(task=query, llm=self._get_llm(), browser=browser)
+            history = self._traces.load(key, agent.AgentOutput, entry)
+            if history is None:
+                return None
+
+            try:
+                results = await agent.rerun_history(
+                    history,
+                    max_retries=1,
+                    max_step_interval=REPLAY_MAX_STEP_INTERVAL,
+                    summary_llm=ReplaySummaryLLM(),
+                    ai_step_llm=self._get_llm(settings.BROWSER_REPLAY_EXTRACT_MODEL),
+                    wait_for_elements=True,
+                )
+                final_url = await browser.get_current_page_url()
+            except Exception as e:
+                logger.info(f"Replay of recorded browser steps failed, using the browser agent: {e}")
+                return None
+
+        done = [result for result in results[:-1] if result.is_done and result.extracted_content]
+        if not done or not same_page(final_url, history.history[-1].state.url):
+            logger.info("Replay did not reach the recorded final page, using the browser agent")
+            return None
+
+        logger.info(f"Replayed {len(history.history)} recorded browser steps without the LLM agent")
+        return done[-1].extracted_content
+
+    async def _async_run_batch(self, tasks: List[str]) -> List[str]:
+        """Run independent browser tasks at the same time across the browser pool.
+
+        Args:
+            tasks (List[str]): The instructions of each test case.
+
+        Returns:
+            List[str]: The result of each task, in input order.
+        """
+        results = await asyncio.gather(
+            *(self._async_run(task) for task in tasks),
+            return_exceptions=True,
+        )
+        return [
+            f"Error: {result}" if isinstance(result, Exception) else result
+            for result in results
+        ]
+
     def _run(self, query: str = "") -> str:
         """Synchronous wrapper for CrewAI.
-        
+
+        Runs the task on the tool's own event loop thread, where the pooled
+        browsers live, so concurrent calls from several threads overlap.
+
         Args:
-            query (str): The query describing the browser task to be performed.
-        
+            query (str): The query describing the browser task to be performed,
+                or a JSON list of independent tasks to run in parallel.
+
         Returns:
-            str: The result of the browser task.
+            str: The result of the browser task, or a JSON list of results.
         """
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        return loop.run_until_complete(self._async_run(query))
+        tasks = self._parse_tasks(query)
+        if tasks is not None:
+            return json.dumps(self._loop.run(self._async_run_batch(tasks)), indent=2)
+        return self._loop.run(self._async_run(query))
+
+    async def _arun(self, query: str = "") -> str:
+        """Async variant of `_run`, awaiting the task on the tool's event loop.
+
+        Args:
+            query (str): The query describing the browser task to be performed,
+                or a JSON list of independent tasks to run in parallel.
+
+        Returns:
+            str: The result of the browser task, or a JSON list of results.
+        """
+        tasks = self._parse_tasks(query)
+        if tasks is not None:
+            return json.dumps(await self._loop.arun(self._async_run_batch(tasks)), indent=2)
+        return await self._loop.arun(self._async_run(query))
+
+    def lean_stats(self) -> Dict[str, Any]:
+        """Get the requests and bytes lean browsing saved so far."""
+        return self._browser_pool.stats()
+
+    def close(self) -> None:
+        """Close the pooled browsers and stop the tool's event loop."""
+        self._loop.shutdown(self._browser_pool.close())
 
     def __del__(self):
-        """Cleanup browser on tool destruction."""
-        if self._browser is not None:
-            try:
-                loop = asyncio.get_event_loop()
-                if not loop.is_closed():
-                    loop.run_until_complete(self._browser.close())
-            except Exception:
-                pass
+        """Cleanup browsers on tool destruction."""
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,136 @@
+"""Action traces of browser test cases, for replay without the LLM agent.
+
+When a browser test case passes, the browser-use action history is stored under
+`Settings.STORAGE_DIR`, keyed by the normalized task text and start URL. A later
+run of the same test case replays the recorded actions directly against the
+page. Each step first re-locates its target element from the recorded element
+details, so a changed page fails the replay instead of clicking the wrong thing,
+and the tool then falls back to the LLM-driven agent. Extract steps read the
+current page, so they still ask a model, `Settings.BROWSER_REPLAY_EXTRACT_MODEL`.
+"""
+
+import os
+import re
+from typing import Any, Dict, Optional, Type
+
+from browser_use.agent.views import AgentHistoryList, RerunSummaryAction
+from browser_use.llm.views import ChatInvokeCompletion
+from pydantic import BaseModel
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.disk_cache import DiskCache, make_key
+
+URL_PATTERN = re.compile(r"https?://[^\s'\"<>]+", re.IGNORECASE)
+
+
+def _normalize_url(url: str) -> str:
+    """Lower-case the scheme and host and drop trailing punctuation and slashes."""
+    url = url.rstrip(".,;:!?)]}").rstrip("/")
+    scheme, _, rest = url.partition("://")
+    host, slash, path = rest.partition("/")
+    return f"{scheme.lower()}://{host.lower()}{slash}{path}"
+
+
+def start_url(task: str) -> Optional[str]:
+    """Get the first URL mentioned in a task, normalized."""
+    match = URL_PATTERN.search(task)
+    return _normalize_url(match.group(0)) if match else None
+
+
+def trace_key(task: str) -> str:
+    """Build the trace key of a browser task.
+
+    Args:
+        task (str): The browser task instructions.
+
+    Returns:
+        str: A hash of the whitespace- and case-normalized task and its start URL.
+    """
+    normalized = URL_PATTERN.sub(lambda match: _normalize_url(match.group(0)), task)
+    normalized = " ".join(normalized.lower().split())
+    return make_key(normalized, start_url(task))
+
+
+def same_page(url: str, other: str) -> bool:
+    """Whether two URLs point to the same page, ignoring fragments and trailing slashes."""
+    return _normalize_url(url.split("#")[0]) == _normalize_url(other.split("#")[0])
+
+
+class TraceStore:
+    """On-disk store of recorded browser action histories."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """Initialize the store.
+
+        Args:
+            directory (str, optional): Storage directory. Defaults to
+                `browser_traces/` under `Settings.STORAGE_DIR`.
+        """
+        self.store = DiskCache(directory or os.path.join(settings.STORAGE_DIR, "browser_traces"))
+
+    def save(self, key: str, history: AgentHistoryList) -> None:
+        """Store the action history of a passed test case."""
+        self.store.set(key, history.model_dump())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the stored entry of a recorded history, or None if nothing was recorded."""
+        return self.store.get(key)
+
+    def load(
+        self,
+        key: str,
+        output_model: Type[BaseModel],
+        entry: Optional[Dict[str, Any]] = None
+    ) -> Optional[AgentHistoryList]:
+        """Load a recorded action history.
+
+        Args:
+            key (str): The trace key of the task.
+            output_model: The `AgentOutput` model of the replaying agent, which
+                knows how to parse its recorded actions.
+            entry (dict, optional): The entry already read by `get`.
+
+        Returns:
+            AgentHistoryList: The recorded history, or None if none is usable.
+        """
+        entry = self.store.get(key) if entry is None else entry
+        if entry is None:
+            return None
+        try:
+            return AgentHistoryList.load_from_dict(entry, output_model)
+        except Exception:
+            self.store.delete(key)
+            return None
+
+    def delete(self, key: str) -> None:
+        """Forget a recorded history, e.g. after it stopped matching the page."""
+        self.store.delete(key)
+
+
+class ReplaySummaryLLM:
+    """Stand-in chat model for the summary browser-use writes after a replay.
+
+    The tool reports the recorded final answer of a replayed test case, so the
+    summary is never used; answering it locally saves a model call per replay.
+    """
+
+    model = "replay-summary"
+    _verified_api_keys = True
+
+    @property
+    def provider(self) -> str:
+        return "local"
+
+    @property
+    def name(self) -> str:
+        return self.model
+
+    @property
+    def model_name(self) -> str:
+        return self.model
+
+    async def ainvoke(self, messages: Any, output_format: Any = None, **kwargs: Any) -> ChatInvokeCompletion:
+        """Report the replay as complete without calling a model."""
+        summary = RerunSummaryAction(summary="Replayed recorded actions", success=True, completion_status="complete")
+        completion = summary if output_format is not None else summary.summary
+        return ChatInvokeCompletion(completion=completion, usage=None)
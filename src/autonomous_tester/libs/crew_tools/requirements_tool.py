@@ -1,10 +1,34 @@
-"""Requirements tool for autonomous tester."""
+"""Requirements tool for autonomous tester.
 
+The requirements vector index is persisted under `Settings.STORAGE_DIR`:
+
+- Each version of a requirements file gets its own collection, named after the
+  file content hash and the embedding model, so edited files never serve
+  stale chunks. Collections of older versions of the same file are dropped.
+- Chunk embeddings are cached on disk by embedding model and chunk content, so
+  only the chunks that changed since the last run are sent to the embedding
+  deployment; everything else is loaded locally.
+"""
+
+import hashlib
+import os
 from pathlib import Path
-from chromadb.config import Settings
+from typing import List
+
+from chromadb.api.types import Documents, Embeddings
+from chromadb.config import Settings as ChromaSettings
+from crewai.rag.chromadb.config import ChromaDBConfig
+from crewai.rag.chromadb.factory import create_client
+from crewai.rag.chromadb.types import ChromaEmbeddingFunctionWrapper
+from crewai.rag.embeddings.factory import build_embedder
 from crewai_tools import TXTSearchTool
-from autonomous_tester.libs import settings
+from crewai_tools.adapters.crewai_rag_adapter import CrewAIRagAdapter
 
+from autonomous_tester.libs import logger, settings
+from autonomous_tester.libs.common.disk_cache import DiskCache, make_key
+
+INDEX_DIR = "requirements_index"
+EMBEDDINGS_DIR = "embeddings"
 
 
 def _get_config():
@@ -24,12 +48,70 @@ def _get_config():
     return config
 
 
+class CachedEmbeddingFunction(ChromaEmbeddingFunctionWrapper):
+    """Embedding function that only embeds chunks it has not seen before."""
+
+    def __init__(self, embedder: ChromaEmbeddingFunctionWrapper, model: str, cache: DiskCache):
+        """Initialize the cached embedding function.
+
+        Args:
+            embedder: The embedding function that serves cache misses.
+            model (str): The embedding model, part of every cache key.
+            cache (DiskCache): Store of chunk embeddings.
+        """
+        self.embedder = embedder
+        self.model = model
+        self.cache = cache
+
+    def __call__(self, input: Documents) -> Embeddings:
+        """Embed documents, reusing stored vectors for unchanged chunks."""
+        keys = [make_key(self.model, text) for text in input]
+        vectors: List = [self.cache.get(key) for key in keys]
+
+        missing = [index for index, vector in enumerate(vectors) if vector is None]
+        if missing:
+            logger.info(f"Embedding {len(missing)} of {len(input)} requirement chunks")
+            fresh = self.embedder([input[index] for index in missing])
+            for index, vector in zip(missing, fresh):
+                vectors[index] = [float(value) for value in vector]
+                self.cache.set(keys[index], vectors[index])
+
+        return vectors
+
+    def embed_query(self, input: Documents) -> Embeddings:
+        """Embed search queries with the wrapped embedding function."""
+        return self.embedder.embed_query(input)
+
+
+def _index_config(embedding_function: CachedEmbeddingFunction) -> ChromaDBConfig:
+    """Get the ChromaDB configuration of the persistent requirements index."""
+    return ChromaDBConfig(
+        settings=ChromaSettings(
+            persist_directory=os.path.join(settings.STORAGE_DIR, INDEX_DIR),
+            allow_reset=True,
+            is_persistent=True,
+            anonymized_telemetry=False,
+        ),
+        embedding_function=embedding_function,
+    )
+
+
+def _drop_stale_collections(config: ChromaDBConfig, prefix: str, current: str) -> None:
+    """Delete index collections of older versions of the same requirements file."""
+    client = create_client(config)
+    for collection in client.client.list_collections():
+        name = getattr(collection, "name", collection)
+        if name.startswith(prefix) and name != current:
+            client.delete_collection(collection_name=name)
+            logger.info(f"Dropped stale requirements index {name}")
+
+
 def get_requirements(requirements_path: str) -> TXTSearchTool:
     """Get requirements from a file and add them to the vector database.
-    
+
     Args:
         requirements_path (str): The path to the requirements file.
-    
+
     Returns:
         TXTSearchTool: A tool that can be used to search the requirements.
     """
@@ -37,8 +119,21 @@ def get_requirements(requirements_path: str) -> TXTSearchTool:
     if not path.is_file():
         raise FileNotFoundError(f"Requirements file not found: {requirements_path}")
 
+    content_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+    prefix = f"requirements_{make_key(str(path.resolve()))[:8]}_"
+    collection_name = prefix + make_key(settings.EMBEDDING_MODEL, content_hash)[:16]
+
+    embedding_function = CachedEmbeddingFunction(
+        build_embedder(_get_config()["embedding_model"]),
+        model=settings.EMBEDDING_MODEL,
+        cache=DiskCache(os.path.join(settings.STORAGE_DIR, INDEX_DIR, EMBEDDINGS_DIR)),
+    )
+    config = _index_config(embedding_function)
+    _drop_stale_collections(config, prefix, collection_name)
+
     requirements_tool = TXTSearchTool(
         txt=requirements_path,
-        config=_get_config(),
+        collection_name=collection_name,
+        adapter=CrewAIRagAdapter(collection_name=collection_name, config=config),
     )
     return requirements_tool
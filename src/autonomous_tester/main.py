@@ -1,24 +1,56 @@
 """Main script for the autonomous tester."""
 
 import argparse
-from typing import Literal
+from typing import Literal, Optional
 from autonomous_tester.tester_crew.tester_crew import AutonomousTester
+from autonomous_tester.libs import logger, settings
+from autonomous_tester.libs.common.checkpoint import RunCheckpoint
+from autonomous_tester.libs.common.llm_cache import get_llm_cache
+from autonomous_tester.libs.common.openapi_cases import openapi_test_cases
 from autonomous_tester.libs.common.task_manager import manage_tasks
+from autonomous_tester.libs.crew_tools import tester_tools
 
 
-def main(type: str, **kwargs):
+def main(type: str, replan: bool = False, changed_only: bool = False, checkpoint: Optional[RunCheckpoint] = None, **kwargs):
     """Main function to run the autonomous tester.
     
     Args:
         type (str): The type of application to be tested (e.g., web_app, api_app).
+        replan (bool): Run the planner even if a stored test plan matches the current setup.
+        changed_only (bool): Run only the test cases of changed requirement sections,
+            the ones that failed last time and a sample of the rest.
+        checkpoint (RunCheckpoint, optional): Checkpoint of the run; a new one is started if not given.
         **kwargs: Additional keyword arguments for task management (e.g., endpoint).
     """
+    if checkpoint is None:
+        checkpoint = RunCheckpoint.create(type=type, replan=replan, changed_only=changed_only, **kwargs)
+    logger.info(f"Run {checkpoint.run_id}: resume it with --resume {checkpoint.run_id} if it fails")
+
     inputs = {
-        "task_description": manage_tasks(type, **kwargs)
+        "task_description": manage_tasks(type, **kwargs),
+        "endpoint": kwargs.get("endpoint"),
     }
 
-    autonomous_tester = AutonomousTester().crew()
-    autonomous_tester.kickoff(inputs=inputs)
+    generated_cases = openapi_test_cases(kwargs.get("endpoint")) if type == "api_app" else []
+
+    autonomous_tester = AutonomousTester(
+        replan=replan,
+        generated_cases=generated_cases,
+        changed_only=changed_only,
+        checkpoint=checkpoint,
+    )
+    autonomous_tester.run(inputs=inputs)
+
+    if settings.LLM_CACHE:
+        logger.info(f"LLM cache stats: {get_llm_cache().stats()}")
+    if settings.BROWSER_LEAN:
+        logger.info(f"Lean browsing stats: {tester_tools.browser_tool.lean_stats()}")
+    throttle_stats = tester_tools.api_tool.throttle_stats()
+    if throttle_stats:
+        logger.info(f"API throttling stats: {throttle_stats}")
+    auth_stats = tester_tools.api_tool.auth_stats()
+    if auth_stats["logins"]:
+        logger.info(f"API auth token stats: {auth_stats}")
 
 
 if __name__ == "__main__":
@@ -30,15 +62,52 @@ if __name__ == "__main__":
         "--type",
         type=str,
         choices=["web_app", "api_app"],
-        required=True,
-        help="Application type (e.g., web_app, api_app).",
+        help="Application type (e.g., web_app, api_app). Required unless resuming a run.",
     )
 
     parser.add_argument(
         "--endpoint",
         type=str,
-        required=True,
-        help="The endpoint of the web application to be tested (e.g., http://localhost:8000).",
+        help="The endpoint of the web application to be tested (e.g., http://localhost:8000). Required unless resuming a run.",
+    )
+
+    parser.add_argument(
+        "--replan",
+        action="store_true",
+        help="Create a new test plan even if a stored plan matches the requirements, configuration and model.",
+    )
+
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help=(
+            "Plan only the requirement sections changed since the last run, and run only their test cases, "
+            "the test cases that failed last time and a sample of the rest (AT_CHANGED_ONLY_SAMPLE)."
+        ),
+    )
+
+    parser.add_argument(
+        "--resume",
+        type=str,
+        metavar="RUN_ID",
+        help="Continue a failed run from its last checkpoint, skipping the work it finished ('latest' for the last run).",
     )
     args = parser.parse_args()
-    main(args.type, endpoint=args.endpoint)
+
+    if args.resume:
+        try:
+            checkpoint = RunCheckpoint.open(args.resume)
+        except ValueError as e:
+            parser.error(str(e))
+        options = checkpoint.options
+        main(
+            options["type"],
+            replan=options.get("replan", False),
+            changed_only=options.get("changed_only", False),
+            checkpoint=checkpoint,
+            endpoint=options.get("endpoint"),
+        )
+    elif not args.type or not args.endpoint:
+        parser.error("--type and --endpoint are required unless a run is resumed")
+    else:
+        main(args.type, replan=args.replan, changed_only=args.changed_only, endpoint=args.endpoint)
@@ -1,14 +1,32 @@
 """Multi model AI Agentic crew for autonomous testing of software applications."""
 
-from crewai import Agent, Crew, Process, Task
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from crewai import Agent, Crew, CrewOutput, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from crewai.tasks.task_output import TaskOutput
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-from autonomous_tester.libs import get_settings, Settings
+from autonomous_tester.libs import get_settings, logger, Settings
+from autonomous_tester.libs.common.checkpoint import RunCheckpoint
+from autonomous_tester.libs.common.llm_cache import get_agent_llm
+from autonomous_tester.libs.common.openapi_cases import covered_tests
+from autonomous_tester.libs.common.plan_cache import load_plan, store_plan
+from autonomous_tester.libs.common.test_history import RequirementSections, TestHistory, case_key, link_text
+from autonomous_tester.libs.common.test_plan import TestCase, TestPlan, read_test_plan, split_test_cases
+from autonomous_tester.libs.common.test_report import CaseResult, render_report, summary_digest
 from autonomous_tester.libs.crew_tools import tester_tools
 
 
+REPORT_FILE = "test_report.md"
+CHANGED_SECTIONS_NOTE = (
+    "The requirements changed since the last run. Only write test cases for the following "
+    "requirement sections; the other sections already have test cases:\n{sections}"
+)
+
+
 @CrewBase
 class AutonomousTester():
     """Crew for autonomous testing."""
@@ -20,13 +38,43 @@ class AutonomousTester():
     agents_config = settings.AGENTS_CONFIG
     tasks_config = settings.TASKS_CONFIG
 
+    def __init__(
+        self,
+        replan: bool = False,
+        generated_cases: Optional[List[TestCase]] = None,
+        changed_only: bool = False,
+        checkpoint: Optional[RunCheckpoint] = None
+    ):
+        """Initialize the crew.
+
+        Args:
+            replan (bool): Run the planner even if a plan for the current
+                requirements, configuration and model is stored.
+            generated_cases (List[TestCase], optional): Test cases generated
+                without the LLM, e.g. from an OpenAPI description. They run
+                before the planned cases, and the planner is told not to repeat them.
+            changed_only (bool): Plan and run only what changed since the
+                last run (see `test_history`).
+            checkpoint (RunCheckpoint, optional): Where task outputs and test
+                case results are saved as they finish. Work already saved in
+                it is skipped, so a failed run can be resumed.
+        """
+        self.replan = replan
+        self.changed_only = changed_only
+        self.checkpoint = checkpoint
+        self.generated_cases = generated_cases or []
+        self.covered_tests = covered_tests(self.generated_cases)
+        self.cached_plan: Optional[TaskOutput] = None if replan else load_plan(self.covered_tests)
+
     @agent
     def test_planner(self) -> Agent:
         """Agent responsible for planning the testing strategy."""
         return Agent(
             config=self.agents_config['test_planner'],
             verbose=self.settings.VERBOSE,
-            tools=[tester_tools.requirements_tool(self.settings.REQUIREMENTS_PATH)],
+            llm=get_agent_llm(),
+            # The requirements search tool is added by `_equip_planner` once a plan is actually produced.
+            tools=[],
         )
 
     @agent
@@ -35,6 +83,7 @@ class AutonomousTester():
         return Agent(
             config=self.agents_config['test_specialist'],
             verbose=self.settings.VERBOSE,
+            llm=get_agent_llm(),
             tools=[
                 tester_tools.browser_tool,
                 tester_tools.api_tool,
@@ -47,14 +96,19 @@ class AutonomousTester():
         return Agent(
             config=self.agents_config['report_specialist'],
             verbose=self.settings.VERBOSE,
+            llm=get_agent_llm(),
         )
 
     @task
     def test_planning(self) -> Task:
         """Task for planning the testing strategy."""
-        return Task(
+        task = Task(
             config=self.tasks_config['test_planning'],
+            output_pydantic=TestPlan,
         )
+        # A stored plan stands in for the planner's output as test_execution context.
+        task.output = self.cached_plan
+        return task
 
     @task
     def test_execution(self) -> Task:
@@ -70,16 +124,305 @@ class AutonomousTester():
         return Task(
             config=self.tasks_config['report_generation'],
             context=[self.test_execution()],
-            output_file="test_report.md",
+            output_file=REPORT_FILE,
             markdown=True
         )
 
     @crew
     def crew(self) -> Crew:
         """Crew for autonomous testing."""
+        tasks = self.tasks
+        if self.cached_plan is not None:
+            tasks = [task for task in tasks if task is not self.test_planning()]
+        if self.checkpoint is not None:
+            # Tasks a resumed run already finished stand in with their saved output, like a stored plan.
+            finished = {task.name: self.checkpoint.load_task(task.name) for task in tasks}
+            for task in tasks:
+                if finished[task.name] is not None:
+                    task.output = finished[task.name]
+            tasks = [task for task in tasks if finished[task.name] is None]
+        if any(task is self.test_planning() for task in tasks):
+            self._equip_planner()
+
         return Crew(
             agents=self.agents,
-            tasks=self.tasks,
+            tasks=tasks,
             process=Process.sequential,
             verbose=self.settings.VERBOSE,
+            task_callback=self._save_task if self.checkpoint is not None else None,
+        )
+
+    def _equip_planner(self) -> None:
+        """Give the planner its requirements search tool before it plans.
+
+        Building the tool indexes the requirements, so it is left out while
+        the plan comes from the plan cache or a checkpoint.
+        """
+        planner = self.test_planner()
+        if not planner.tools:
+            planner.tools = [tester_tools.requirements_tool(self.settings.REQUIREMENTS_PATH)]
+
+    def _save_task(self, output: TaskOutput) -> None:
+        """Checkpoint the output of a finished crew task."""
+        self.checkpoint.save_task(output.name, output)
+
+    def _run_crew(self, inputs: Dict[str, Any]) -> CrewOutput:
+        """Run the sequential crew, unless a resumed run already finished it."""
+        report = self.checkpoint.load_task("report_generation") if self.checkpoint is not None else None
+        if report is not None:
+            return CrewOutput(raw=report.raw, tasks_output=[report])
+        return self.crew().kickoff(inputs=inputs)
+
+    def _kickoff(self, tasks: List[Task], inputs: Dict[str, Any]) -> CrewOutput:
+        """Run some of the crew tasks as a crew of their own."""
+        return Crew(
+            agents=list({id(task.agent): task.agent for task in tasks}.values()),
+            tasks=tasks,
+            process=Process.sequential,
+            verbose=self.settings.VERBOSE,
+        ).kickoff(inputs=inputs)
+
+    def _execute_api_case(self, test_case: TestCase, inputs: Dict[str, Any]) -> CaseResult:
+        """Execute a fully specified API test case with the API tool, without the LLM."""
+        request = test_case.request.to_tool_input(inputs.get("endpoint"))
+        result = json.loads(tester_tools.api_tool.run(json.dumps(request)))
+
+        failed = [validation for validation in result.get("validations", []) if "✗" in validation]
+        defect = result.get("error") or "; ".join(failed) or None
+        if not result.get("success") and defect is None:
+            defect = f"Request failed with status code {result.get('status_code')}"
+        return CaseResult.from_case(
+            test_case,
+            result.get("success", False),
+            defect,
+            response_time_ms=result.get("response_time_ms") or None,
+        )
+
+    def _execute_case(self, test_case: Union[TestCase, str], inputs: Dict[str, Any]) -> CaseResult:
+        """Execute a single test case as its own sub-task.
+
+        Each sub-task gets a copy of the test specialist, so cases running at the
+        same time do not share agent state. API test cases with a complete
+        request spec are dispatched to the API tool directly.
+        """
+        start = time.perf_counter()
+        completed = False
+        try:
+            if isinstance(test_case, TestCase) and test_case.is_deterministic:
+                result = self._execute_api_case(test_case, inputs)
+            else:
+                case_task = Task(
+                    config=self.tasks_config['test_case_execution'],
+                    agent=self.test_specialist().copy(),
+                )
+                case_text = test_case.to_prompt() if isinstance(test_case, TestCase) else test_case
+                answer = self._kickoff([case_task], {**inputs, "test_case": case_text}).raw
+                result = CaseResult.from_text(answer, test_case)
+            completed = True
+        except Exception as e:
+            logger.error(f"Test case could not be executed: {e}")
+            result = CaseResult.from_text(
+                f"Status: FAILED\nDefect: the test case could not be executed ({e})", test_case
+            )
+        result.duration_ms = (time.perf_counter() - start) * 1000
+        # A test case that could not be executed is not saved, so a resumed run tries it again.
+        if completed and self.checkpoint is not None:
+            self.checkpoint.save_result(case_key(test_case), result)
+        return result
+
+    def _plan(self, inputs: Dict[str, Any], context: str) -> TaskOutput:
+        """Get the test plan for a planning context.
+
+        The plan of a resumed run comes from its checkpoint; otherwise a stored
+        plan is reused unless `replan` is set, and the planner runs only
+        without one.
+        """
+        plan = self.checkpoint.load_task("test_planning") if self.checkpoint is not None else None
+        if plan is None and not self.replan:
+            plan = self.cached_plan if context == self.covered_tests else load_plan(context)
+        if plan is None:
+            self._equip_planner()
+            plan = self._kickoff([self.test_planning()], {**inputs, "covered_tests": context}).tasks_output[0]
+            store_plan(plan, context)
+        if self.checkpoint is not None:
+            self.checkpoint.save_task("test_planning", plan)
+        return plan
+
+    def _plan_changes(
+        self,
+        inputs: Dict[str, Any],
+        sections: RequirementSections,
+        history: TestHistory,
+        changed: Set[str]
+    ) -> List[Union[TestCase, str]]:
+        """Plan test cases for the changed requirement sections only.
+
+        Stored test cases of the last run are kept unless they cover a changed
+        or removed section; the planner writes the test cases of the new and
+        changed sections, with its requirements search tool even when the
+        crew was built around a stored plan (see `_equip_planner`).
+        """
+        kept = [
+            test_case for test_case in history.planned_cases()
+            if not changed & set(history.links.get(case_key(test_case), []))
+        ]
+        replanned = [title for title in sections.sections if title in changed]
+        if not replanned:
+            return kept
+
+        note = CHANGED_SECTIONS_NOTE.format(sections="\n".join(f"- {title}" for title in replanned))
+        plan = self._plan(inputs, "\n\n".join(part for part in (self.covered_tests, note) if part))
+
+        test_plan = read_test_plan(plan)
+        planned = test_plan.test_cases if test_plan else (split_test_cases(plan.raw) or [plan.raw])
+        return kept + planned
+
+    def _choose_cases(
+        self,
+        inputs: Dict[str, Any],
+        sections: RequirementSections,
+        history: TestHistory
+    ) -> Optional[Tuple[List[Union[TestCase, str]], List[Union[TestCase, str]], Dict[str, List[str]], int]]:
+        """Plan the test suite and choose the test cases to execute.
+
+        Returns:
+            Tuple: The test cases to execute, the planned test cases, the
+                requirement sections of every test case by case key and the
+                suite size; None if the plan has to run through the sequential crew.
+        """
+        changed = sections.changed(history.fingerprints)
+        selective = self.changed_only and history.exists
+        if self.changed_only and not selective:
+            logger.info("No earlier run is recorded for these requirements, the whole suite runs")
+
+        planned: List[Union[TestCase, str]] = []
+        if self.generated_cases and self.settings.OPENAPI_ONLY:
+            logger.info("Planning is skipped, only the test cases generated from the OpenAPI description run")
+        elif selective and not self.replan:
+            planned = self._plan_changes(inputs, sections, history, changed)
+        else:
+            plan = self._plan(inputs, self.covered_tests)
+            self.cached_plan = self.test_planning().output = plan
+
+            test_plan = read_test_plan(plan)
+            planned = test_plan.test_cases if test_plan else split_test_cases(plan.raw)
+            if test_plan is None and len(planned) < 2:
+                if not self.generated_cases:
+                    return None
+                planned = [plan.raw]
+
+        test_cases = self.generated_cases + planned
+        if not test_cases:
+            return None
+
+        links = {case_key(test_case): sections.link(link_text(test_case)) for test_case in test_cases}
+        suite_size = len(test_cases)
+        if selective:
+            test_cases, reasons = history.select(test_cases, links, changed)
+            logger.info(
+                f"Running {len(test_cases)} of {suite_size} test cases ({dict(reasons) or 'none changed'}); "
+                f"changed requirement sections: {', '.join(sorted(changed)) or 'none'}"
+            )
+        return test_cases, planned, links, suite_size
+
+    def _report(self, results: List[CaseResult], skipped: int = 0) -> CrewOutput:
+        """Write the test report of the test case results.
+
+        The report is rendered locally; the report specialist only writes the
+        executive summary, from a digest of at most
+        `Settings.REPORT_SUMMARY_MAX_CHARS` characters (0 skips the summary).
+        """
+        summary_output = CrewOutput()
+        summary = self.checkpoint.load_task("report_summary") if self.checkpoint is not None else None
+        if summary is not None:
+            summary_output = CrewOutput(raw=summary.raw, tasks_output=[summary])
+        elif self.settings.REPORT_SUMMARY_MAX_CHARS > 0 and results:
+            summary_task = Task(
+                config=self.tasks_config['report_summary'],
+                agent=self.report_specialist(),
+            )
+            digest = summary_digest(results, self.settings.REPORT_SUMMARY_MAX_CHARS)
+            try:
+                summary_output = self._kickoff([summary_task], {"results_digest": digest})
+                if self.checkpoint is not None:
+                    self.checkpoint.save_task("report_summary", summary_output.tasks_output[0])
+            except Exception as e:
+                logger.error(f"Executive summary could not be written: {e}")
+
+        report = render_report(results, summary_output.raw, skipped)
+        with open(REPORT_FILE, "w", encoding="utf-8") as file:
+            file.write(report)
+        logger.info(f"Test report written to {REPORT_FILE}")
+        return CrewOutput(raw=report, tasks_output=summary_output.tasks_output, token_usage=summary_output.token_usage)
+
+    def run(self, inputs: Dict[str, Any]) -> CrewOutput:
+        """Run the crew, executing the planned test cases in parallel.
+
+        Each test case of the plan runs as its own sub-task, at most
+        `Settings.MAX_PARALLEL_CASES` at a time, and the test report is rendered
+        from their results. A plan that is not a valid `TestPlan` is split into
+        its test cases as text, and a plan whose test cases cannot be told apart
+        runs through the sequential crew instead. Generated test cases run
+        before the planned ones; with `Settings.OPENAPI_ONLY` they run alone and
+        the planner is skipped.
+
+        Every run records the requirement fingerprints, test cases and results.
+        With `changed_only`, only the changed requirement sections are planned
+        again, and only the test cases they affect, new ones, the ones that
+        failed last time and a sample of the rest are executed.
+
+        With a checkpoint, the plan, the chosen test cases and each test case
+        result are saved as they finish, and a resumed run only executes the
+        test cases that did not finish.
+
+        Args:
+            inputs (dict): The crew inputs, e.g. the task description.
+
+        Returns:
+            CrewOutput: The test report.
+        """
+        inputs = {**inputs, "covered_tests": self.covered_tests}
+        sections = RequirementSections.load(self.settings.REQUIREMENTS_PATH)
+        history = TestHistory(inputs.get("endpoint"))
+
+        chosen = self.checkpoint.load_cases() if self.checkpoint is not None else None
+        if chosen is None:
+            chosen = self._choose_cases(inputs, sections, history)
+            if chosen is None:
+                return self._run_crew(inputs)
+            if self.checkpoint is not None:
+                self.checkpoint.save_cases(*chosen)
+        test_cases, planned, links, suite_size = chosen
+
+        finished = self.checkpoint.load_results() if self.checkpoint is not None else {}
+        pending = [test_case for test_case in test_cases if case_key(test_case) not in finished]
+        if len(pending) < len(test_cases):
+            logger.info(f"Resuming run {self.checkpoint.run_id}: {len(test_cases) - len(pending)} of {len(test_cases)} test cases already finished")
+        if pending and self.checkpoint is not None:
+            # A summary of an earlier attempt does not cover the results about to come.
+            self.checkpoint.discard_task("report_summary")
+        test_cases = pending
+
+        direct = sum(isinstance(test_case, TestCase) and test_case.is_deterministic for test_case in test_cases)
+        if direct:
+            logger.info(f"{direct} of {len(test_cases)} test cases are fully specified API calls, run without the LLM")
+        logger.info(f"Executing {len(test_cases)} test cases, up to {self.settings.MAX_PARALLEL_CASES} at a time")
+        with ThreadPoolExecutor(max_workers=max(1, self.settings.MAX_PARALLEL_CASES)) as executor:
+            executed = list(executor.map(lambda test_case: self._execute_case(test_case, inputs), test_cases))
+
+        by_key = {**finished, **{case_key(test_case): result for test_case, result in zip(test_cases, executed)}}
+        test_cases, _, _, _ = chosen
+        results = [by_key[case_key(test_case)] for test_case in test_cases]
+
+        execution = self.test_execution()
+        execution.output = TaskOutput(
+            description=execution.description,
+            name="test_execution",
+            expected_output=execution.expected_output,
+            raw="\n\n".join(result.to_text() for result in results),
+            agent=self.test_specialist().role,
         )
+        if self.checkpoint is not None:
+            self.checkpoint.save_task("test_execution", execution.output)
+        history.save(sections, planned, links, {case_key(test_case): result for test_case, result in zip(test_cases, results)})
+        return self._report(results, suite_size - len(test_cases))
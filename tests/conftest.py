@@ -1,5 +1,9 @@
 """Conftest file for pytest fixtures."""
 
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 
 
@@ -7,3 +11,71 @@ import pytest
 def sample_fixture():
     """A sample fixture for testing."""
     return "This is a sample fixture"
+
+
+class _APIHandler(BaseHTTPRequestHandler):
+    """Request handler of the test API.
+
+    GET `/items/<n>` lists n items with ids 0, 1, 2, 0, ...; other paths are not
+    JSON. POST `/login` issues a new token, which replaces the previous one, and
+    GET `/me` needs the current token. Other POSTs create a user, and fail with
+    a 500 for names over 100 characters.
+    """
+
+    def _reply(self, status, body, content_type="application/json"):
+        data = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path.startswith("/items/"):
+            count = int(self.path.rsplit("/", 1)[1])
+            self._reply(200, {"items": [{"id": index % 3} for index in range(count)]})
+        elif self.path == "/me":
+            if self.server.token and self.headers.get("Authorization") == f"Bearer {self.server.token}":
+                self._reply(200, {"user": "ann"})
+            else:
+                self._reply(401, {"detail": "invalid token"})
+        else:
+            self._reply(200, "plain text", "text/plain")
+
+    def do_POST(self):
+        self.server.requests.append(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            user = json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            user = None
+        if self.path == "/login":
+            self.server.logins += 1
+            self.server.token = f"token-{self.server.logins}"
+            self._reply(200, {"data": {"token": self.server.token}, "expires_in": 600})
+        elif not isinstance(user, dict) or not isinstance(user.get("name"), str):
+            self._reply(422, {"detail": "name must be a string"})
+        elif len(user["name"]) > 100:
+            # The defect the fuzzing tests look for: long names crash the server.
+            self._reply(500, {"error": "value too long for column name"})
+        else:
+            self._reply(201, {"id": 1, "name": user["name"]})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def api_server():
+    """A local HTTP API for the API test tool; yields its base URL and records request paths."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _APIHandler)
+    server.requests = []
+    server.logins, server.token = 0, None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,162 @@
+"""Tests for the auth profiles of the API test tool."""
+
+import json
+import threading
+
+import pytest
+import requests
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.crew_tools import api_auth
+from autonomous_tester.libs.crew_tools.api_auth import AuthProfiles
+from autonomous_tester.libs.crew_tools.api_test_tool import APITestResult, APITestTool
+
+PROFILE = {"login": {"url": "/login", "method": "POST"}, "token_path": "data.token", "expires_in_path": "expires_in"}
+
+
+class FakeLogin:
+    """Answers login requests with a new token each time."""
+
+    def __init__(self, expires_in=600, status_code=200):
+        self.specs = []
+        self.expires_in = expires_in
+        self.status_code = status_code
+        self._lock = threading.Lock()
+
+    def __call__(self, spec):
+        with self._lock:
+            self.specs.append(spec)
+            token = f"token-{len(self.specs)}"
+        body = {"data": {"token": token}, "expires_in": self.expires_in}
+        return APITestResult(success=self.status_code < 400, status_code=self.status_code, response_time_ms=1.0, headers={}, response_body=body)
+
+
+@pytest.fixture
+def profiles():
+    """A registry with an `admin` profile and no profiles file."""
+    profiles = AuthProfiles(path="")
+    profiles.register({"admin": PROFILE})
+    return profiles
+
+
+def test_token_is_cached(profiles):
+    """The token is fetched once and reused; the login URL is resolved against the request URL."""
+    send = FakeLogin()
+    first = profiles.headers("admin", "http://api.test/items/1", send)
+    second = profiles.headers("admin", "http://api.test/items/2", send)
+    assert first == second == {"Authorization": "Bearer token-1"}
+    assert [spec["url"] for spec in send.specs] == ["http://api.test/login"]
+    assert profiles.stats() == {"hits": 1, "logins": 1, "refreshes": 0}
+
+    # Another host has its own login and token.
+    assert profiles.headers("admin", "http://other.test/items", send) == {"Authorization": "Bearer token-2"}
+
+
+def test_concurrent_requests_share_one_login(profiles):
+    """Requests that need a token at the same time wait for a single login."""
+    send = FakeLogin()
+    headers = []
+    threads = [threading.Thread(target=lambda: headers.append(profiles.headers("admin", "http://api.test/", send))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(send.specs) == 1
+    assert headers == [{"Authorization": "Bearer token-1"}] * 8
+
+
+def test_expired_token_is_refreshed(profiles, monkeypatch):
+    """A token is fetched again once its lifetime, less a safety margin, is over."""
+    now = [1000.0]
+    monkeypatch.setattr(api_auth.time, "monotonic", lambda: now[0])
+    send = FakeLogin(expires_in=100)
+    assert profiles.headers("admin", "http://api.test/", send) == {"Authorization": "Bearer token-1"}
+    now[0] += 89
+    assert profiles.headers("admin", "http://api.test/", send) == {"Authorization": "Bearer token-1"}
+    now[0] += 2
+    assert profiles.headers("admin", "http://api.test/", send) == {"Authorization": "Bearer token-2"}
+
+
+def test_invalidate_drops_only_the_rejected_token(profiles):
+    """A 401 drops the token it was sent with, but not one that already replaced it."""
+    send = FakeLogin()
+    rejected = profiles.headers("admin", "http://api.test/", send)
+    profiles.invalidate("admin", "http://api.test/", rejected)
+    current = profiles.headers("admin", "http://api.test/", send)
+    assert current == {"Authorization": "Bearer token-2"}
+
+    profiles.invalidate("admin", "http://api.test/", rejected)
+    assert profiles.headers("admin", "http://api.test/", send) == current
+    assert profiles.stats() == {"hits": 1, "logins": 2, "refreshes": 1}
+
+
+def test_login_errors(profiles):
+    """Failed logins, missing tokens and unknown profiles are errors."""
+    with pytest.raises(ValueError, match="status 401"):
+        profiles.headers("admin", "http://api.test/", FakeLogin(status_code=401))
+    profiles.register({"other": {**PROFILE, "token_path": "data.missing"}})
+    with pytest.raises(ValueError, match="No token"):
+        profiles.headers("other", "http://api.test/", FakeLogin())
+    with pytest.raises(ValueError, match="Unknown auth profile"):
+        profiles.headers("nobody", "http://api.test/", FakeLogin())
+
+
+def test_profiles_file_is_loaded_on_first_use(tmp_path, monkeypatch):
+    """The file is read when a profile is first needed, with environment variables filled in."""
+    path = tmp_path / "profiles.yaml"
+    path.write_text("admin:\n  login: {url: /login, method: POST, body: {password: '${ADMIN_PASSWORD}'}}\n  token_path: data.token\n")
+    monkeypatch.setenv("ADMIN_PASSWORD", "secret")
+    monkeypatch.setattr(settings, "API_AUTH_PROFILES", str(path))
+    profiles = AuthProfiles()
+    assert profiles.profiles == {}
+
+    send = FakeLogin()
+    profiles.headers("admin", "http://api.test/", send)
+    assert send.specs[0]["body"] == {"password": "secret"}
+
+
+@pytest.mark.parametrize("content", [None, "admin: [", "admin: 5", "- admin"])
+def test_invalid_profiles_file_fails_on_use(tmp_path, content):
+    """A missing or invalid profiles file is an error of the profile's requests, not of construction."""
+    path = tmp_path / "profiles.yaml"
+    if content is not None:
+        path.write_text(content)
+    profiles = AuthProfiles(path=str(path))
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Cannot load auth profiles"):
+            profiles.headers("admin", "http://api.test/", FakeLogin())
+
+
+def test_tool_with_invalid_profiles_file(tmp_path, monkeypatch, api_server):
+    """The tool still builds; requests with a profile fail with an error result, others run."""
+    monkeypatch.setattr(settings, "API_AUTH_PROFILES", str(tmp_path / "missing.yaml"))
+    tool = APITestTool()
+    try:
+        base = f"http://127.0.0.1:{api_server.server_port}"
+        result = json.loads(tool._run(json.dumps({"url": f"{base}/me", "auth": {"type": "profile", "name": "admin"}})))
+        assert not result["success"]
+        assert result["error"].startswith("Authentication failed: Cannot load auth profiles")
+        assert json.loads(tool._run(json.dumps({"url": f"{base}/items/1"})))["success"]
+    finally:
+        tool.close()
+
+
+def test_tool_fetches_a_new_token_after_a_401(api_server):
+    """A request whose token the server no longer accepts logs in again and is sent once more."""
+    base = f"http://127.0.0.1:{api_server.server_port}"
+    tool = APITestTool()
+    try:
+        tool._run(json.dumps({"auth_profiles": {"admin": PROFILE}}))
+        request = json.dumps({"url": f"{base}/me", "auth": {"type": "profile", "name": "admin"}, "validate": {"status_code": 200}})
+        assert json.loads(tool._run(request))["success"]
+        assert json.loads(tool._run(request))["success"]
+        assert api_server.logins == 1
+
+        # Another client logs in, so the cached token is rejected.
+        requests.post(f"{base}/login", timeout=5)
+        assert json.loads(tool._run(request))["success"]
+        assert api_server.logins == 3
+        assert tool.auth_stats() == {"hits": 2, "logins": 2, "refreshes": 1}
+        assert api_server.requests.count("/me") == 4
+    finally:
+        tool.close()
@@ -0,0 +1,55 @@
+"""Tests for the record/replay cassette of the API test tool."""
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+from autonomous_tester.libs.crew_tools.api_cassette import Cassette, cassette_key
+
+
+def test_key_normalizes_url_and_params():
+    """Scheme and host case, query order and params given apart from the URL do not change the key."""
+    key = cassette_key("get", "HTTPS://API.Example.com/items?b=2&a=1", {})
+    assert cassette_key("GET", "https://api.example.com/items?a=1&b=2", {}) == key
+    assert cassette_key("GET", "https://api.example.com/items", {"params": {"b": 2, "a": "1"}}) == key
+    assert cassette_key("GET", "https://api.example.com/items?a=1", {"params": {"b": [2]}}) == key
+
+
+def test_key_keeps_what_changes_the_response():
+    """Path case, method, body, relevant headers and the basic auth user are part of the key."""
+    base = cassette_key("GET", "https://api.example.com/items", {})
+    assert cassette_key("GET", "https://api.example.com/Items", {}) != base
+    assert cassette_key("POST", "https://api.example.com/items", {}) != base
+    assert cassette_key("POST", "https://api.example.com/items", {"json": {"a": 1}}) != \
+        cassette_key("POST", "https://api.example.com/items", {"json": {"a": 2}})
+    assert cassette_key("GET", "https://api.example.com/items", {"headers": {"Accept": "text/csv"}}) != base
+    assert cassette_key("GET", "https://api.example.com/items", {"auth": HTTPBasicAuth("alice", "x")}) != \
+        cassette_key("GET", "https://api.example.com/items", {"auth": HTTPBasicAuth("bob", "x")})
+
+
+def test_key_ignores_volatile_headers_and_secrets():
+    """Transport headers, header name case and the basic auth password do not change the key."""
+    headers = {"Accept": "application/json"}
+    key = cassette_key("GET", "https://api.example.com/items", {"headers": headers, "auth": HTTPBasicAuth("alice", "a")})
+    varied = {"accept": "application/json", "User-Agent": "x/1", "Accept-Encoding": "br", "Connection": "close"}
+    assert cassette_key("GET", "https://api.example.com/items", {"headers": varied, "auth": HTTPBasicAuth("alice", "b")}) == key
+
+
+def test_record_and_replay(tmp_path):
+    """A recorded response is rebuilt with its body, headers and timings."""
+    response = requests.Response()
+    response.url = "https://api.example.com/items"
+    response.status_code = 201
+    response.headers["Content-Type"] = "application/json"
+    response.encoding = "utf-8"
+    response._content = b'{"id": 1}'
+
+    cassette = Cassette(str(tmp_path), ttl=0)
+    key = cassette_key("POST", response.url, {"json": {"name": "a"}})
+    assert cassette.replay(key) is None
+    cassette.record(key, response, 12.5, {"dns_ms": 1.0})
+
+    replayed, response_time_ms, timings = cassette.replay(key)
+    assert replayed.status_code == 201
+    assert replayed.json() == {"id": 1}
+    assert replayed.headers["content-type"] == "application/json"
+    assert (response_time_ms, timings) == (12.5, {"dns_ms": 1.0})
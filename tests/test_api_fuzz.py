@@ -0,0 +1,112 @@
+"""Tests for the property-based fuzzing mode of the API test tool."""
+
+import json
+import socket
+
+import pytest
+
+from autonomous_tester.libs.crew_tools.api_fuzz import FuzzRunner, signature
+from autonomous_tester.libs.crew_tools.api_test_tool import APITestResult, APITestTool
+
+SEED_SPEC = {"url": "http://api.test/users", "method": "POST", "body": {"name": "alice", "age": 30, "tags": ["a"]}}
+
+
+def respond(spec):
+    """A fake server: names over 100 characters crash it, other invalid names are rejected."""
+    name = spec["body"].get("name") if isinstance(spec.get("body"), dict) else None
+    if not isinstance(name, str):
+        status, body = 422, {"detail": "name must be a string"}
+    elif len(name) > 100:
+        status, body = 500, {"error": "value too long for column name"}
+    else:
+        status, body = 201, {"id": 1}
+    return APITestResult(success=status < 500, status_code=status, response_time_ms=1.0, headers={}, response_body=body)
+
+
+def payloads(seed: int, iterations: int = 200):
+    """Generate the payloads of a run."""
+    runner = FuzzRunner(respond, iterations=iterations, seed=seed)
+    return list(runner._generate({"body": SEED_SPEC["body"], "params": {"page": "1"}}))
+
+
+def test_generation_is_deterministic_for_a_seed():
+    """The same seed generates the same payloads and mutations; another seed does not."""
+    assert payloads(7) == payloads(7)
+    assert payloads(7) != payloads(8)
+    mutations = [mutation for payload in payloads(7) for mutation in payload["mutations"]]
+    assert any(mutation.startswith("params.page") for mutation in mutations)
+    assert any(mutation.endswith("removed") for mutation in mutations)
+
+
+def test_same_seed_gives_the_same_report_at_any_concurrency():
+    """Groups, counts and shrunk examples repeat for a seed, whatever the number of workers."""
+    first = FuzzRunner(respond, iterations=300, concurrency=1, seed=3).run(SEED_SPEC)
+    second = FuzzRunner(respond, iterations=300, concurrency=8, seed=3).run(SEED_SPEC)
+    assert first.model_dump(exclude={"duration_s", "throughput_rps"}) == second.model_dump(exclude={"duration_s", "throughput_rps"})
+
+
+def test_failures_are_grouped_and_shrunk():
+    """A crash is reported once per signature, with a minimal change to the seed request."""
+    result = FuzzRunner(respond, iterations=500, concurrency=4, seed=1).run(SEED_SPEC)
+    assert not result.success
+    assert result.requests == 500
+    assert result.failures == result.status_codes["500"]
+
+    crash = result.groups[0]
+    assert crash.status_code == 500
+    assert crash.count == result.failures
+    assert list(crash.changes) == ["body.name"]
+    assert 100 < len(crash.body["name"]) < 4096
+    assert {key: value for key, value in crash.body.items() if key != "name"} == {"age": 30, "tags": ["a"]}
+    assert crash.shrink_requests > 0
+    assert "value too long" in crash.response
+    # Rejections below 500 are expected without an expected_status list.
+    assert all(group.status_code == 500 for group in result.groups)
+
+
+def test_unexpected_statuses_are_failures():
+    """With expected statuses, any other status is a failure group of its own; 5xx always fails."""
+    result = FuzzRunner(respond, iterations=300, seed=1, expected_status=[201]).run(SEED_SPEC)
+    assert {group.status_code for group in result.groups} == {422, 500}
+    rejected = next(group for group in result.groups if group.status_code == 422)
+    assert rejected.signature == signature(respond({"body": {}}))
+
+
+def test_seed_needs_something_to_mutate():
+    """A request without a JSON body or query parameters cannot be fuzzed."""
+    with pytest.raises(ValueError):
+        FuzzRunner(respond, iterations=10).run({"url": "http://api.test/", "method": "GET"})
+
+
+def test_fuzz_traffic_goes_through_the_host_throttle(api_server):
+    """Fuzzed requests are counted by the host's throttle, and the crash is found against a real server."""
+    url = f"http://127.0.0.1:{api_server.server_port}/users"
+    tool = APITestTool()
+    try:
+        query = {**SEED_SPEC, "url": url, "output": "full", "fuzz": {"iterations": 200, "seed": 1, "concurrency": 4}}
+        result = json.loads(tool._run(json.dumps(query)))
+        assert result["requests"] == 200
+        assert [group["status_code"] for group in result["groups"]] == [500]
+
+        sent = len(api_server.requests)
+        stats = next(iter(tool.throttle_stats().values()))
+        assert stats["requests"] == sent == 200 + result["groups"][0]["shrink_requests"]
+    finally:
+        tool.close()
+
+
+def test_open_circuit_stops_the_fuzz_run():
+    """Against a dead host the circuit opens and the run stops early instead of sending every request."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    tool = APITestTool()
+    try:
+        query = {**SEED_SPEC, "url": f"http://127.0.0.1:{port}/users", "fuzz": {"iterations": 500, "seed": 1}}
+        result = json.loads(tool._run(json.dumps(query)))
+        assert result["stopped"].startswith("Circuit open")
+        assert result["requests"] < 500
+        stats = next(iter(tool.throttle_stats().values()))
+        assert stats["circuit_opened"] >= 1
+    finally:
+        tool.close()
@@ -0,0 +1,146 @@
+"""Tests for the compiled JSON path engine."""
+
+import pytest
+
+from autonomous_tester.libs.crew_tools.api_json_path import Collector, PathSet, compile_path, path_set
+
+DOCUMENT = {
+    "data": {
+        "items": [
+            {"id": 1, "name": "pen", "price": 2.5, "stock": 0, "status": "active"},
+            {"id": 2, "name": "ink", "price": 12, "stock": 4, "status": "retired"},
+            {"id": 3, "name": "pad", "price": 30, "stock": 0, "status": "active", "email": "x@test"},
+        ],
+        "owner": {"name": "shop", "tags": ["a", "b"]},
+        "a.b": "quoted",
+    },
+    "total": 3,
+}
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("total", 3),
+    ("$.total", 3),
+    ("data.items.0.id", 1),
+    ("data.items[1].name", "ink"),
+    ("data.items[-1].id", 3),
+    ("data.items[5].id", None),
+    ("data.missing.key", None),
+    ("data['a.b']", "quoted"),
+    ("data.owner.*", ["shop", ["a", "b"]]),
+    ("data.items[*].id", [1, 2, 3]),
+    ("data.items[1:].id", [2, 3]),
+    ("data.items[::2].id", [1, 3]),
+    ("data.items[-2:].id", [2, 3]),
+    ('data.items[?(@.status == "active")].id', [1, 3]),
+    ("data.items[?(@.status == 'retired')].name", ["ink"]),
+    ("data.items[?(@.price > 10)].id", [2, 3]),
+    ("data.items[?(@.price <= 12)].id", [1, 2]),
+    ("data.items[?(@.stock != 0)].id", [2]),
+    ("data.items[?(@.email)].id", [3]),
+    ("data.items[?(@.name > 1)].id", []),
+    ("data.items.length()", 3),
+    ("data.items[*].id.unique()", True),
+    ("data.items[*].stock.unique()", False),
+    ("data.items[*].price.min()", 2.5),
+    ("data.items[*].price.max()", 30),
+    ("data.items[*].price.sum()", 44.5),
+    ("data.items[?(@.stock == 0)].length()", 2),
+    ("data.items[*].name.sum()", None),
+    ("data.missing[*].id.max()", None),
+    ("data.owner.tags.length()", 2),
+])
+def test_paths(expression, expected):
+    """Keys, indexes, wildcards, slices, filters and functions select the expected values."""
+    assert compile_path(expression).evaluate(DOCUMENT) == expected
+
+
+@pytest.mark.parametrize("expression", ["items[", "items.count()", "items[::0]", "items[?(@.a ~ 1)]", "items[?(@.a == nope)]"])
+def test_invalid_paths(expression):
+    """Malformed paths, unknown functions and bad filters are rejected."""
+    with pytest.raises(ValueError):
+        compile_path(expression)
+
+
+def test_paths_are_compiled_once():
+    """The same expression gives the same compiled path."""
+    assert compile_path("data.items[*].id") is compile_path("data.items[*].id")
+    assert path_set(("a", "b")) is path_set(("a", "b"))
+
+
+def test_prefix_and_element_streaming():
+    """The prefix is the leading plain keys; the next step decides whether elements can be streamed."""
+    assert compile_path("data.items[*].id").prefix == ("data", "items")
+    assert compile_path("data.items.0.id").prefix == ("data", "items", "0", "id")
+    assert compile_path("data.items[*].id").streams_elements
+    assert compile_path("items[?(@.a == 1)].length()").streams_elements
+    assert compile_path("items[2:5]").streams_elements
+    assert not compile_path("items[-2:]").streams_elements
+    assert not compile_path("items[-1].id").streams_elements
+    assert not compile_path("items.length()").streams_elements
+
+
+def test_path_set_shares_prefixes():
+    """Several paths are evaluated together with the same results as one by one."""
+    expressions = ["data.items[*].id", "data.items[*].price.sum()", "data.items.length()", "total", "data.items[9]"]
+    results = PathSet(expressions).evaluate(DOCUMENT)
+    assert results == {expression: compile_path(expression).evaluate(DOCUMENT) for expression in expressions}
+
+
+def test_evaluate_many_keeps_documents_apart():
+    """A batch is evaluated in one walk, but every document gets its own results."""
+    documents = [
+        {"items": [{"id": 1}, {"id": 2}]},
+        {"items": [{"id": 1}, {"id": 1}, {"id": 5}]},
+        {"items": []},
+        {"other": True},
+        [1, 2],
+    ]
+    paths = PathSet(["items[*].id.unique()", "items.length()", "items[*].id.max()", "items[*].id"])
+    assert paths.evaluate_many(documents) == [paths.evaluate(document) for document in documents]
+    assert paths.evaluate_many(documents)[1] == {
+        "items[*].id.unique()": False,
+        "items.length()": 3,
+        "items[*].id.max()": 5,
+        "items[*].id": [1, 1, 5],
+    }
+    assert paths.evaluate_many([]) == []
+
+
+@pytest.mark.parametrize("expression", [
+    "items[*].id",
+    "items[*].id.length()",
+    "items[*].id.unique()",
+    "items[*].price.min()",
+    "items[*].price.max()",
+    "items[*].price.sum()",
+    "items[*].name.sum()",
+    "items[*].name.min()",
+    "items[?(@.stock == 0)].length()",
+    "items[?(@.price > 100)].id.min()",
+    "items[1:3].name",
+    "items[::2].id.sum()",
+    "items[*].tags[*].length()",
+])
+def test_collector_matches_evaluate(expression):
+    """Folding elements in one at a time gives the same result as evaluating the whole list."""
+    items = [
+        {"id": 1, "name": "b", "price": 5, "stock": 0, "tags": ["x"]},
+        {"id": 2, "name": "a", "price": -1.5, "stock": 2, "tags": []},
+        {"id": 2, "name": 3, "price": 7, "stock": 0, "tags": ["y", "z"]},
+        {"id": 4, "name": "c", "price": 0, "stock": 1},
+    ]
+    path = compile_path(expression)
+    collector = Collector(path)
+    for index, item in enumerate(items):
+        collector.add(index, item)
+    assert collector.result() == path.evaluate({"items": items})
+
+
+def test_collector_over_object_values():
+    """Wildcards and filters over an object take its values, keyed by name."""
+    path = compile_path("owners.*.age.max()")
+    collector = Collector(path)
+    for key, value in {"ann": {"age": 30}, "bob": {"age": 41}}.items():
+        collector.add(key, value)
+    assert collector.result() == 41
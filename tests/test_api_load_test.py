@@ -0,0 +1,125 @@
+"""Tests for the load-test runner of the API test tool."""
+
+import json
+import socket
+import threading
+
+from autonomous_tester.libs.crew_tools.api_load_test import LoadRunner, percentile, split_validations
+from autonomous_tester.libs.crew_tools.api_test_tool import APITestResult, APITestTool
+
+
+def make_result(status_code: int = 200, response_time_ms: float = 10.0, **fields) -> APITestResult:
+    """Build the result of one request."""
+    return APITestResult(
+        success=fields.pop("success", status_code < 400),
+        status_code=status_code,
+        response_time_ms=response_time_ms,
+        headers={},
+        **fields,
+    )
+
+
+def sequence(results):
+    """Get an execute function returning the given results in turn."""
+    lock = threading.Lock()
+    remaining = list(results)
+
+    def execute(spec):
+        with lock:
+            return remaining.pop(0)
+    return execute
+
+
+def test_split_validations():
+    """Aggregate checks are taken out of the per-request validations."""
+    per_request, aggregate = split_validations({"status_code": 200, "p95_ms": 100, "p99.9_ms": 300, "p100_ms": 500, "min_rps": 5})
+    assert per_request == {"status_code": 200}
+    assert aggregate == {"p95_ms": 100, "p99.9_ms": 300, "p100_ms": 500, "min_rps": 5}
+
+
+def test_percentile_is_nearest_rank():
+    """Percentiles pick an observed value."""
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+    assert percentile([], 95) == 0.0
+
+
+def test_summary_of_a_run():
+    """Requests, errors, latency and status codes are summarised."""
+    results = [make_result(200, float(ms)) for ms in range(1, 10)] + [make_result(500, 100.0)]
+    summary = LoadRunner(sequence(results), concurrency=2, iterations=10).run({}, {"p50_ms": 10, "max_error_rate": 0.2})
+
+    assert summary.requests == 10
+    assert summary.errors == 1
+    assert summary.error_rate == 0.1
+    assert summary.latency_ms["max"] == 100.0
+    assert summary.status_codes == {"200": 9, "500": 1}
+    assert summary.success
+    assert all(validation.startswith("✓") for validation in summary.validations)
+
+
+def test_rejected_requests_are_left_out_of_the_statistics():
+    """Requests the tool refused to send are counted apart, not as fast server errors."""
+    rejected = [
+        make_result(0, 0.0, success=False, error="Circuit open", rejected=True)
+        for _ in range(90)
+    ]
+    results = [make_result(200, 50.0) for _ in range(10)] + rejected
+    summary = LoadRunner(sequence(results), concurrency=1, iterations=100).run({}, {"max_error_rate": 0.0})
+
+    assert summary.requests == 10
+    assert summary.rejected == 90
+    assert summary.errors == 0
+    assert summary.error_rate == 0.0
+    assert summary.latency_ms["min"] == 50.0
+    assert summary.status_codes == {"200": 10}
+    assert summary.success
+
+
+def test_only_rejected_requests_fail_the_run():
+    """A run that sent nothing is not a success."""
+    results = [make_result(0, 0.0, success=False, error="Circuit open", rejected=True) for _ in range(5)]
+    summary = LoadRunner(sequence(results), iterations=5).run({})
+    assert summary.requests == 0
+    assert summary.rejected == 5
+    assert not summary.success
+
+
+def test_failed_aggregate_validation():
+    """A latency budget that is exceeded fails the run."""
+    summary = LoadRunner(sequence([make_result(200, 300.0)] * 4), iterations=4).run({}, {"p95_ms": 100})
+    assert not summary.success
+    assert summary.validations == ["✗ p95 latency 300.00ms > 100ms"]
+
+
+def test_load_mode_bypasses_the_host_throttle():
+    """Load requests to a dead host are sent, and do not open its circuit for other tests."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/health"
+
+    tool = APITestTool()
+    try:
+        summary = json.loads(tool._run(json.dumps({"url": url, "load": {"concurrency": 4, "iterations": 40}})))
+        assert summary["requests"] == 40
+        assert summary["errors"] == 40
+        assert summary["rejected"] == 0
+        assert "Circuit open" not in json.dumps(summary["error_samples"])
+        assert tool.throttle_stats() == {}
+
+        result = json.loads(tool._run(json.dumps({"url": url, "retries": 0, "output": "full"})))
+        assert result["error"].startswith("Request failed")
+        assert not result["rejected"]
+    finally:
+        tool.close()
+
+
+def test_p100_is_the_slowest_request():
+    """A p100 budget checks the slowest request."""
+    results = [make_result(200, 10.0)] * 3 + [make_result(200, 250.0)]
+    summary = LoadRunner(sequence(results), iterations=4).run({}, {"p99_ms": 300, "p100_ms": 200})
+    assert not summary.success
+    assert summary.validations == ["✓ p99 latency 250.00ms <= 300ms", "✗ p100 latency 250.00ms > 200ms"]
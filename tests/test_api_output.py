@@ -0,0 +1,80 @@
+"""Tests for the compact output of the API test tool."""
+
+import json
+
+import pytest
+
+from autonomous_tester.libs.crew_tools.api_output import BodyStore, brief_result, dumps
+from autonomous_tester.libs.crew_tools.api_test_tool import APITestTool
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A body store under a temporary directory."""
+    return BodyStore(str(tmp_path / "bodies"))
+
+
+def test_body_store_round_trip(store):
+    """A saved body loads back by its handle; an unknown handle loads as None."""
+    handle = store.save({"items": [1, 2, 3]})
+    assert len(handle) == 16
+    assert store.load(handle) == {"items": [1, 2, 3]}
+    assert store.load("0" * 16) is None
+
+
+@pytest.mark.parametrize("handle", ["../../x", "../secret", "0123456789abcdef/../../x", "0123456789ABCDEF", "0123456789abcde", "0123456789abcdef\n", 5, None])
+def test_body_store_rejects_foreign_handles(store, tmp_path, handle):
+    """Only handles of the issued format are looked up, so none can reach a file outside the store."""
+    (tmp_path / "x.json").write_text(json.dumps({"created": 0, "value": "secret"}))
+    with pytest.raises(ValueError):
+        store.load(handle)
+
+
+def test_fetch_body_with_foreign_handle_is_an_error(store, tmp_path):
+    """The tool answers a path-like handle with an error instead of reading the file."""
+    (tmp_path / "x.json").write_text(json.dumps({"created": 0, "value": "secret"}))
+    tool = APITestTool()
+    tool._body_store = store
+    try:
+        answer = json.loads(tool._run(dumps({"body_handle": "../x"})))
+        assert "Invalid body handle" in answer["error"]
+        assert "secret" not in dumps(answer)
+    finally:
+        tool.close()
+
+
+def test_compact_batch_stays_within_budget(api_server, tmp_path):
+    """A large compact batch is cut to the requested budget, largest results first, keeping every outcome."""
+    base = f"http://127.0.0.1:{api_server.server_port}"
+    requests = [{"url": f"{base}/items/{count}", "validate": {"status_code": 200}} for count in [50] * 30 + [500]]
+    tool = APITestTool()
+    tool._body_store = BodyStore(str(tmp_path))
+    try:
+        output = tool._run(dumps({"requests": requests, "output": "compact", "max_output_bytes": 4000}))
+        results = json.loads(output)
+        assert len(output.encode("utf-8")) <= 4000
+        assert len(results) == 31
+        assert all(result["success"] and result["status_code"] == 200 for result in results)
+        assert results[-1]["brief"] is True
+        stored = json.loads(tool._run(dumps({"body_handle": results[-1]["body_handle"]})))
+        assert len(stored["items"]) == 500
+    finally:
+        tool.close()
+
+
+def test_brief_keeps_failures(store):
+    """A brief keeps the failed validations and the error, and drops the rest."""
+    result = {
+        "success": False, "status_code": 500, "response_time_ms": 12.5, "headers": {"Server": "x"},
+        "response_body": {"error": "boom"}, "error": None, "rejected": False,
+        "validations": ["✓ Status code present", "✗ Status code 500 != expected 200"],
+    }
+    brief = brief_result(result, store)
+    assert brief == {
+        "success": False,
+        "status_code": 500,
+        "validations": ["✗ Status code 500 != expected 200"],
+        "body_handle": brief["body_handle"],
+        "brief": True,
+    }
+    assert store.load(brief["body_handle"]) == {"error": "boom"}
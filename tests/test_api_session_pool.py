@@ -0,0 +1,62 @@
+"""Tests for the pooled HTTP clients of the API test tool."""
+
+import asyncio
+import gc
+import warnings
+
+import pytest
+
+from autonomous_tester.libs.crew_tools.api_session_pool import AsyncClientPool
+
+
+@pytest.fixture
+def keep_alive_server(api_server, monkeypatch):
+    """The test API, keeping connections open between requests."""
+    monkeypatch.setattr(api_server.RequestHandlerClass, "protocol_version", "HTTP/1.1")
+    return f"http://127.0.0.1:{api_server.server_port}"
+
+
+def test_each_loop_gets_its_own_client(keep_alive_server):
+    """A client is reused within a loop, and a new loop gets a new client."""
+    pool = AsyncClientPool()
+
+    async def use():
+        client = pool.get()
+        assert pool.get() is client
+        await client.get(f"{keep_alive_server}/items/1")
+        return client
+
+    first, second = asyncio.run(use()), asyncio.run(use())
+    assert first is not second
+    assert len(pool._clients) == 1
+
+
+def test_client_is_closed_with_its_loop(keep_alive_server):
+    """When `asyncio.run` ends, the loop's client and its kept-alive connections are closed."""
+    pool = AsyncClientPool()
+
+    async def use():
+        client = pool.get()
+        await client.get(f"{keep_alive_server}/items/1")
+        return client
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        clients = [asyncio.run(use()) for _ in range(3)]
+        gc.collect()
+    assert all(client.is_closed for client in clients)
+    assert not [warning for warning in caught if issubclass(warning.category, ResourceWarning)]
+
+
+def test_aclose_closes_the_running_loops_client(keep_alive_server):
+    """Closing the pool in a loop closes and forgets that loop's client."""
+    pool = AsyncClientPool()
+
+    async def use_and_close():
+        client = pool.get()
+        await client.get(f"{keep_alive_server}/items/1")
+        await pool.aclose()
+        return client
+
+    assert asyncio.run(use_and_close()).is_closed
+    assert pool._clients == {}
@@ -0,0 +1,211 @@
+"""Tests for the streamed reading of API response bodies."""
+
+import hashlib
+import json
+
+import pytest
+
+from autonomous_tester.libs.crew_tools.api_json_path import path_set
+from autonomous_tester.libs.crew_tools.api_stream import JSONPathScanner, StreamedBody
+
+DOCUMENT = {
+    "note": 'quote " backslash \\ brackets ]}[{ and \\" unicode é ✓',
+    "skipped": [{"text": '"}]', "nested": [[{"a": "\\\\"}]]}, "]"],
+    "blob": "x" * 500 + "\\",
+    "data": {"items": [{"id": 1, "name": "a\\\"b"}, {"id": 2, "name": "{["}], "total": 2},
+    "flag": True,
+    "empty": {},
+}
+TEXT = json.dumps(DOCUMENT, ensure_ascii=False)
+
+
+def scan(text: str, paths, chunk_size: int) -> JSONPathScanner:
+    """Feed a document to a scanner in pieces of the given size."""
+    scanner = JSONPathScanner(paths)
+    for start in range(0, len(text), chunk_size):
+        scanner.feed(text[start:start + chunk_size])
+    scanner.feed("", final=True)
+    return scanner
+
+
+def chunks(data: bytes, size: int):
+    """Split bytes into chunks."""
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 13, 64, len(TEXT)])
+def test_values_are_found_across_chunk_boundaries(chunk_size):
+    """Escapes, quotes and brackets inside strings survive any split of the text."""
+    paths = [("note",), ("data", "items"), ("data", "total"), ("data", "items", "1", "name"), ("flag",), ("empty",), ("blob",)]
+    scanner = scan(TEXT, paths, chunk_size)
+    assert scanner.values == {
+        ("note",): DOCUMENT["note"],
+        ("data", "items"): DOCUMENT["data"]["items"],
+        ("data", "total"): 2,
+        ("data", "items", "1", "name"): "{[",
+        ("flag",): True,
+        ("empty",): {},
+        ("blob",): DOCUMENT["blob"],
+    }
+    assert scanner.complete
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 7])
+def test_skipped_values_do_not_confuse_the_scanner(chunk_size):
+    """Brackets and escaped quotes in skipped strings do not end the skipped value."""
+    scanner = scan(TEXT, [("data", "total")], chunk_size)
+    assert scanner.values == {("data", "total"): 2}
+
+
+def test_missing_paths_are_not_found():
+    """A path that is not in the document is left out."""
+    scanner = scan(TEXT, [("data", "missing"), ("note", "x")], 8)
+    assert scanner.values == {}
+    assert not scanner.complete
+
+
+def test_root_and_array_paths():
+    """The root value and list indexes can be requested."""
+    text = json.dumps([{"id": 1}, {"id": 2}, 3])
+    scanner = scan(text, [(), ("1", "id"), ("2",)], 2)
+    assert scanner.values == {(): [{"id": 1}, {"id": 2}, 3], ("1", "id"): 2, ("2",): 3}
+
+
+def test_literal_split_across_chunks():
+    """A number split between pieces is read whole."""
+    scanner = JSONPathScanner([("n",)])
+    scanner.feed('{"n": 12')
+    scanner.feed('345, "m": 1}', final=True)
+    assert scanner.values == {("n",): 12345}
+
+
+@pytest.mark.parametrize("text", ['{"a": [1, 2}', '{"a": "open', '{"a": 1', '{"a": "x\\', '{"a": tru'])
+def test_invalid_documents_are_rejected(text):
+    """Truncated or malformed documents raise ValueError at the end."""
+    scanner = JSONPathScanner([("b",)])
+    with pytest.raises(ValueError):
+        scanner.feed(text, final=True)
+
+
+def test_skipped_text_is_not_kept():
+    """A long skipped string or container is consumed as it arrives, not buffered."""
+    scanner = JSONPathScanner([("items",)])
+    scanner.feed('{"blob": "')
+    for _ in range(100):
+        scanner.feed("x" * 1000 + "\\")
+        assert scanner._buffer == ""
+    scanner.feed('"", "deep": [[{"s": "')
+    for _ in range(100):
+        scanner.feed("]" * 1000)
+        assert scanner._buffer == ""
+    scanner.feed('"}]], "items": [1, 2]}', final=True)
+    assert scanner.values == {("items",): [1, 2]}
+
+
+def test_body_over_the_cap_is_hashed_and_scanned():
+    """Only the head is kept, but the hash, size and JSON paths cover the whole body."""
+    items = [{"id": index, "name": f"item {index}"} for index in range(2000)]
+    data = json.dumps({"items": items, "total": 2000}).encode()
+    body = StreamedBody(1024, {"json_path": {"total": 2000, "items.0.id": 0}, "contains": '"total": 2000'})
+    body.read(chunks(data, 100))
+
+    assert body.truncated
+    assert body.complete
+    assert len(body.content) == 1024
+    assert body.size == len(data)
+    assert body.sha256 == hashlib.sha256(data).hexdigest()
+    assert body.contains('"total": 2000')
+    assert body.scanned
+    with pytest.raises(ValueError):
+        body.json()
+
+
+def test_contains_across_chunk_borders():
+    """A text split between two chunks is found."""
+    body = StreamedBody(4, {"contains": "needle"})
+    body.read([b"hay ne", b"edle hay"])
+    assert body.contains("needle")
+
+
+def test_stop_early_once_everything_is_found():
+    """Early stop ends the download once the validated content has been seen."""
+    data = json.dumps({"status": "ok", "rows": list(range(10000))}).encode()
+    body = StreamedBody(16, {"json_path": {"status": "ok"}, "contains": "ok"}, stop_early=True)
+    body.read(chunks(data, 64))
+
+    assert body.stopped_early
+    assert not body.complete
+    assert body.sha256 is None
+    assert body.size < len(data)
+
+
+def test_body_within_the_cap():
+    """A small body is kept whole and parsed normally."""
+    body = StreamedBody.from_content(b'{"a": [1, 2]}')
+    assert not body.truncated
+    assert not body.scanned
+    assert body.json() == {"a": [1, 2]}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_streamed_containers_hand_over_elements_one_at_a_time(chunk_size):
+    """Elements of a streamed list or object arrive with their index or key, and the container is not kept."""
+    elements = []
+    collect = lambda key, item: elements.append((key, item))  # noqa: E731
+    scanner = JSONPathScanner([("data", "total")], {("data", "items"): collect, ("meta",): collect})
+    assert not scanner.complete
+    for start in range(0, len(TEXT), chunk_size):
+        scanner.feed(TEXT[start:start + chunk_size])
+    scanner.feed('', final=True)
+
+    assert elements == [(0, DOCUMENT["data"]["items"][0]), (1, DOCUMENT["data"]["items"][1])]
+    assert scanner.values == {("data", "total"): 2}
+    assert not scanner.complete
+
+
+def test_streamed_object_and_scalar_containers():
+    """Object values are streamed with their keys; a scalar container has no elements but ends the stream."""
+    elements = []
+    scanner = JSONPathScanner([], {("owners",): lambda key, item: elements.append((key, item)), ("n",): elements.append})
+    scanner.feed('{"owners": {"ann": {"age": 30}, "bob": 41}, "n": 5}', final=True)
+    assert elements == [("ann", {"age": 30}), ("bob", 41)]
+    assert scanner.complete
+
+
+def test_wildcard_paths_of_a_large_body_are_streamed():
+    """Wildcard and filter paths over the cap are answered element by element, without capturing the list."""
+    items = [{"id": index, "stock": index % 3, "payload": "x" * 200} for index in range(3000)]
+    data = json.dumps({"items": items, "total": 3000}).encode()
+    validations = {"json_path": {
+        "items[*].id.unique()": True,
+        "items[?(@.stock == 0)].length()": 1000,
+        "items[10:13].id": [10, 11, 12],
+        "items[*].id.max()": 2999,
+        "total": 3000,
+        "items[-1].id": 2999,
+        "length()": None,
+    }}
+    body = StreamedBody(1024, validations)
+    body.read(chunks(data, 1000))
+
+    values = body.scanned_values(path_set(tuple(validations["json_path"])))
+    assert values == {path: expected for path, expected in validations["json_path"].items() if path != "length()"}
+    assert set(body._scanner.values) == {("total",), ("items",)}
+
+
+def test_wildcard_paths_without_the_list_capture():
+    """With only streamable paths, no value of the list is kept by the scanner."""
+    data = json.dumps({"items": [{"id": index} for index in range(500)]}).encode()
+    body = StreamedBody(100, {"json_path": {"items[*].id.sum()": 124750}})
+    body.read(chunks(data, 333))
+    assert body._scanner.values == {}
+    assert body.scanned_values(path_set(("items[*].id.sum()",))) == {"items[*].id.sum()": 124750}
+
+
+def test_stop_early_after_a_streamed_container():
+    """Early stop waits for the end of a streamed list, then ends the download."""
+    data = json.dumps({"items": [{"id": index} for index in range(100)], "rows": list(range(50000))}).encode()
+    body = StreamedBody(64, {"json_path": {"items[*].id.length()": 100}}, stop_early=True)
+    body.read(chunks(data, 256))
+    assert body.stopped_early
+    assert body.scanned_values(path_set(("items[*].id.length()",))) == {"items[*].id.length()": 100}
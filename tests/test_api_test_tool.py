@@ -0,0 +1,95 @@
+"""Tests for the request execution and validation of the API test tool."""
+
+import asyncio
+import json
+
+import pytest
+
+from autonomous_tester.libs.crew_tools.api_output import BodyStore
+from autonomous_tester.libs.crew_tools.api_test_tool import APITestTool
+
+VALIDATE = {"status_code": 200, "contains": "items", "json_path": {"items.length()": 3, "items[*].id.unique()": True}}
+
+
+@pytest.fixture
+def tool():
+    """An API test tool, closed after the test."""
+    tool = APITestTool()
+    yield tool
+    tool.close()
+
+
+def specs(api_server):
+    """Request specs for the test API: lists of different sizes and a body that is not JSON."""
+    base = f"http://127.0.0.1:{api_server.server_port}"
+    return [
+        {"url": f"{base}/items/3", "validate": VALIDATE, "output": "full"},
+        {"url": f"{base}/items/4", "validate": VALIDATE, "output": "full"},
+        {"url": f"{base}/text", "validate": VALIDATE, "output": "full"},
+        {"url": f"{base}/items/4", "validate": {"json_path": {"items[0].id": 0}}, "output": "full"},
+    ]
+
+
+def test_batch_validates_like_single_requests(tool, api_server):
+    """Deferred batch JSON path checks give the same results, in the same order, as single requests."""
+    requests = specs(api_server)
+    singles = [json.loads(tool._run(json.dumps(spec))) for spec in requests]
+    batch = json.loads(tool._run(json.dumps({"requests": requests, "output": "full"})))
+
+    assert [result["validations"] for result in batch] == [result["validations"] for result in singles]
+    assert [result["success"] for result in batch] == [True, False, False, True]
+    assert batch[0]["validations"][-1] == "✓ JSON path 'items[*].id.unique()' = True"
+    assert [line[0] for line in batch[1]["validations"]] == ["✓", "✓", "✗", "✗"]
+
+
+def test_async_batch_validates_like_sync_batch(tool, api_server):
+    """The async batch defers JSON path checks the same way."""
+    requests = specs(api_server)
+    sync = json.loads(tool._run(json.dumps({"requests": requests, "output": "full"})))
+    concurrent = json.loads(asyncio.run(tool._arun(json.dumps({"requests": requests, "output": "full"}))))
+    assert [result["validations"] for result in concurrent] == [result["validations"] for result in sync]
+    assert [result["success"] for result in concurrent] == [result["success"] for result in sync]
+
+
+
+def test_output_is_full_unless_compact_is_asked_for(tool, api_server, tmp_path):
+    """Results keep every header and the whole body by default; compact output is opted into."""
+    tool._body_store = BodyStore(str(tmp_path))
+    url = f"http://127.0.0.1:{api_server.server_port}/items/200"
+    full = json.loads(tool._run(json.dumps({"url": url})))
+    assert len(full["response_body"]["items"]) == 200
+    assert "Server" in full["headers"]
+    assert "body_handle" not in full
+
+    compact = json.loads(tool._run(json.dumps({"url": url, "output": "compact", "max_output_bytes": 1000})))
+    assert "Server" not in compact.get("headers", {})
+    assert len(json.dumps(compact)) <= 1000
+    stored = json.loads(tool._run(json.dumps({"body_handle": compact["body_handle"]})))
+    assert stored == full["response_body"]
+
+
+@pytest.mark.parametrize("query", ["5", "null", '"abc"', "[1]", '[{"url": "x"}, 2]', '{"requests": 5}', '{"requests": [1]}', "{"])
+def test_malformed_input_is_an_error_result(tool, query):
+    """Inputs that are not request specs come back as an error result instead of raising."""
+    for output in (tool._run(query), asyncio.run(tool._arun(query))):
+        result = json.loads(output)
+        assert result["success"] is False
+        assert result["status_code"] == 0
+        assert result["error"]
+
+
+@pytest.mark.parametrize("validate, success", [
+    (None, False),
+    ({"status_code": 422}, True),
+    ({"status_code": 201}, False),
+    ({"status_code": 400}, False),
+    ({"status_code": 422, "contains": "nope"}, False),
+])
+def test_error_status_passes_only_when_expected(tool, api_server, validate, success):
+    """A 4xx response passes only when it is the expected status and every other check holds."""
+    spec = {"url": f"http://127.0.0.1:{api_server.server_port}/users", "method": "POST", "body": {"name": 1}, "output": "full"}
+    if validate:
+        spec["validate"] = validate
+    result = json.loads(tool._run(json.dumps(spec)))
+    assert result["status_code"] == 422
+    assert result["success"] is success
@@ -0,0 +1,177 @@
+"""Tests for the per-host throttle of the API test tool."""
+
+import time
+
+import pytest
+
+from autonomous_tester.libs.crew_tools.api_throttle import (
+    NO_THROTTLE,
+    CircuitOpenError,
+    HostThrottle,
+    Throttle,
+    retry_after_seconds,
+)
+
+
+def make_throttle(**options) -> HostThrottle:
+    """Build a throttle without a rate limit and with a short cooldown."""
+    defaults = {"rate": 0, "burst": 10, "max_concurrency": 4, "failure_threshold": 3, "cooldown": 0.05}
+    return HostThrottle(**{**defaults, **options})
+
+
+def fail(throttle: HostThrottle, status_code=None) -> None:
+    """Send one request that fails."""
+    throttle.acquire()
+    throttle.release(status_code)
+
+
+def test_circuit_opens_after_consecutive_failures():
+    """The circuit opens at the threshold and then rejects requests without sending them."""
+    throttle = make_throttle()
+    fail(throttle)
+    fail(throttle, 503)
+    assert throttle.state == "closed"
+    fail(throttle, 502)
+    assert throttle.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        throttle.acquire()
+    stats = throttle.stats()
+    assert stats["requests"] == 3
+    assert stats["rejected"] == 1
+    assert stats["circuit_opened"] == 1
+
+
+def test_success_resets_the_failure_count():
+    """Only consecutive failures count towards the threshold."""
+    throttle = make_throttle()
+    fail(throttle)
+    fail(throttle)
+    throttle.acquire()
+    throttle.release(200)
+    fail(throttle)
+    fail(throttle)
+    assert throttle.state == "closed"
+
+
+def test_application_errors_do_not_open_the_circuit():
+    """A 500 or 404 shows the host is up."""
+    throttle = make_throttle()
+    for _ in range(5):
+        fail(throttle, 500)
+        fail(throttle, 404)
+    assert throttle.state == "closed"
+    assert throttle.stats()["failures"] == 0
+
+
+def test_half_open_lets_a_single_probe_through():
+    """After the cooldown one probe is sent; others fail fast until it returns."""
+    throttle = make_throttle()
+    for _ in range(3):
+        fail(throttle)
+    time.sleep(0.06)
+
+    throttle.acquire()
+    assert throttle.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        throttle.acquire()
+
+    throttle.release(200)
+    assert throttle.state == "closed"
+    throttle.acquire()
+    throttle.release(200)
+
+
+def test_failed_probe_opens_the_circuit_again():
+    """A failing probe restarts the cooldown."""
+    throttle = make_throttle()
+    for _ in range(3):
+        fail(throttle)
+    time.sleep(0.06)
+
+    fail(throttle, 503)
+    assert throttle.state == "open"
+    assert throttle.stats()["circuit_opened"] == 2
+    with pytest.raises(CircuitOpenError):
+        throttle.acquire()
+
+
+def test_zero_threshold_never_opens_the_circuit():
+    """A threshold of 0 disables the circuit breaker."""
+    throttle = make_throttle(failure_threshold=0)
+    for _ in range(10):
+        fail(throttle)
+    assert throttle.state == "closed"
+
+
+def test_concurrency_limit_halves_on_backoff_and_grows_back():
+    """429 halves the concurrency limit; successes grow it again up to the maximum."""
+    throttle = make_throttle(max_concurrency=8)
+    throttle.acquire()
+    throttle.release(429)
+    assert throttle.limit == 4
+    throttle.acquire()
+    throttle.release(429)
+    assert throttle.limit == 2
+
+    for _ in range(100):
+        throttle.acquire()
+        throttle.release(200)
+    assert throttle.limit == 8
+
+
+def test_retry_after_pauses_the_host():
+    """A Retry-After header delays the next request."""
+    throttle = make_throttle()
+    throttle.acquire()
+    assert throttle.release(503, {"Retry-After": "0.1"}) == pytest.approx(0.1)
+
+    started = time.perf_counter()
+    throttle.acquire()
+    assert time.perf_counter() - started >= 0.08
+    assert throttle.stats()["delayed"] == 1
+
+
+def test_token_bucket_limits_the_rate():
+    """Requests beyond the burst wait for new tokens."""
+    throttle = make_throttle(rate=50, burst=2)
+    started = time.perf_counter()
+    for _ in range(4):
+        throttle.acquire()
+        throttle.release(200)
+    assert time.perf_counter() - started >= 0.03
+
+
+def test_retry_after_header_formats():
+    """Retry-After may be seconds or an HTTP date, in any header case."""
+    assert retry_after_seconds({"retry-after": "2"}) == 2
+    assert retry_after_seconds({"Retry-After": "Thu, 01 Jan 1970 00:00:00 GMT"}) == 0
+    assert retry_after_seconds({"Retry-After": "soon"}) is None
+    assert retry_after_seconds(None) is None
+
+
+def test_backoff_honours_retry_after():
+    """The jittered delay never undercuts the time the server asked for."""
+    throttle = make_throttle()
+    assert throttle.backoff(0, retry_after=1.5) >= 1.5
+    assert throttle.stats()["retries"] == 1
+
+
+def test_hosts_are_throttled_separately():
+    """Every scheme, host and port gets its own throttle."""
+    throttle = Throttle(failure_threshold=1)
+    api = throttle.get("http://api.test/a")
+    assert throttle.get("HTTP://API.test/b?x=1") is api
+    assert throttle.get("http://api.test:8080/a") is not api
+
+    fail(api)
+    assert throttle.stats()["http://api.test"]["circuit"] == "open"
+    throttle.get("http://api.test:8080/a").acquire()
+
+
+def test_no_throttle_keeps_no_state():
+    """The stand-in used by load tests never waits or rejects."""
+    for _ in range(10):
+        NO_THROTTLE.acquire()
+        NO_THROTTLE.release(None)
+    assert NO_THROTTLE.release(503, {"Retry-After": "3"}) == 3
@@ -0,0 +1,65 @@
+"""Tests for the timed connections of the API test tool."""
+
+import socket
+
+import pytest
+from urllib3.connection import connection as urllib3_connection
+from urllib3.exceptions import NewConnectionError
+
+from autonomous_tester.libs.crew_tools import api_timing
+from autonomous_tester.libs.crew_tools.api_timing import TimedHTTPConnection
+
+
+def resolve_to(monkeypatch, *addresses):
+    """Make every host name resolve to the given addresses, in order."""
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port)) for address in addresses]
+    monkeypatch.setattr(api_timing.socket, "getaddrinfo", getaddrinfo)
+
+
+def test_connects_to_next_address_when_one_refuses(monkeypatch, api_server):
+    """A refused address falls through to the next, and the phases are timed."""
+    resolve_to(monkeypatch, "127.0.0.2", "127.0.0.1")
+    conn = TimedHTTPConnection("api.test", api_server.server_port, timeout=5)
+    try:
+        conn.connect()
+        timings = conn.take_phase_timings()
+        assert set(timings) == {"dns_ms", "connect_ms", "tls_ms"}
+        assert timings["tls_ms"] == 0.0
+        assert conn.take_phase_timings() is None
+    finally:
+        conn.close()
+
+
+def test_raises_last_error_without_retrying_by_name(monkeypatch):
+    """Every address is tried once, then the last error is raised; the host name is never dialled."""
+    resolve_to(monkeypatch, "10.0.0.1", "10.0.0.2")
+    dialled = []
+
+    def create_connection(address, *args, **kwargs):
+        dialled.append(address[0])
+        raise ConnectionRefusedError(f"refused by {address[0]}")
+    monkeypatch.setattr(urllib3_connection, "create_connection", create_connection)
+
+    conn = TimedHTTPConnection("api.test", 80, timeout=5)
+    with pytest.raises(NewConnectionError, match="10.0.0.2"):
+        conn.connect()
+    assert dialled == ["10.0.0.1", "10.0.0.2"]
+    assert conn._dns_host == "api.test"
+
+
+def test_resolution_failure_is_reported_by_urllib3(monkeypatch):
+    """A host name that does not resolve fails once with urllib3's resolution error."""
+    def getaddrinfo(*args, **kwargs):
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+    monkeypatch.setattr(api_timing.socket, "getaddrinfo", getaddrinfo)
+    dialled = []
+
+    def create_connection(address, *args, **kwargs):
+        dialled.append(address[0])
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+    monkeypatch.setattr(urllib3_connection, "create_connection", create_connection)
+
+    with pytest.raises(NewConnectionError):
+        TimedHTTPConnection("missing.test", 80, timeout=5).connect()
+    assert dialled == ["missing.test"]
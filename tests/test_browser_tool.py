@@ -0,0 +1,51 @@
+"""Tests for the replay of recorded browser test cases."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from autonomous_tester.libs.crew_tools.browser_tool import BrowserTool
+from autonomous_tester.libs.crew_tools.browser_trace import TraceStore, trace_key
+
+
+class RecordingPool:
+    """Browser pool stand-in that records when a browser is borrowed."""
+
+    def __init__(self):
+        self.borrowed = 0
+
+    @asynccontextmanager
+    async def browser(self):
+        self.borrowed += 1
+        yield None
+
+    async def close(self):
+        pass
+
+
+def test_no_browser_without_recording(tmp_path):
+    """A task that was never recorded is left to the agent without borrowing a browser."""
+    tool = BrowserTool()
+    pool = RecordingPool()
+    tool._browser_pool = pool
+    tool._traces = TraceStore(str(tmp_path))
+    try:
+        assert asyncio.run(tool._replay("Open https://example.com", trace_key("Open https://example.com"))) is None
+        assert pool.borrowed == 0
+    finally:
+        tool.close()
+
+
+def test_trace_key_normalizes_task():
+    """Whitespace, case and URL spelling of a task do not change its trace key."""
+    assert trace_key("Open  HTTPS://Example.com/ and log in") == trace_key("open https://example.com and log in")
+    assert trace_key("Open https://example.com/a") != trace_key("Open https://example.com/b")
+
+
+def test_corrupt_recording_is_dropped(tmp_path):
+    """An entry that does not parse as a history is deleted and treated as no recording."""
+    traces = TraceStore(str(tmp_path))
+    traces.store.set("key", {"history": "not a list"})
+    entry = traces.get("key")
+    assert entry is not None
+    assert traces.load("key", object, entry) is None
+    assert traces.get("key") is None
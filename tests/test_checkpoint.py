@@ -0,0 +1,127 @@
+"""Tests for run checkpoints and resuming a run from one."""
+
+import os
+import time
+
+import pytest
+from crewai import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.checkpoint import RunCheckpoint, prune_runs, runs_dir
+from autonomous_tester.libs.common.test_history import case_key
+from autonomous_tester.libs.common.test_report import CaseResult
+from autonomous_tester.tester_crew import tester_crew
+from autonomous_tester.tester_crew.tester_crew import AutonomousTester
+
+CASES = ["Check the login page", "Check the search page", "Check the cart page"]
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Keep checkpoints under a temporary storage directory."""
+    monkeypatch.setattr(settings, "STORAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "RUN_CHECKPOINTS_KEEP", 3)
+    return tmp_path
+
+
+def make_runs(count: int):
+    """Start runs with increasing start times."""
+    runs = []
+    for index in range(count):
+        run = RunCheckpoint.create(type="api", endpoint=f"http://api.test/{index}")
+        stamp = time.time() - 100 + index
+        os.utime(run.directory / "run.json", (stamp, stamp))
+        runs.append(run)
+    return runs
+
+
+def test_open_restores_options_and_latest(storage):
+    """A run is reopened by its ID or as the latest run, with its options."""
+    first, second = make_runs(2)
+    assert RunCheckpoint.open(first.run_id).options == {"type": "api", "endpoint": "http://api.test/0"}
+    assert RunCheckpoint.open("latest").run_id == second.run_id
+    with pytest.raises(ValueError):
+        RunCheckpoint.open("../outside")
+    with pytest.raises(ValueError):
+        RunCheckpoint.open("missing-run")
+
+
+def test_old_runs_are_pruned(storage):
+    """Starting a run keeps only the last RUN_CHECKPOINTS_KEEP runs."""
+    runs = make_runs(5)
+    kept = sorted(path.name for path in runs_dir().iterdir())
+    assert kept == sorted(run.run_id for run in runs[2:])
+
+
+def test_prune_keeps_everything_with_zero(storage):
+    """A limit of 0 keeps every run."""
+    runs = make_runs(2)
+    prune_runs(0)
+    prune_runs(-1)
+    assert len(list(runs_dir().iterdir())) == len(runs)
+
+
+def test_partial_checkpoint_round_trip(storage):
+    """Saved tasks, chosen test cases and results load back; unfinished work loads as missing."""
+    run = RunCheckpoint.create(type="web")
+    assert run.load_cases() is None
+    assert run.load_task("test_planning") is None
+
+    run.save_task("test_planning", TaskOutput(description="Plan", raw="plan", agent="Test planner"))
+    run.save_cases(CASES, CASES, {case_key(CASES[0]): ["Login"]}, 5)
+    run.save_result(case_key(CASES[0]), CaseResult.from_text("Status: PASSED", CASES[0]))
+
+    reopened = RunCheckpoint.open(run.run_id)
+    assert reopened.load_task("test_planning").raw == "plan"
+    assert reopened.load_cases() == (CASES, CASES, {case_key(CASES[0]): ["Login"]}, 5)
+    assert list(reopened.load_results()) == [case_key(CASES[0])]
+    reopened.discard_task("test_planning")
+    assert reopened.load_task("test_planning") is None
+
+
+class History:
+    """Test history stand-in that records what the run saves."""
+
+    fingerprints = {}
+    saved = None
+
+    def __init__(self, endpoint=None):
+        pass
+
+    def save(self, sections, planned, links, results):
+        History.saved = results
+
+
+def test_resume_runs_only_unfinished_cases(storage, monkeypatch):
+    """A resumed run skips planning and finished test cases, and reports all of them."""
+    requirements = storage / "requirements.txt"
+    requirements.write_text("Login\n=====\nUsers log in.\n")
+    monkeypatch.setattr(settings, "REQUIREMENTS_PATH", str(requirements))
+    monkeypatch.setattr(settings, "REPORT_SUMMARY_MAX_CHARS", 0)
+    monkeypatch.setattr(tester_crew, "TestHistory", History)
+    monkeypatch.setattr(tester_crew, "load_plan", lambda context: None)
+    monkeypatch.chdir(storage)
+
+    run = RunCheckpoint.create(type="web")
+    run.save_cases(CASES, CASES, {}, len(CASES))
+    run.save_result(case_key(CASES[0]), CaseResult.from_text("Status: FAILED\nDefect: broken", CASES[0]))
+    run.save_task("report_summary", TaskOutput(description="Summary", raw="stale", agent="Reporter"))
+
+    crew = AutonomousTester(checkpoint=RunCheckpoint.open(run.run_id))
+    executed = []
+
+    def kickoff(tasks, inputs):
+        executed.append(inputs["test_case"])
+        return CrewOutput(raw=f"Status: PASSED\nTest case: {inputs['test_case']}")
+    monkeypatch.setattr(crew, "_kickoff", kickoff)
+    monkeypatch.setattr(crew, "_plan", lambda *args: pytest.fail("a resumed run must not plan again"))
+
+    report = crew.run({"endpoint": "http://web.test"}).raw
+    assert sorted(executed) == sorted(CASES[1:])
+    assert [result.status for result in History.saved.values()] == ["FAILED", "PASSED", "PASSED"]
+    assert set(run.load_results()) == {case_key(case) for case in CASES}
+    assert run.load_task("report_summary") is None
+    assert run.load_task("test_execution") is not None
+    assert "broken" in report
+    assert (storage / tester_crew.REPORT_FILE).exists()
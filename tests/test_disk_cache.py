@@ -0,0 +1,104 @@
+"""Tests for the disk-backed cache."""
+
+import os
+import time
+
+from autonomous_tester.libs.common import disk_cache
+from autonomous_tester.libs.common.disk_cache import DiskCache, make_key
+
+
+def entry_size(cache: DiskCache, key: str) -> int:
+    """Get the size of an entry on disk."""
+    return cache._path(key).stat().st_size
+
+
+def age(cache: DiskCache, key: str, seconds_ago: float) -> None:
+    """Set the last use of an entry."""
+    stamp = time.time() - seconds_ago
+    os.utime(cache._path(key), (stamp, stamp))
+
+
+def test_make_key_ignores_dict_order():
+    """Keys are content hashes independent of dict key order."""
+    assert make_key({"a": 1, "b": 2}, "x") == make_key({"b": 2, "a": 1}, "x")
+    assert make_key({"a": 1}) != make_key({"a": 2})
+
+
+def test_set_get_delete(tmp_path):
+    """Values round-trip, misses and hits are counted, and deleted entries are gone."""
+    cache = DiskCache(str(tmp_path))
+    cache.set("k1", {"value": [1, 2]})
+    assert cache.get("k1") == {"value": [1, 2]}
+    assert cache.get("k2") is None
+    cache.delete("k1")
+    assert cache.get("k1") is None
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_expired_entries_are_misses(tmp_path):
+    """Entries older than the TTL are dropped on read."""
+    cache = DiskCache(str(tmp_path), ttl=60)
+    cache.set("k1", "value")
+    path = cache._path("k1")
+    path.write_text('{"created": %f, "value": "value"}' % (time.time() - 120))
+    assert cache.get("k1") is None
+    assert not path.exists()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Over the limit, the least recently used entries go first, down to EVICT_TO of the limit."""
+    probe = DiskCache(str(tmp_path / "probe"))
+    probe.set("probe", "x" * 100)
+    size = entry_size(probe, "probe")
+
+    cache = DiskCache(str(tmp_path / "cache"), max_bytes=size * 9 // 2)
+    for index, key in enumerate(["aa", "bb", "cc", "dd"]):
+        cache.set(key, "x" * 100)
+        age(cache, key, 100 - index)
+    # Reading "aa" makes it the most recently used entry.
+    assert cache.get("aa") is not None
+
+    cache.set("ee", "x" * 100)
+    kept = {key for key in ["aa", "bb", "cc", "dd", "ee"] if cache._path(key).exists()}
+    assert kept == {"aa", "cc", "dd", "ee"}
+    assert cache._size == cache._scan_size() <= cache.max_bytes * disk_cache.EVICT_TO
+
+
+def test_writes_below_the_limit_do_not_scan(tmp_path, monkeypatch):
+    """The size is counted as entries change; the directory is scanned once, then only when over the limit."""
+    cache = DiskCache(str(tmp_path), max_bytes=10 ** 6)
+    scans = []
+    scan_size = cache._scan_size
+    monkeypatch.setattr(cache, "_scan_size", lambda: scans.append(1) or scan_size())
+    monkeypatch.setattr(cache, "_evict", lambda: scans.append("evict"))
+
+    for index in range(50):
+        cache.set(f"k{index:02}", "x" * 100)
+    cache.set("k00", "x" * 10)
+    cache.delete("k01")
+    assert scans == [1]
+    assert cache._size == scan_size()
+
+
+def test_counted_size_is_corrected_by_eviction(tmp_path):
+    """Entries written by another instance are found when eviction scans the directory."""
+    other = DiskCache(str(tmp_path))
+    cache = DiskCache(str(tmp_path), max_bytes=10 ** 6)
+    cache.set("mine", "x")
+    other.set("theirs", "x" * 100)
+    cache.max_bytes = 1
+    cache.set("mine", "y")
+    assert cache._size <= 1
+    assert not any(tmp_path.glob("*/*.json"))
+
+
+def test_vanished_entry_on_touch_is_a_miss(tmp_path, monkeypatch):
+    """An entry deleted between reading and touching it counts as a miss instead of raising."""
+    cache = DiskCache(str(tmp_path))
+    cache.set("k1", "value")
+
+    def utime(path, *args, **kwargs):
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(disk_cache.os, "utime", utime)
+    assert cache.get("k1") is None
+    assert cache.stats() == {"hits": 0, "misses": 1}
@@ -0,0 +1,118 @@
+"""Tests for the disk-backed LLM completion cache of the crew agents."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from crewai.llms.base_llm import BaseLLM
+from pydantic import BaseModel
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common import llm_cache
+from autonomous_tester.libs.common.disk_cache import DiskCache
+from autonomous_tester.libs.common.llm_cache import CachedLLM, get_agent_llm
+
+MESSAGES = [{"role": "user", "content": "Plan the tests"}]
+
+
+class Verdict(BaseModel):
+    """A structured completion."""
+
+    passed: bool
+
+
+class CountingLLM(BaseLLM):
+    """Counts calls and answers with a fixed completion."""
+
+    calls: list = []
+    answer: object = "Status: PASSED"
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None, response_model=None):
+        self.calls.append(messages)
+        return self.answer
+
+    async def acall(self, messages, **kwargs):
+        return self.call(messages, **kwargs)
+
+
+@pytest.fixture
+def llm_and_cache(tmp_path):
+    """A cached LLM over a fake model, and its cache."""
+    cache = DiskCache(str(tmp_path / "llm_cache"))
+    llm = CachedLLM.wrap(CountingLLM(model="gpt-test", temperature=0.0), cache)
+    return llm, cache
+
+
+def test_repeated_prompt_is_a_hit(llm_and_cache):
+    """The same prompt is answered from the cache; the model is called once."""
+    llm, cache = llm_and_cache
+    assert llm.call(MESSAGES) == "Status: PASSED"
+    assert llm.call(MESSAGES) == "Status: PASSED"
+    assert len(llm.llm.calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+@pytest.mark.parametrize("change", [
+    {"messages": [{"role": "user", "content": "Plan other tests"}]},
+    {"tools": [{"type": "function", "function": {"name": "search"}}]},
+    {"response_model": Verdict},
+])
+def test_different_request_is_a_miss(llm_and_cache, change):
+    """Messages, tool schemas and the response model are part of the key."""
+    llm, _ = llm_and_cache
+    llm.call(MESSAGES)
+    llm.call(**{"messages": MESSAGES, **change})
+    assert len(llm.llm.calls) == 2
+
+
+def test_other_model_or_temperature_is_a_miss(llm_and_cache):
+    """Completions of another model or temperature are not shared."""
+    llm, cache = llm_and_cache
+    llm.call(MESSAGES)
+    for update in ({"model": "gpt-other"}, {"temperature": 0.7}):
+        other = CachedLLM.wrap(CountingLLM(**{"model": "gpt-test", "temperature": 0.0, **update}), cache)
+        other.call(MESSAGES)
+        assert len(other.llm.calls) == 1
+
+
+def test_structured_and_tool_call_completions_are_replayed(llm_and_cache):
+    """Response models come back as models, tool calls as OpenAI-style calls that the agent executes again."""
+    llm, _ = llm_and_cache
+    llm.llm.answer = Verdict(passed=True)
+    llm.call(MESSAGES, response_model=Verdict)
+    assert llm.call(MESSAGES, response_model=Verdict) == Verdict(passed=True)
+
+    llm.llm.answer = [SimpleNamespace(id="call_1", function=SimpleNamespace(name="search", arguments='{"query": "login"}'))]
+    llm.call(MESSAGES)
+    assert llm.call(MESSAGES) == [{"id": "call_1", "type": "function", "function": {"name": "search", "arguments": '{"query": "login"}'}}]
+    assert len(llm.llm.calls) == 2
+
+
+def test_calls_that_execute_tools_are_not_cached(llm_and_cache):
+    """A call with `available_functions` runs tools inside the LLM call, so it always reaches the model."""
+    llm, cache = llm_and_cache
+    functions = {"search": lambda query: ""}
+    llm.call(MESSAGES, available_functions=functions)
+    llm.call(MESSAGES, available_functions=functions)
+    assert len(llm.llm.calls) == 2
+    assert cache.stats() == {"hits": 0, "misses": 0}
+
+
+def test_async_calls_share_the_cache(llm_and_cache):
+    """`acall` reads and writes the same entries as `call`."""
+    llm, _ = llm_and_cache
+    llm.call(MESSAGES)
+    assert asyncio.run(llm.acall(MESSAGES)) == "Status: PASSED"
+    assert len(llm.llm.calls) == 1
+
+
+def test_cache_is_opt_in(monkeypatch):
+    """Without `AT_LLM_CACHE` the agents get CrewAI's default LLM; with it, a cached one."""
+    monkeypatch.setattr(settings, "LLM_CACHE", False)
+    assert get_agent_llm() is None
+
+    monkeypatch.setattr(settings, "LLM_CACHE", True)
+    monkeypatch.setattr(llm_cache, "create_llm", lambda llm: CountingLLM(model="gpt-default"))
+    cached = get_agent_llm()
+    assert isinstance(cached, CachedLLM)
+    assert cached.model == "gpt-default"
@@ -0,0 +1,141 @@
+"""Tests for the test cases generated from an OpenAPI description."""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from autonomous_tester.libs import settings
+from autonomous_tester.libs.common.openapi_cases import (
+    covered_tests,
+    generate_test_cases,
+    load_openapi,
+    openapi_test_cases,
+)
+
+EXAMPLE_API = Path(__file__).resolve().parents[1] / "example" / "api"
+
+
+def example_app(name: str):
+    """Import a FastAPI app of the example API."""
+    spec = importlib.util.spec_from_file_location(name, EXAMPLE_API / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+@pytest.fixture(scope="module")
+def app():
+    """The example authentication API."""
+    return example_app("auth_api_real")
+
+
+def test_example_api_cases(app):
+    """Every operation of the example API gets its cases, in document order."""
+    cases = generate_test_cases(app.openapi())
+    assert [(case.id, case.description) for case in cases] == [
+        ("OAS-001", "POST /login: rejects a missing request body"),
+        ("OAS-002", "POST /login: rejects a body without required field 'email'"),
+        ("OAS-003", "POST /login: rejects a body without required field 'password'"),
+        ("OAS-004", "POST /login: rejects a wrong type for body field 'email'"),
+        ("OAS-005", "POST /login: rejects a wrong type for body field 'password'"),
+        ("OAS-006", "GET /health: accepts a valid request"),
+    ]
+    assert all(case.tool == "api" and case.request.has_expectations for case in cases)
+    # The login body has no documented examples, so no positive case is guessed for it.
+    assert cases[1].request.body == {"password": "test"}
+    assert cases[3].request.body == {"email": 12345, "password": "test"}
+
+
+@pytest.mark.parametrize("name", ["auth_api_real", "auth_api_defect"])
+def test_example_api_cases_pass(name):
+    """The generated cases hold against both versions of the example API."""
+    client = TestClient(example_app(name))
+    for case in generate_test_cases(client.app.openapi()):
+        request = case.request
+        response = client.request(request.method, request.url, params=request.params, json=request.body)
+        assert response.status_code == request.expected_status, case.description
+
+
+def test_secured_operation_only_gets_an_auth_case():
+    """An operation that needs credentials is only called without them."""
+    spec = {
+        "servers": [{"url": "https://api.test/v1"}],
+        "components": {"securitySchemes": {"bearer": {"type": "http", "scheme": "bearer"}}},
+        "paths": {"/items/{id}": {"get": {
+            "security": [{"bearer": []}],
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+            "responses": {"200": {}, "401": {}},
+        }}},
+    }
+    cases = generate_test_cases(spec)
+    assert [case.description for case in cases] == ["GET /items/{id}: rejects a request without credentials"]
+    assert cases[0].request.url == "/v1/items/1"
+    assert cases[0].request.expected_status == 401
+
+
+def test_examples_refs_and_parameters():
+    """Documented examples make a positive case; `$ref` schemas and wrong parameter types are followed."""
+    spec = {
+        "paths": {"/items/{id}": {"put": {
+            "parameters": [
+                {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}, "example": 7},
+                {"name": "dry_run", "in": "query", "required": True, "schema": {"type": "boolean", "default": False}},
+            ],
+            "requestBody": {"required": True, "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Item"}}}},
+            "responses": {"201": {}, "400": {}},
+        }}},
+        "components": {"schemas": {"Item": {
+            "type": "object",
+            "required": ["name"],
+            "properties": {"name": {"type": "string", "example": "pen"}, "price": {"anyOf": [{"type": "null"}, {"type": "number"}]}},
+        }}},
+    }
+    cases = {case.description.split(": ", 1)[1]: case.request for case in generate_test_cases(spec)}
+    valid = cases["accepts a valid request"]
+    assert (valid.method, valid.url, valid.params, valid.body, valid.expected_status) == ("PUT", "/items/7", {"dry_run": "false"}, {"name": "pen"}, 201)
+    assert cases["rejects a missing query parameter 'dry_run'"].params == {}
+    assert cases["rejects a wrong type for path parameter 'id'"].url == "/items/not-a-number"
+    assert cases["rejects a wrong type for query parameter 'dry_run'"].params == {"dry_run": "not-a-boolean"}
+    assert cases["rejects a wrong type for body field 'name'"].body == {"name": 12345}
+    assert all(request.expected_status == 400 for kind, request in cases.items() if kind.startswith("rejects"))
+
+
+def test_load_openapi(tmp_path):
+    """Descriptions load from JSON or YAML files; anything else is skipped."""
+    json_file = tmp_path / "openapi.json"
+    json_file.write_text(json.dumps({"openapi": "3.1.0", "paths": {}}))
+    yaml_file = tmp_path / "openapi.yaml"
+    yaml_file.write_text("openapi: 3.1.0\npaths: {}\n")
+    (tmp_path / "other.json").write_text("[1, 2]")
+
+    assert load_openapi(str(json_file)) == {"openapi": "3.1.0", "paths": {}}
+    assert load_openapi(str(yaml_file)) == {"openapi": "3.1.0", "paths": {}}
+    assert load_openapi(str(tmp_path / "other.json")) is None
+    assert load_openapi(str(tmp_path / "missing.json")) is None
+
+
+def test_openapi_test_cases_setting(app, tmp_path, monkeypatch):
+    """The setting picks the description, and `off` or `auto` without an endpoint generate nothing."""
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps(app.openapi()))
+    monkeypatch.setattr(settings, "OPENAPI_SPEC", str(path))
+    assert len(openapi_test_cases(None)) == 6
+    monkeypatch.setattr(settings, "OPENAPI_SPEC", "off")
+    assert openapi_test_cases("http://api.test") == []
+    monkeypatch.setattr(settings, "OPENAPI_SPEC", "auto")
+    assert openapi_test_cases(None) == []
+
+
+def test_covered_tests(app):
+    """The planner note lists the covered checks once per operation."""
+    note = covered_tests(generate_test_cases(app.openapi()))
+    assert note.splitlines()[2:] == [
+        "- POST /login: rejects a missing request body; rejects a body without required field 'email'; "
+        "rejects a body without required field 'password'; rejects a wrong type for body field 'email'; "
+        "rejects a wrong type for body field 'password'",
+        "- GET /health: accepts a valid request",
+    ]
+    assert covered_tests([]) == ""
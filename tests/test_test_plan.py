@@ -0,0 +1,106 @@
+"""Tests for the test plan schema and the splitting of free-text plans."""
+
+import pytest
+from crewai.tasks.task_output import TaskOutput
+
+from autonomous_tester.libs.common.test_plan import APIRequestSpec, TestCase, TestPlan, read_test_plan, split_test_cases
+
+LABELLED = """Here is the test plan for the login page.
+
+**Test ID:** TC-01
+**Description:** Log in with valid credentials
+**Steps:** Enter the email and password, press Log in
+
+**Test ID:** TC-02
+**Description:** Log in with a wrong password
+"""
+
+HEADINGS = """# Test Plan
+
+### Test Case 1
+**Test ID:** TC-01
+Open the home page
+
+### Test Case 2
+**Test ID:** TC-02
+Open the search page
+"""
+
+TABLE = """| Test ID | Description | Steps |
+|---------|-------------|-------|
+| TC-01 | Log in | Submit the form |
+| TC-02 | Log out | Press Log out |
+"""
+
+
+def test_split_labelled_cases():
+    """Each test ID starts a case; the introduction is dropped."""
+    cases = split_test_cases(LABELLED)
+    assert len(cases) == 2
+    assert cases[0].startswith("**Test ID:** TC-01") and cases[0].endswith("press Log in")
+    assert cases[1] == "**Test ID:** TC-02\n**Description:** Log in with a wrong password"
+
+
+def test_split_keeps_headings_with_their_case():
+    """A heading that only names a case stays with the case content below it."""
+    assert split_test_cases(HEADINGS) == [
+        "### Test Case 1\n**Test ID:** TC-01\nOpen the home page",
+        "### Test Case 2\n**Test ID:** TC-02\nOpen the search page",
+    ]
+
+
+def test_split_table_rows_keep_the_column_names():
+    """Every row of a test case table comes with the table header."""
+    header = "| Test ID | Description | Steps |\n|---------|-------------|-------|\n"
+    assert split_test_cases(TABLE) == [
+        header + "| TC-01 | Log in | Submit the form |",
+        header + "| TC-02 | Log out | Press Log out |",
+    ]
+
+
+@pytest.mark.parametrize("plan", [
+    "",
+    "Check that users can log in and that the search works.",
+    "1. Open the page\n2. Press the button",
+])
+def test_split_unrecognized_plans(plan):
+    """A plan without recognizable test cases gives no cases."""
+    assert split_test_cases(plan) == []
+
+
+def test_split_trailing_heading_is_kept():
+    """A heading at the very end is not lost, even without content."""
+    assert split_test_cases("Test Case 1: log in\n\nTest Case 2") == ["Test Case 1: log in", "Test Case 2"]
+
+
+def test_request_spec_to_tool_input():
+    """Relative URLs resolve against the endpoint and expectations become validations."""
+    spec = APIRequestSpec(method="post", url="/users", body={"name": "ann"}, expected_status=201, expected_json={"id": 1})
+    assert spec.to_tool_input("http://api.test/v1") == {
+        "url": "http://api.test/v1/users",
+        "method": "POST",
+        "validate": {"status_code": 201, "json_path": {"id": 1}},
+        "body": {"name": "ann"},
+    }
+    assert APIRequestSpec(url="http://other.test/x").to_tool_input() == {"url": "http://other.test/x", "method": "GET", "validate": {}}
+
+
+def test_deterministic_cases():
+    """Only API cases with a request and an expectation run without the LLM."""
+    request = APIRequestSpec(url="/health", expected_status=200)
+    assert TestCase(id="1", description="d", tool="api", request=request).is_deterministic
+    assert not TestCase(id="2", description="d", tool="api", request=APIRequestSpec(url="/health")).is_deterministic
+    assert not TestCase(id="3", description="d", tool="api").is_deterministic
+    assert not TestCase(id="4", description="d", tool="browser", request=request).is_deterministic
+
+
+def test_read_test_plan():
+    """The plan is read from the structured output, its JSON or the raw text; free text gives None."""
+    plan = TestPlan(test_cases=[TestCase(id="TC-01", description="Check health", tool="api")])
+    output = TaskOutput(description="Plan", raw="", agent="Test planner")
+
+    assert read_test_plan(output.model_copy(update={"pydantic": plan})) is plan
+    assert read_test_plan(output.model_copy(update={"json_dict": plan.model_dump()})) == plan
+    assert read_test_plan(output.model_copy(update={"raw": plan.model_dump_json()})) == plan
+    assert read_test_plan(output.model_copy(update={"raw": LABELLED})) is None
+    assert read_test_plan(output.model_copy(update={"raw": '{"test_cases": [{"id": "TC-01"}]}'})) is None
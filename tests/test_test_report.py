@@ -0,0 +1,78 @@
+"""Tests for the test case results and the rendered test report."""
+
+import pytest
+
+from autonomous_tester.libs.common.test_plan import TestCase
+from autonomous_tester.libs.common.test_report import CaseResult, render_report, summary_digest
+
+CASE = TestCase(id="TC-07", description="Delete a defect report", steps=["Open the defect list"], tool="browser")
+
+
+@pytest.mark.parametrize("text, status, defect", [
+    ("- Test ID: TC-07\n- Status: PASSED\n- Defect: None", "PASSED", None),
+    ("**Status:** FAIL\n**Defect:** The delete button does nothing", "FAILED", "The delete button does nothing"),
+    ("Status: failed\n  * Defects found: 500 on DELETE /reports/1", "FAILED", "500 on DELETE /reports/1"),
+    ("Status: PASSED\nDefect: N/A.", "PASSED", None),
+    ("I opened the defect list and the defect form. Status: PASSED", "PASSED", None),
+    ("Status: FAILED\nThe defect report was not deleted.", "FAILED", None),
+    ("The defect list did not load.", "FAILED", "The test result did not state a status"),
+])
+def test_result_from_text(text, status, defect):
+    """Status and defect come from labelled lines; the word "defect" elsewhere is not a defect."""
+    result = CaseResult.from_text(text, CASE, duration_ms=12.0)
+    assert (result.id, result.description, result.tool) == ("TC-07", "Delete a defect report", "browser")
+    assert (result.status, result.defect, result.duration_ms) == (status, defect, 12.0)
+
+
+def test_result_from_text_without_a_planned_case():
+    """Without a typed test case the ID and description are read from the answer or the case text."""
+    result = CaseResult.from_text("Test ID: TC-3\nDescription: Log in\nStatus: PASS")
+    assert (result.id, result.description, result.status) == ("TC-3", "Log in", "PASSED")
+
+    result = CaseResult.from_text("Status: FAIL\nDefect: wrong title", "Test ID: TC-4\nDescription: Check the title")
+    assert (result.id, result.description, result.defect) == ("TC-4", "Check the title", "wrong title")
+
+
+def test_to_text_round_trip():
+    """A result formatted like the test specialist's answer reads back unchanged."""
+    result = CaseResult(id="TC-1", description="Log in", status="FAILED", defect="401 for valid credentials")
+    assert CaseResult.from_text(result.to_text()) == result
+
+
+def test_render_report():
+    """The report has the counts, one table row per result in order, the defects and timings."""
+    results = [
+        CaseResult(id="TC-1", description="Log in", status="PASSED", tool="api", duration_ms=100.0, response_time_ms=20.0),
+        CaseResult(id="TC-2", description="Pipe | in name", status="FAILED", defect="x" * 400, tool="browser", duration_ms=300.0),
+    ]
+    report = render_report(results, summary="One failure.", skipped=3)
+    lines = report.splitlines()
+
+    assert lines[:4] == ["# Test Report", "", "## Executive Summary", ""]
+    assert "| 2 | 1 | 1 | 50% |" in lines
+    assert "Not run, because their requirement sections are unchanged and they passed last time: 3 test cases." in lines
+    rows = [line for line in lines if line.startswith("| TC-")]
+    assert rows[0] == "| TC-1 | Log in | api | PASSED | 100 | - |"
+    assert rows[1].startswith("| TC-2 | Pipe \\| in name | browser | FAILED | 300 | xxx")
+    assert rows[1].endswith("... |") and len(rows[1]) < 400
+    assert f"- **TC-2** Pipe | in name: {'x' * 400}" in lines
+    assert "| Test case duration | 2 | 100 | 200 | 300 | 300 |" in lines
+    assert "| API response time | 1 | 20 | 20 | 20 | 20 |" in lines
+    assert lines[-1] == "Total test case time: 0.4 s"
+
+
+def test_render_report_without_defects_or_timings():
+    """A passing run says there are no defects and has no timing section."""
+    report = render_report([CaseResult(id="TC-1", description="Log in", status="PASSED")])
+    assert "No defects found." in report
+    assert "Executive Summary" not in report
+    assert "Timing" not in report
+
+
+def test_summary_digest_is_bounded():
+    """The digest lists as many failures as fit and counts the rest."""
+    results = [CaseResult(id=f"TC-{index}", description="Check", status="FAILED", defect="d" * 50) for index in range(100)]
+    digest = summary_digest(results, 500)
+    assert len(digest) <= 500
+    assert digest.startswith("Test cases executed: 100, passed: 0, failed: 100.")
+    assert digest.splitlines()[-1].endswith("more failed test cases.")
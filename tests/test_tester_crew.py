@@ -0,0 +1,279 @@
+"""Tests for the planning and execution stages of the tester crew."""
+
+import json
+import time
+
+import pytest
+from crewai import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.tools import BaseTool, tool
+
+from autonomous_tester.libs.common.test_history import RequirementSections, case_key
+from autonomous_tester.libs.common.test_plan import APIRequestSpec, TestCase, TestPlan
+from autonomous_tester.libs.crew_tools import tester_tools
+from autonomous_tester.tester_crew import tester_crew
+from autonomous_tester.tester_crew.tester_crew import AutonomousTester
+
+
+@tool("Search requirements")
+def search_requirements(query: str) -> str:
+    """Search the requirements."""
+    return ""
+
+
+def plan_output(raw: str = "1. Check the health endpoint") -> TaskOutput:
+    """Build a planner output."""
+    return TaskOutput(description="Plan the tests", raw=raw, agent="Test planner")
+
+
+@pytest.fixture
+def built_tools(monkeypatch):
+    """Record when the requirements search tool is built; plans are neither loaded nor stored."""
+    built = []
+
+    def requirements_tool(path):
+        built.append(path)
+        return search_requirements
+    monkeypatch.setitem(tester_tools, "requirements_tool", requirements_tool)
+    monkeypatch.setattr(tester_crew, "load_plan", lambda context: None)
+    monkeypatch.setattr(tester_crew, "store_plan", lambda plan, context: None)
+    return built
+
+
+def kickoff_recorder(crew: AutonomousTester, monkeypatch):
+    """Replace the planner run with one that records the planner's tools."""
+    tools_seen = []
+
+    def kickoff(tasks, inputs):
+        tools_seen.append([tool.name for tool in tasks[0].agent.tools])
+        return CrewOutput(raw="plan", tasks_output=[plan_output()])
+    monkeypatch.setattr(crew, "_kickoff", kickoff)
+    return tools_seen
+
+
+def test_stored_plan_does_not_build_the_tool(built_tools):
+    """With a stored plan the planner does not run and the requirements are not indexed."""
+    crew = AutonomousTester()
+    crew.cached_plan = crew.test_planning().output = plan_output()
+    assert crew._plan({}, crew.covered_tests) is crew.cached_plan
+    crew.crew()
+    assert built_tools == []
+    assert crew.test_planner().tools == []
+
+
+def test_planner_gets_the_tool_when_it_plans(built_tools, monkeypatch):
+    """A plan that is actually produced is written by a planner that can search the requirements."""
+    crew = AutonomousTester()
+    tools_seen = kickoff_recorder(crew, monkeypatch)
+    crew._plan({}, crew.covered_tests)
+    crew._plan({}, "another context")
+    assert tools_seen == [["Search requirements"], ["Search requirements"]]
+    assert len(built_tools) == 1
+
+
+def test_sequential_crew_planner_gets_the_tool(built_tools):
+    """The sequential crew equips the planner when its planning task runs."""
+    crew = AutonomousTester(replan=True)
+    assert any(task is crew.test_planning() for task in crew.crew().tasks)
+    assert [tool.name for tool in crew.test_planner().tools] == ["Search requirements"]
+
+
+def test_changed_sections_are_replanned_with_the_tool(built_tools, monkeypatch):
+    """A `--changed-only` run with a stored full plan still re-plans the changed sections with the tool."""
+    stored = plan_output()
+    monkeypatch.setattr(tester_crew, "load_plan", lambda context: stored if context == "" else None)
+    crew = AutonomousTester()
+    assert crew.cached_plan is stored
+    tools_seen = kickoff_recorder(crew, monkeypatch)
+    sections = RequirementSections("Login\n=====\nUsers log in.\n\nSearch\n======\nUsers search items.\n")
+
+    class History:
+        links = {case_key("Log in as admin"): ["Login"], case_key("Search for shoes"): ["Search"]}
+
+        def planned_cases(self):
+            return ["Log in as admin", "Search for shoes"]
+
+    planned = crew._plan_changes({}, sections, History(), {"Search"})
+    assert planned == ["Log in as admin", "1. Check the health endpoint"]
+    assert tools_seen == [["Search requirements"]]
+
+
+class NoHistory:
+    """The history of a first run."""
+
+    fingerprints: dict = {}
+    exists = False
+
+
+def planned_by(crew: AutonomousTester, monkeypatch, plan: TaskOutput):
+    """Let the planner answer with the given plan."""
+    monkeypatch.setattr(crew, "_kickoff", lambda tasks, inputs: CrewOutput(raw=plan.raw, tasks_output=[plan]))
+
+
+def test_typed_plan_is_executed_case_by_case(built_tools, monkeypatch):
+    """The test cases of a typed plan are chosen as they are."""
+    test_plan = TestPlan(test_cases=[TestCase(id="TC-01", description="Check health", tool="api"), TestCase(id="TC-02", description="Log in", tool="browser")])
+    crew = AutonomousTester()
+    planned_by(crew, monkeypatch, plan_output(test_plan.model_dump_json()))
+    test_cases, planned, _, suite_size = crew._choose_cases({}, RequirementSections(""), NoHistory())
+    assert test_cases == planned == test_plan.test_cases
+    assert suite_size == 2
+
+
+def test_free_text_plan_is_split(built_tools, monkeypatch):
+    """A plan that is not a typed plan runs as the text of its test cases."""
+    crew = AutonomousTester()
+    planned_by(crew, monkeypatch, plan_output("Test ID: TC-01 Log in\nTest ID: TC-02 Log out"))
+    test_cases, _, _, _ = crew._choose_cases({}, RequirementSections(""), NoHistory())
+    assert test_cases == ["Test ID: TC-01 Log in", "Test ID: TC-02 Log out"]
+
+
+def test_unsplittable_plan_falls_back_to_the_sequential_crew(built_tools, monkeypatch):
+    """A free-text plan whose test cases cannot be told apart is left to the sequential crew."""
+    crew = AutonomousTester()
+    planned_by(crew, monkeypatch, plan_output())
+    assert crew._choose_cases({}, RequirementSections(""), NoHistory()) is None
+
+    # With generated test cases, the plan runs as one case after them instead.
+    generated = [TestCase(id="OAS-001", description="GET /health: accepts a valid request", tool="api")]
+    crew = AutonomousTester(generated_cases=generated)
+    planned_by(crew, monkeypatch, plan_output())
+    test_cases, _, _, _ = crew._choose_cases({}, RequirementSections(""), NoHistory())
+    assert test_cases == generated + ["1. Check the health endpoint"]
+
+
+class FakeAPITool(BaseTool):
+    """Records the API tool inputs and answers with a fixed result."""
+
+    name: str = "API Test Tool"
+    description: str = "Test REST APIs."
+    result: dict
+    inputs: list = []
+
+    def _run(self, query: str) -> str:
+        self.inputs.append(json.loads(query))
+        return json.dumps(self.result)
+
+
+@pytest.mark.parametrize("result, passed, defect", [
+    ({"success": True, "status_code": 200, "response_time_ms": 12.5, "validations": ["✓ Status code 200 matches expected"]}, True, None),
+    ({"success": False, "status_code": 500, "validations": ["✗ Status code 500 != expected 200"]}, False, "✗ Status code 500 != expected 200"),
+    ({"success": False, "status_code": 0, "error": "Connection refused"}, False, "Connection refused"),
+    ({"success": False, "status_code": 404}, False, "Request failed with status code 404"),
+])
+def test_fully_specified_api_case_runs_without_the_llm(built_tools, monkeypatch, result, passed, defect):
+    """A case with a request spec and expectations goes straight to the API tool."""
+    api_tool = FakeAPITool(result=result)
+    monkeypatch.setitem(tester_tools, "api_tool", api_tool)
+    crew = AutonomousTester()
+    monkeypatch.setattr(crew, "_kickoff", lambda tasks, inputs: pytest.fail("the LLM was asked"))
+
+    request = APIRequestSpec(url="/health", expected_status=200)
+    case = TestCase(id="TC-01", description="Check health", tool="api", request=request)
+    outcome = crew._execute_case(case, {"endpoint": "http://api.test"})
+
+    assert api_tool.inputs == [{"url": "http://api.test/health", "method": "GET", "validate": {"status_code": 200}}]
+    assert (outcome.id, outcome.passed, outcome.defect, outcome.tool) == ("TC-01", passed, defect, "api")
+    assert outcome.response_time_ms == result.get("response_time_ms")
+
+
+def test_api_case_without_expectations_goes_to_the_specialist(built_tools, monkeypatch):
+    """An API case that does not say what passing looks like is run by the test specialist."""
+    monkeypatch.setitem(tester_tools, "api_tool", FakeAPITool(result={}))
+    crew = AutonomousTester()
+    prompts = []
+
+    def kickoff(tasks, inputs):
+        prompts.append(inputs["test_case"])
+        return CrewOutput(raw="Status: PASSED")
+    monkeypatch.setattr(crew, "_kickoff", kickoff)
+
+    case = TestCase(id="TC-01", description="Check health", tool="api", request=APIRequestSpec(url="/health"))
+    assert crew._execute_case(case, {}).passed
+    assert prompts == [case.to_prompt()]
+    assert tester_tools.api_tool.inputs == []
+
+
+@pytest.fixture
+def run_env(built_tools, monkeypatch, tmp_path):
+    """Run the crew on a small requirements file, without history, summary or report file in the project."""
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("Login\n=====\nUsers log in.\n")
+    settings = AutonomousTester.settings
+    monkeypatch.setattr(settings, "REQUIREMENTS_PATH", str(requirements))
+    monkeypatch.setattr(settings, "REPORT_SUMMARY_MAX_CHARS", 0)
+    monkeypatch.setattr(settings, "MAX_PARALLEL_CASES", 4)
+    monkeypatch.setattr(tester_crew, "REPORT_FILE", str(tmp_path / "test_report.md"))
+
+    class History(NoHistory):
+        def __init__(self, endpoint=None):
+            pass
+
+        def save(self, sections, planned, links, results):
+            pass
+    monkeypatch.setattr(tester_crew, "TestHistory", History)
+    return tmp_path
+
+
+def run_with(crew: AutonomousTester, monkeypatch, test_cases, execute):
+    """Plan the given test cases and execute each with `execute(case_text)`, which returns the answer."""
+    plan = plan_output(TestPlan(test_cases=test_cases).model_dump_json())
+
+    def kickoff(tasks, inputs):
+        if "test_case" in inputs:
+            return CrewOutput(raw=execute(json.loads(inputs["test_case"])))
+        return CrewOutput(raw=plan.raw, tasks_output=[plan])
+    monkeypatch.setattr(crew, "_kickoff", kickoff)
+    return crew.run({})
+
+
+def browser_cases(count: int):
+    """Browser test cases TC-0, TC-1, ..."""
+    return [TestCase(id=f"TC-{index}", description=f"Check page {index}", tool="browser") for index in range(count)]
+
+
+def test_results_come_back_in_plan_order(run_env, monkeypatch):
+    """Cases run in parallel, and the report lists them in plan order whatever order they finish in."""
+    started = []
+
+    def execute(case):
+        index = int(case["id"].split("-")[1])
+        started.append(index)
+        time.sleep(0.05 * (4 - index))
+        return "Status: PASSED"
+
+    begin = time.perf_counter()
+    report = run_with(AutonomousTester(), monkeypatch, browser_cases(4), execute).raw
+    elapsed = time.perf_counter() - begin
+
+    rows = [line.split(" | ")[0] for line in report.splitlines() if line.startswith("| TC-")]
+    assert rows == ["| TC-0", "| TC-1", "| TC-2", "| TC-3"]
+    assert sorted(started) == [0, 1, 2, 3]
+    assert elapsed < 0.45  # the slowest case takes 0.2 s, all of them 0.5 s in a row
+    assert (run_env / "test_report.md").read_text(encoding="utf-8") == report
+
+
+def test_failing_case_does_not_abort_the_others(run_env, monkeypatch):
+    """A case that raises is reported as failed and the other cases still run."""
+    def execute(case):
+        if case["id"] == "TC-1":
+            raise RuntimeError("browser crashed")
+        return "Status: PASSED"
+
+    crew = AutonomousTester()
+    report = run_with(crew, monkeypatch, browser_cases(3), execute).raw
+
+    assert "| 3 | 2 | 1 | 67% |" in report
+    assert "- **TC-1** Check page 1: the test case could not be executed (browser crashed)" in report
+    execution = crew.test_execution().output.raw
+    assert execution.count("Status: PASSED") == 2 and "- Test ID: TC-1" in execution
+
+
+def test_unsplittable_plan_runs_the_sequential_crew(run_env, monkeypatch):
+    """A plan whose test cases cannot be told apart is run by the sequential crew, not fanned out."""
+    crew = AutonomousTester()
+    planned_by(crew, monkeypatch, plan_output())
+    sequential = CrewOutput(raw="sequential report")
+    monkeypatch.setattr(crew, "_run_crew", lambda inputs: sequential)
+    monkeypatch.setattr(crew, "_execute_case", lambda test_case, inputs: pytest.fail("a case was fanned out"))
+    assert crew.run({}) is sequential